@@ -0,0 +1,124 @@
+"""Load test the notification server of the TrayNotifier.
+
+Several client processes send notifications as fast as they can to a
+NotificationServer, whose queue is drained like the TrayNotifier does.
+Prints the sustained messages per second and the latency between
+sending and receiving.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_ipc.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from widgets.tray_notifier.client import NotificationClient
+
+
+def run_client(name, count, batch):
+    """Send the notifications from this process.
+
+    Args:
+        name (str): The name of the server.
+        count (int): The number of notifications.
+        batch (int): The number of notifications per write.
+    """
+    with NotificationClient(name) as client:
+        for start in range(0, count, batch):
+            client.send_many(
+                [dict(message='Job %d finished' % i, key='jobs',
+                      summary='{count} jobs finished')
+                 for i in range(start, min(start + batch, count))])
+        # end for
+    # end with
+# end def run_client
+
+
+def run_server(name, clients, count, batch):
+    """Receive the notifications of the client processes.
+
+    Args:
+        name (str): The name of the server.
+        clients (int): The number of client processes.
+        count (int): The number of notifications per client.
+        batch (int): The number of notifications per write.
+    Returns:
+        The messages per second and the sorted latencies in seconds.
+    """
+    from Qt import QtCore
+    from widgets.tray_notifier.ipc import NotificationServer
+    from widgets.tray_notifier.notifications import NotificationQueue
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    queue = NotificationQueue(popup_interval=0)
+    server = NotificationServer(queue, name, track_latency=True)
+    server.listen()
+
+    def drain():
+        queue.drain()
+        queue.pop_popup()
+    # end def drain
+
+    drain_timer = QtCore.QTimer()
+    drain_timer.setInterval(50)
+    drain_timer.timeout.connect(drain)
+    drain_timer.start()
+    total = clients * count
+    start = timeit.default_timer()
+    processes = [subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--client', name,
+         '--count', str(count), '--batch', str(batch)])
+        for _ in range(clients)]
+    while server.received < total:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 50)
+        finished = all(p.poll() is not None for p in processes)
+        if finished and server.connection_count() == 0:
+            # A client failed, do not wait forever
+            break
+        # end if
+    # end while
+    elapsed = timeit.default_timer() - start
+    for process in processes:
+        process.wait()
+    # end for
+    server.close()
+    return server.received / elapsed, sorted(server.latencies)
+# end def run_server
+
+
+def main(argv=None):
+    """Run the load test and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--clients', type=int, default=4,
+                        help='The number of client processes.')
+    parser.add_argument('--count', type=int, default=20000,
+                        help='The number of notifications per client.')
+    parser.add_argument('--batch', type=int, default=1,
+                        help='The number of notifications per write.')
+    parser.add_argument('--name', default='widgets-bench-ipc-%d' % os.getpid(),
+                        help='The name of the server.')
+    parser.add_argument('--client', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.client is not None:
+        run_client(args.client, args.count, args.batch)
+        return
+    # end if
+    rate, latencies = run_server(args.name, args.clients, args.count,
+                                 args.batch)
+    print('%-16s %12.0f' % ('messages/s', rate))
+    if latencies:
+        for label, quantile in (('p50 latency ms', 0.5),
+                                ('p99 latency ms', 0.99),
+                                ('max latency ms', 1.0)):
+            index = min(len(latencies) - 1, int(len(latencies) * quantile))
+            print('%-16s %12.3f' % (label, latencies[index] * 1000))
+        # end for
+    # end if
+# end def main
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Compare the show and paint latency of the stylesheet modes.
+
+A ConfirmDialog is styled with the general stylesheet, once with the
+full stylesheet and once with the palette fast path, see
+utility.set_palette_fast_path. Each mode runs in its own process, as
+the fast path sets application wide palettes.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_palette.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Qt import QtCore, QtWidgets
+
+from suite import PaintWatcher
+from widgets import utility
+
+
+MODES = ('stylesheet', 'palette')
+
+# Seconds to wait for the first paint of a dialog
+TIMEOUT = 5.0
+
+
+def bench_mode(mode, repeat):
+    """Measure the latency of a ConfirmDialog in the given mode.
+
+    Args:
+        mode (str): One of the MODES.
+        repeat (int): The number of dialogs to measure.
+    Returns:
+        The best show to first paint and repaint latencies in seconds,
+        None if no dialog has been painted within the TIMEOUT.
+    """
+    from widgets.confirmdialog.confirmdialog import ConfirmDialog
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    utility.set_palette_fast_path(mode == 'palette')
+    show_times = list()
+    paint_times = list()
+    for _ in range(repeat):
+        dialog = ConfirmDialog(auto_raise=False, message='Benchmark')
+        utility.set_stylesheet(dialog)
+        watcher = PaintWatcher()
+        watched = watcher.watch(dialog)
+        start = timeit.default_timer()
+        QtWidgets.QDialog.show(dialog)
+        while (watcher.painted is None and
+               timeit.default_timer() - start < TIMEOUT):
+            app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+        # end while
+        watcher.unwatch(watched)
+        if watcher.painted is not None:
+            show_times.append(watcher.painted - start)
+            start = timeit.default_timer()
+            dialog.repaint()
+            paint_times.append(timeit.default_timer() - start)
+        # end if
+        dialog.close()
+        dialog.deleteLater()
+        app.processEvents()
+    # end for
+    if not show_times:
+        return None, None
+    # end if
+    return min(show_times), min(paint_times)
+# end def bench_mode
+
+
+def main(argv=None):
+    """Run every mode in a subprocess and print the latencies."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='The number of dialogs per mode.')
+    parser.add_argument('--mode', choices=MODES, default=None,
+                        help='Only measure the given mode.')
+    args = parser.parse_args(argv)
+    if args.mode is not None:
+        show, paint = bench_mode(args.mode, args.repeat)
+        if show is None:
+            print('%-12s not painted within %ss' % (args.mode, TIMEOUT))
+        else:
+            print('%-12s %10.3f %10.3f' % (args.mode, show * 1000,
+                                           paint * 1000))
+        # end if
+        return
+    # end if
+    print('%-12s %10s %10s' % ('mode', 'show ms', 'repaint ms'))
+    sys.stdout.flush()
+    for mode in MODES:
+        subprocess.check_call([sys.executable, os.path.abspath(__file__),
+                               '--mode', mode, '--repeat', str(args.repeat)])
+    # end for
+# end def main
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark the ui loaders per form.
+
+For every .ui file of the widgets package and every ui loader, the
+time to load the form class and the time to set up an instance of the
+form are measured. Loaders that are not available for the current Qt
+binding are reported as such.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_ui_loaders.py
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Qt import QtWidgets
+
+from widgets import precompile, utility
+
+
+def clear_caches(ui_file):
+    """Forget the cached compilations of the form.
+
+    Removes the form from the ui cache and unloads its precompiled
+    module, so the next load is a cold one.
+    Args:
+        ui_file (str): The .ui file.
+    """
+    cache_file = utility.get_ui_cache_file_path(ui_file)
+    if cache_file is not None and os.path.exists(cache_file):
+        os.remove(cache_file)
+    # end if
+    form = utility._precompiled_form(ui_file)
+    if form is not None:
+        sys.modules.pop('%s.%s' % (utility.precompiled.__name__, form[1]),
+                        None)
+    # end if
+# end def clear_caches
+
+
+def bench_loader(ui_file, loader, repeat):
+    """Measure the load and setup time of a form with the given loader.
+
+    Args:
+        ui_file (str): The .ui file.
+        loader (str): The name of the ui loader.
+        repeat (int): The number of measurements.
+    Returns:
+        The first and best load times and the best setup time in
+        seconds or None if the loader is not available.
+    """
+    if utility.UI_LOADERS[loader](ui_file) is None:
+        return None
+    # end if
+    # The availability check has loaded the form
+    clear_caches(ui_file)
+    load_times = list()
+    setup_times = list()
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        base_class, form_class = utility._load_ui_type(ui_file, loader)
+        load_times.append(timeit.default_timer() - start)
+
+        widget = base_class()
+        start = timeit.default_timer()
+        form_class.__dict__['setupUi'](widget, widget)
+        setup_times.append(timeit.default_timer() - start)
+        widget.deleteLater()
+    # end for
+    return load_times[0], min(load_times), min(setup_times)
+# end def bench_loader
+
+
+def main(argv=None):
+    """Print the load and setup times per form and loader."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='The number of measurements per loader.')
+    args = parser.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    # Measure with a fresh ui cache, the first measurement compiles
+    utility.UI_CACHE_DIR = tempfile.mkdtemp()
+    try:
+        ui_files = precompile.find_resources(
+            os.path.dirname(utility.__file__))[0]
+        print('%-40s %-12s %10s %10s %10s' % ('form', 'loader', 'first ms',
+                                              'load ms', 'setup ms'))
+        for ui_file in ui_files:
+            name = utility.get_resource_key(ui_file)
+            for loader in utility.UI_LOADERS:
+                times = bench_loader(ui_file, loader, args.repeat)
+                if times is None:
+                    print('%-40s %-12s %32s' % (name, loader,
+                                                'not available'))
+                else:
+                    print('%-40s %-12s %10.3f %10.3f %10.3f' % (
+                        (name, loader) + tuple(t * 1000 for t in times)))
+                # end if
+            # end for
+        # end for
+    finally:
+        shutil.rmtree(utility.UI_CACHE_DIR)
+    # end try
+    app.processEvents()
+# end def main
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,364 @@
+"""Headless benchmark suite for the hot paths of the widgets.
+
+Measures the ui loading per form, set_stylesheet, the ConfirmDialog
+from construction to its first painted frame, the blur of the
+LoadingDialog background at several resolutions and the TrayNotifier
+from construction to its first painted frame. The best time of all
+repetitions is reported per measurement.
+
+The results can be written as JSON and compared against a stored
+baseline, regressions beyond the threshold fail the run.
+
+Usage:
+    python benchmarks/suite.py --output baseline.json
+    python benchmarks/suite.py --compare baseline.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import Qt
+from Qt import QtCore, QtGui, QtWidgets
+
+from widgets import precompile, utility
+
+
+# The resolutions the blur is measured at
+RESOLUTIONS = ((1280, 720), (1920, 1080), (3840, 2160))
+
+
+class PaintWatcher(QtCore.QObject):
+    """Record the time of the first paint event of a widget.
+
+    A widget covered by opaque children never receives a paint event
+    itself, so the children are watched too.
+    """
+
+    def __init__(self):
+        """Initialize the PaintWatcher."""
+        super(PaintWatcher, self).__init__()
+        self.painted = None
+    # end def __init__
+
+    def watch(self, widget):
+        """Watch the widget and its current children.
+
+        Args:
+            widget (QWidget): The widget.
+        Returns:
+            The watched widgets.
+        """
+        watched = [widget] + widget.findChildren(QtWidgets.QWidget)
+        for each in watched:
+            each.installEventFilter(self)
+        # end for
+        return watched
+    # end def watch
+
+    def unwatch(self, watched):
+        """Stop watching the widgets.
+
+        Args:
+            watched (list): The widgets returned by watch.
+        """
+        for each in watched:
+            try:
+                each.removeEventFilter(self)
+            except RuntimeError:
+                # The C++ object of the child has already been deleted
+                pass
+            # end try
+        # end for
+    # end def unwatch
+
+    def eventFilter(self, obj, event):
+        """Record the first paint event."""
+        if event.type() == QtCore.QEvent.Paint and self.painted is None:
+            self.painted = timeit.default_timer()
+        # end if
+        return False
+    # end def eventFilter
+# end class PaintWatcher
+
+
+def best_painted(times, name):
+    """The best time to paint, skipped if nothing has been painted.
+
+    Args:
+        times (list): The times of time_to_paint, None if timed out.
+        name (str): The name of the measurement.
+    Returns:
+        The result of the measurement, empty if all timed out.
+    """
+    times = [t for t in times if t is not None]
+    return {name: min(times)} if times else dict()
+# end def best_painted
+
+
+def best_of(repeat, fn):
+    """The best time of calling fn repeatedly.
+
+    Args:
+        repeat (int): The number of calls.
+        fn (callable): The function to measure.
+    Returns:
+        The best time in seconds.
+    """
+    times = list()
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        fn()
+        times.append(timeit.default_timer() - start)
+    # end for
+    return min(times)
+# end def best_of
+
+
+def time_to_paint(create, show, app, timeout=5.0):
+    """The time from the construction of a widget to its first paint.
+
+    Args:
+        create (callable): Creates the widget.
+        show (callable): Shows the widget.
+        app (QApplication): The application.
+        timeout (float): Seconds to wait for the paint event.
+    Returns:
+        The time in seconds, None if nothing has been painted within
+        the timeout, and the widget.
+    """
+    watcher = PaintWatcher()
+    start = timeit.default_timer()
+    widget = create()
+    watched = watcher.watch(widget)
+    show(widget)
+    while (watcher.painted is None and
+           timeit.default_timer() - start < timeout):
+        app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+    # end while
+    watcher.unwatch(watched)
+    if watcher.painted is None:
+        sys.stderr.write('%s has not been painted within %ss, skipped\n' %
+                         (widget.__class__.__name__, timeout))
+        return None, widget
+    # end if
+    return watcher.painted - start, widget
+# end def time_to_paint
+
+
+def bench_ui_loading(repeat):
+    """Time loading the form class of every .ui file."""
+    results = dict()
+    ui_files = precompile.find_resources(os.path.dirname(utility.__file__))[0]
+    for ui_file in ui_files:
+        name = utility.get_resource_key(ui_file)
+        results['load_ui_type/%s' % name] = best_of(
+            repeat, lambda: utility._load_ui_type(ui_file))
+    # end for
+    from widgets.confirmdialog import confirmdialog
+    instances = list()
+
+    def first_instance():
+        # The form of a ui_class is loaded on its first instantiation
+        ui_base = utility.ui_class(confirmdialog.__file__, 'ConfirmDialog')
+        instances.append(ui_base())
+    # end def first_instance
+
+    results['ui_class/ConfirmDialog/first_instance'] = best_of(
+        repeat, first_instance)
+    for instance in instances:
+        instance.deleteLater()
+    # end for
+    return results
+# end def bench_ui_loading
+
+
+def bench_stylesheet(repeat):
+    """Time set_stylesheet on fresh widgets."""
+    from widgets.confirmdialog import confirmdialog
+    results = dict()
+    for installed in (False, True):
+        if installed:
+            utility.install_stylesheet()
+        # end if
+        widgets = [QtWidgets.QWidget() for _ in range(repeat)]
+        iterator = iter(widgets)
+        results['set_stylesheet/%s' % (
+            'installed' if installed else 'merged')] = best_of(
+            repeat, lambda: utility.set_stylesheet(next(iterator),
+                                                   confirmdialog.__file__))
+    # end for
+    utility.stylesheet_registry.uninstall()
+    return results
+# end def bench_stylesheet
+
+
+def bench_confirm_dialog(repeat, app):
+    """Time a ConfirmDialog from construction to the first frame."""
+    from widgets.confirmdialog.confirmdialog import ConfirmDialog
+    times = list()
+    for _ in range(repeat):
+        elapsed, dialog = time_to_paint(
+            lambda: ConfirmDialog(auto_raise=False, message='Benchmark'),
+            ConfirmDialog.show, app)
+        times.append(elapsed)
+        dialog.close()
+        dialog.deleteLater()
+        app.processEvents()
+    # end for
+    return best_painted(times, 'confirm_dialog/first_frame')
+# end def bench_confirm_dialog
+
+
+def bench_blur(repeat):
+    """Time the blur of the LoadingDialog background per resolution."""
+    from widgets.loadingdialog import blur
+    results = dict()
+    for width, height in RESOLUTIONS:
+        pixmap = QtGui.QPixmap(width, height)
+        pixmap.fill(QtGui.QColor(93, 93, 93))
+        backends = ['qt']
+        if blur.numpy is not None:
+            backends.append('numpy')
+        # end if
+        for backend in backends:
+            results['blur/%s/%dx%d' % (backend, width, height)] = best_of(
+                repeat, lambda: blur.blur_pixmap(pixmap, backend=backend,
+                                                 restore_size=False))
+        # end for
+    # end for
+    return results
+# end def bench_blur
+
+
+def bench_loading_dialog(repeat):
+    """Time LoadingDialog._blur including the screen grab."""
+    from widgets.loadingdialog.loadingdialog import LoadingDialog
+    from widgets.loadingdialog.snapshot import snapshot_cache
+    dialog = LoadingDialog()
+
+    def blur():
+        dialog.release_snapshot()
+        snapshot_cache.clear()
+        dialog._blur()
+    # end def blur
+
+    results = {'loading_dialog/blur': best_of(repeat, blur)}
+    dialog.release_snapshot()
+    dialog.deleteLater()
+    return results
+# end def bench_loading_dialog
+
+
+def bench_tray_notifier(repeat, app):
+    """Time a TrayNotifier from construction to the first frame."""
+    from widgets.tray_notifier.tray_notifier import TrayNotifier
+    times = list()
+    for _ in range(repeat):
+        elapsed, notifier = time_to_paint(TrayNotifier, TrayNotifier.show,
+                                          app)
+        times.append(elapsed)
+        notifier.system_tray_icon.hide()
+        notifier.hide()
+        notifier.deleteLater()
+        app.processEvents()
+    # end for
+    return best_painted(times, 'tray_notifier/first_frame')
+# end def bench_tray_notifier
+
+
+def run(repeat):
+    """Run all benchmarks.
+
+    Args:
+        repeat (int): The number of repetitions per measurement.
+    Returns:
+        The results, with the environment they were measured in.
+    """
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    results = dict()
+    results.update(bench_ui_loading(repeat))
+    results.update(bench_stylesheet(repeat))
+    results.update(bench_confirm_dialog(repeat, app))
+    results.update(bench_blur(repeat))
+    results.update(bench_loading_dialog(repeat))
+    results.update(bench_tray_notifier(repeat, app))
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'binding': Qt.__binding__,
+            'platform': os.environ.get('QT_QPA_PLATFORM'),
+            'machine': platform.machine()},
+        'repeat': repeat,
+        'results': results}
+# end def run
+
+
+def compare(results, baseline, threshold):
+    """Compare the results against the baseline.
+
+    Args:
+        results (dict): The results of run.
+        baseline (dict): The stored results of an earlier run.
+        threshold (float): The relative slowdown flagged as regression.
+    Returns:
+        A list of (name, baseline time, time, ratio, regressed) tuples,
+        for the measurements found in both.
+    """
+    rows = list()
+    for name, seconds in sorted(results['results'].items()):
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        # end if
+        ratio = seconds / before
+        rows.append((name, before, seconds, ratio, ratio > 1 + threshold))
+    # end for
+    return rows
+# end def compare
+
+
+def main(argv=None):
+    """Run the suite, print, store or compare the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='The number of repetitions per measurement.')
+    parser.add_argument('--output', help='Write the results to this file.')
+    parser.add_argument('--compare',
+                        help='Compare against the results in this file.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='The relative slowdown flagged as regression.')
+    args = parser.parse_args(argv)
+    results = run(args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        # end writing the results
+    # end if
+    if not args.compare:
+        for name, seconds in sorted(results['results'].items()):
+            print('%-56s %10.3f ms' % (name, seconds * 1000))
+        # end for
+        return 0
+    # end if
+    with open(args.compare, 'r') as f:
+        baseline = json.load(f)
+    # end reading the baseline
+    rows = compare(results, baseline, args.threshold)
+    print('%-56s %10s %10s %8s' % ('benchmark', 'base ms', 'ms', 'ratio'))
+    for name, before, seconds, ratio, regressed in rows:
+        print('%-56s %10.3f %10.3f %8.2f%s' % (
+            name, before * 1000, seconds * 1000, ratio,
+            '  REGRESSION' if regressed else ''))
+    # end for
+    return 1 if any(row[4] for row in rows) else 0
+# end def main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,30 @@
+import os
+
 from setuptools import setup
 from setuptools import find_packages
+from setuptools.command.build_py import build_py
+
+
+class BuildPyCommand(build_py):
+    """Precompile the .ui and .css resources into the build."""
+
+    def run(self):
+        build_py.run(self)
+        try:
+            from widgets import precompile
+            compiled_dir = precompile.precompile(
+                target_dir=os.path.join(self.build_lib, 'widgets'))
+        except ImportError as err:
+            # Qt is not available, without pysideuic or the uic of the
+            # binding only the stylesheets are precompiled
+            self.warn('Skipping the precompilation of the resources, '
+                      '%s' % err)
+        else:
+            self.announce('precompiled resources into %s' % compiled_dir,
+                          level=2)
+        # end try
+    # end def run
+# end class BuildPyCommand
 
 
 setup(name='PySideWidgetCollection',
@@ -10,6 +35,8 @@ setup(name='PySideWidgetCollection',
       long_description='',
       url='https://github.com/PaulSchweizer/PySideWidgetCollection',
       packages=find_packages(),
+      package_data={'': ['resource/*']},
+      cmdclass={'build_py': BuildPyCommand},
       classifiers=[
               'Programming Language :: Python',
               'Programming Language :: Python :: 2.7'
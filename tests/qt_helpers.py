@@ -0,0 +1,37 @@
+"""Helpers for the tests of the widgets, running on the offscreen platform."""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from Qt import QtCore, QtWidgets
+
+
+def application():
+    """The QApplication, created on first use."""
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+# end def application
+
+
+def process_events(condition=None, timeout=5000):
+    """Process the events until the condition is met or the timeout.
+
+    Args:
+        condition (callable): Returns True once done, None to process
+                              the pending events only once.
+        timeout (int): The maximum milliseconds to wait.
+    Returns:
+        The result of the condition.
+    """
+    timer = QtCore.QElapsedTimer()
+    timer.start()
+    met = condition is None
+    while timer.elapsed() < timeout:
+        QtWidgets.QApplication.processEvents(QtCore.QEventLoop.AllEvents, 10)
+        met = condition is None or condition()
+        if met:
+            break
+        # end if
+    # end while
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    return met
+# end def process_events
@@ -0,0 +1,120 @@
+import time
+import unittest
+
+from Qt import QtCore
+
+from tests.qt_helpers import application
+from widgets.animation import Animator
+
+
+class Widget(object):
+    """Stand-in for a widget, recording its position."""
+
+    def __init__(self):
+        """Initialize the Widget."""
+        self.pos = None
+        self.deleted = False
+    # end def __init__
+
+    def move(self, *args):
+        """Move to the QPoint or x and y."""
+        if self.deleted:
+            raise RuntimeError('Internal C++ object already deleted.')
+        # end if
+        self.pos = QtCore.QPoint(*args)
+    # end def move
+# end class Widget
+
+
+class TestAnimator(unittest.TestCase):
+    """Test the shared slide animations."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application."""
+        cls.app = application()
+    # end def setUpClass
+
+    def setUp(self):
+        """Create an Animator and a widget."""
+        self.animator = Animator(fps=50, easing=QtCore.QEasingCurve.Linear)
+        self.widget = Widget()
+        self.finished = list()
+    # end def setUp
+
+    def tearDown(self):
+        """Stop the timer."""
+        self.animator._timer.stop()
+    # end def tearDown
+
+    def slide(self, widget, elapsed):
+        """Slide the widget and pretend the time has elapsed.
+
+        Args:
+            widget (Widget): The widget.
+            elapsed (float): The seconds since the start.
+        """
+        self.animator.slide(widget, QtCore.QPoint(0, 0),
+                            QtCore.QPoint(100, 50), duration=200,
+                            finished=lambda: self.finished.append(widget))
+        self.animator._slides[widget].started -= elapsed
+    # end def slide
+
+    def test_progress(self):
+        """The widget moves along the slide and stops at the end."""
+        self.slide(self.widget, 0.1)
+        self.assertEqual(QtCore.QPoint(0, 0), self.widget.pos)
+        self.assertTrue(self.animator.is_animating(self.widget))
+        self.animator._tick()
+        self.assertTrue(45 <= self.widget.pos.x() <= 60)
+        self.assertEqual([], self.finished)
+        self.animator._slides[self.widget].started -= 0.1
+        self.animator._tick()
+        self.assertEqual(QtCore.QPoint(100, 50), self.widget.pos)
+        self.assertEqual([self.widget], self.finished)
+        self.assertEqual(0, self.animator.active_count())
+        self.assertFalse(self.animator._timer.isActive())
+    # end def test_progress
+
+    def test_dropped_frames(self):
+        """A late tick counts the frames it skipped."""
+        self.slide(self.widget, 0)
+        self.animator._last_tick = time.time() - 0.1
+        self.animator._tick()
+        self.assertEqual(4, self.animator.dropped_frames)
+        self.animator._tick()
+        self.assertEqual(4, self.animator.dropped_frames)
+        self.assertEqual(2, self.animator.frames)
+    # end def test_dropped_frames
+
+    def test_reuse_slides(self):
+        """Finished and stopped slides are reused."""
+        self.slide(self.widget, 1)
+        slide = self.animator._slides[self.widget]
+        self.animator._tick()
+        other = Widget()
+        self.slide(other, 0)
+        self.assertIs(slide, self.animator._slides[other])
+        self.animator.stop(other)
+        self.assertEqual(0, self.animator.active_count())
+        self.slide(self.widget, 0)
+        self.assertIs(slide, self.animator._slides[self.widget])
+        self.assertEqual([self.widget], self.finished)
+    # end def test_reuse_slides
+
+    def test_deleted_widget(self):
+        """The slide of a deleted widget ends without the callback."""
+        self.slide(self.widget, 0)
+        other = Widget()
+        self.slide(other, 0)
+        self.widget.deleted = True
+        self.animator._tick()
+        self.assertEqual([other], list(self.animator._slides))
+        self.assertEqual([], self.finished)
+    # end def test_deleted_widget
+# end class TestAnimator
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
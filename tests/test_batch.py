@@ -0,0 +1,96 @@
+import unittest
+
+from Qt import QtCore
+
+from tests.qt_helpers import application, process_events
+from widgets.confirmdialog import confirmdialog
+from widgets.confirmdialog.batch import APPLY_SELECTION, BatchConfirmer
+from widgets.confirmdialog.confirmqueue import ConfirmQueue
+
+
+class TestBatchConfirmer(unittest.TestCase):
+    """Test batching confirmation requests into one dialog."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application."""
+        cls.app = application()
+    # end def setUpClass
+
+    def setUp(self):
+        """Batch on an own queue."""
+        self.queue = ConfirmQueue()
+        self.batcher = BatchConfirmer(window=0, queue=self.queue)
+    # end def setUp
+
+    def tearDown(self):
+        """Destroy the idle overlays."""
+        confirmdialog.clear_idle_backgrounds()
+        process_events()
+    # end def tearDown
+
+    def shown_dialog(self):
+        """Wait for the next dialog to be shown.
+
+        Returns:
+            The dialog.
+        """
+        self.assertTrue(process_events(
+            lambda: self.queue.current_dialog() is not None and
+            self.queue.current_dialog().isVisible()))
+        return self.queue.current_dialog()
+    # end def shown_dialog
+
+    def test_grouping(self):
+        """Requests with equal options share a dialog."""
+        futures = [self.batcher.ask(message=m, title='Copy')
+                   for m in ('a', 'b')]
+        other = self.batcher.ask(message='c', title='Move')
+        dialog = self.shown_dialog()
+        self.assertEqual('Copy', dialog.title)
+        self.assertEqual(2, dialog.inner_widget.list_wid.count())
+        dialog.confirm('Confirm')
+        self.assertTrue(process_events(lambda: all(f.done() for f in futures)))
+        self.assertEqual(['Confirm', 'Confirm'], [f.result() for f in futures])
+
+        dialog = self.shown_dialog()
+        self.assertEqual(('c', 'Move'), (dialog.message, dialog.title))
+        dialog.cancel('Cancel')
+        self.assertTrue(process_events(other.done))
+        self.assertEqual('Cancel', other.result())
+    # end def test_grouping
+
+    def test_apply_selection(self):
+        """The checked items get the first, the others the last button."""
+        futures = [self.batcher.ask(message=m, buttons=('Overwrite', 'Skip'))
+                   for m in ('a', 'b', 'c')]
+        dialog = self.shown_dialog()
+        self.assertIn(APPLY_SELECTION, [b.text() for b in dialog.buttons])
+        dialog.inner_widget.list_wid.item(1).setCheckState(
+            QtCore.Qt.Unchecked)
+        dialog.confirm(APPLY_SELECTION)
+        self.assertTrue(process_events(lambda: all(f.done() for f in futures)))
+        self.assertEqual(['Overwrite', 'Skip', 'Overwrite'],
+                         [f.result() for f in futures])
+    # end def test_apply_selection
+
+    def test_unhashable_options(self):
+        """Requests with unhashable options are shown on their own."""
+        futures = [self.batcher.ask(message=m, size=[600, 200])
+                   for m in ('a', 'b')]
+        for message in ('a', 'b'):
+            dialog = self.shown_dialog()
+            self.assertEqual(message, dialog.message)
+            dialog.confirm('Confirm')
+            self.assertTrue(process_events(
+                lambda: self.queue.current_dialog() is not dialog))
+        # end for
+        self.assertTrue(process_events(lambda: all(f.done() for f in futures)))
+        self.assertEqual(['Confirm', 'Confirm'], [f.result() for f in futures])
+    # end def test_unhashable_options
+# end class TestBatchConfirmer
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
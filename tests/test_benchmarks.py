@@ -0,0 +1,41 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'benchmarks'))
+
+import suite
+
+
+class TestSuite(unittest.TestCase):
+    """Test evaluating the results of the benchmark suite."""
+
+    def test_compare(self):
+        """Slowdowns beyond the threshold are flagged as regressions."""
+        baseline = {'results': {'fast': 0.010, 'slow': 0.010, 'gone': 0.1,
+                                'zero': 0.0}}
+        results = {'results': {'fast': 0.011, 'slow': 0.013, 'new': 0.1,
+                               'zero': 0.1}}
+        rows = suite.compare(results, baseline, 0.2)
+        self.assertEqual(['fast', 'slow'], [row[0] for row in rows])
+        name, before, seconds, ratio, regressed = rows[0]
+        self.assertEqual((0.010, 0.011), (before, seconds))
+        self.assertAlmostEqual(1.1, ratio)
+        self.assertFalse(regressed)
+        self.assertAlmostEqual(1.3, rows[1][3])
+        self.assertTrue(rows[1][4])
+    # end def test_compare
+
+    def test_best_painted(self):
+        """Timed out paints are skipped, not failing the run."""
+        self.assertEqual({'frame': 0.1},
+                         suite.best_painted([None, 0.2, 0.1], 'frame'))
+        self.assertEqual({}, suite.best_painted([None, None], 'frame'))
+    # end def test_best_painted
+# end class TestSuite
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
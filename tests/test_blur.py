@@ -0,0 +1,56 @@
+import unittest
+
+from Qt import QtGui
+
+from tests.qt_helpers import application
+from widgets.loadingdialog import blur
+
+
+class TestBlur(unittest.TestCase):
+    """Test the blur of the LoadingDialog background."""
+
+    def test_box_radius(self):
+        """Three box passes approximate the gaussian."""
+        self.assertEqual(0, blur._box_radius(0, 3))
+        self.assertEqual(3, blur._box_radius(3, 3))
+        self.assertEqual(5, blur._box_radius(3, 1))
+    # end def test_box_radius
+
+    @unittest.skipIf(blur.numpy is None, 'Requires numpy')
+    def test_box_blur(self):
+        """The box blur averages and keeps uniform areas."""
+        numpy = blur.numpy
+        image = numpy.zeros((9, 9, 4), numpy.float32)
+        image[4, 4] = 81
+        blurred = blur.box_blur(image, 1, passes=1)
+        self.assertEqual(image.shape, blurred.shape)
+        self.assertAlmostEqual(9, blurred[3, 3, 0])
+        self.assertAlmostEqual(0, blurred[2, 2, 0])
+        self.assertAlmostEqual(81, blurred.sum() / 4)
+        uniform = numpy.full((5, 7, 4), 100, numpy.float32)
+        self.assertTrue(numpy.allclose(uniform, blur.box_blur(uniform, 3)))
+    # end def test_box_blur
+
+    def test_blur_pixmap_size(self):
+        """The blurred pixmap is kept small unless the size is restored."""
+        application()
+        pixmap = QtGui.QPixmap(160, 90)
+        pixmap.fill(QtGui.QColor(93, 93, 93))
+        for backend in blur.BACKENDS[blur.numpy is None:]:
+            small = blur.blur_pixmap(pixmap, downsample=4, backend=backend,
+                                     restore_size=False)
+            self.assertEqual((40, 22), (small.width(), small.height()))
+            self.assertAlmostEqual(
+                93, QtGui.QColor(small.toImage().pixel(20, 11)).red(),
+                delta=2)
+            restored = blur.blur_pixmap(pixmap, downsample=4,
+                                        backend=backend)
+            self.assertEqual(pixmap.size(), restored.size())
+        # end for
+    # end def test_blur_pixmap_size
+# end class TestBlur
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,114 @@
+import threading
+import unittest
+
+from tests.qt_helpers import application, process_events
+from widgets.confirmdialog import confirmdialog
+from widgets.confirmdialog.bridge import ConfirmBridge
+from widgets.confirmdialog.confirmqueue import ConfirmQueue
+
+
+class TestConfirmBridge(unittest.TestCase):
+    """Test asking for confirmations from worker threads."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application."""
+        cls.app = application()
+    # end def setUpClass
+
+    def setUp(self):
+        """Bridge to an own queue."""
+        self.queue = ConfirmQueue()
+        self.bridge = ConfirmBridge(self.queue)
+        self.answers = list()
+    # end def setUp
+
+    def tearDown(self):
+        """Destroy the idle overlays."""
+        confirmdialog.clear_idle_backgrounds()
+        process_events()
+    # end def tearDown
+
+    def start_worker(self, **kwargs):
+        """Ask for a confirmation from a worker thread.
+
+        Args:
+            kwargs: The arguments of ConfirmBridge.confirm.
+        Returns:
+            The started thread, the answer is added to the answers.
+        """
+        def work():
+            self.answers.append(self.bridge.confirm(**kwargs))
+        # end def work
+        worker = threading.Thread(target=work)
+        worker.daemon = True
+        worker.start()
+        return worker
+    # end def start_worker
+
+    def join(self, worker):
+        """Process the events until the worker is done."""
+        self.assertTrue(process_events(lambda: not worker.is_alive()))
+        worker.join()
+    # end def join
+
+    def shown_dialog(self):
+        """Wait for the dialog of the queue to be shown.
+
+        Returns:
+            The dialog.
+        """
+        self.assertTrue(process_events(
+            lambda: self.queue.current_dialog() is not None and
+            self.queue.current_dialog().isVisible()))
+        return self.queue.current_dialog()
+    # end def shown_dialog
+
+    def test_answer(self):
+        """The worker gets the clicked button."""
+        worker = self.start_worker(message='worker')
+        dialog = self.shown_dialog()
+        self.assertEqual('worker', dialog.message)
+        dialog.confirm('Confirm')
+        self.join(worker)
+        self.assertEqual(['Confirm'], self.answers)
+    # end def test_answer
+
+    def test_blocking_gui_thread(self):
+        """Confirming from the GUI thread is refused."""
+        self.assertRaises(RuntimeError, self.bridge.confirm, message='gui')
+    # end def test_blocking_gui_thread
+
+    def test_timeout_while_queued(self):
+        """A timed out request still waiting is never shown."""
+        blocking = self.queue.ask(message='blocking')
+        dialog = self.shown_dialog()
+        worker = self.start_worker(message='worker', timeout=0.1,
+                                   default='late')
+        self.join(worker)
+        self.assertEqual(['late'], self.answers)
+        process_events()
+        dialog.confirm('Confirm')
+        self.assertTrue(process_events(blocking.done))
+        process_events(timeout=100)
+        self.assertIsNone(self.queue.current_dialog())
+    # end def test_timeout_while_queued
+
+    def test_timeout_while_shown(self):
+        """The dialog of a timed out request is closed."""
+        worker = self.start_worker(message='worker', timeout=0.3,
+                                   default='late')
+        dialog = self.shown_dialog()
+        self.join(worker)
+        self.assertEqual(['late'], self.answers)
+        self.assertTrue(process_events(
+            lambda: self.queue.current_dialog() is None))
+        self.assertFalse(dialog.isVisible())
+        self.assertIsNone(dialog.clicked_button)
+    # end def test_timeout_while_shown
+# end class TestConfirmBridge
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
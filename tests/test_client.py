@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from widgets.tray_notifier import client
+
+
+@unittest.skipIf(os.name == 'nt', 'Requires unix domain sockets')
+class TestNotificationClient(unittest.TestCase):
+    """Test sending notifications over a local socket."""
+
+    def setUp(self):
+        """Listen on a socket in a temporary directory."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'notifier')
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        self.server.listen(1)
+        self.received = b''
+    # end def setUp
+
+    def tearDown(self):
+        """Remove the socket."""
+        self.server.close()
+        shutil.rmtree(self.tmpdir)
+    # end def tearDown
+
+    def receive(self):
+        """Receive in a thread until the client disconnects.
+
+        Returns:
+            The thread.
+        """
+        def receive():
+            connection = self.server.accept()[0]
+            while True:
+                data = connection.recv(4096)
+                if not data:
+                    break
+                # end if
+                self.received += data
+            # end while
+            connection.close()
+        # end def receive
+
+        thread = threading.Thread(target=receive)
+        thread.daemon = True
+        thread.start()
+        return thread
+    # end def receive
+
+    def test_send(self):
+        """Notifications are sent as newline delimited JSON."""
+        thread = self.receive()
+        with client.NotificationClient(self.path) as notifier:
+            notifier.send('Render finished', key='render')
+            notifier.send_many([dict(message='a'), dict(message='b')])
+        # end with
+        thread.join(5)
+        lines = [json.loads(l) for l in self.received.decode().splitlines()]
+        self.assertEqual(['Render finished', 'a', 'b'],
+                         [l['message'] for l in lines])
+        self.assertEqual('render', lines[0]['key'])
+        self.assertIn('sent', lines[1])
+    # end def test_send
+
+    def test_server_path(self):
+        """Every user gets an own server by default."""
+        self.assertTrue(client.server_path().endswith(
+            'widgets-tray-notifier-%s' % client.getpass.getuser()))
+        self.assertEqual(self.path, client.server_path(self.path))
+    # end def test_server_path
+
+    def test_private_socket_dir(self):
+        """The socket is only created in a folder private to the user."""
+        runtime_dir = os.path.join(self.tmpdir, 'runtime')
+        temp_dir = os.path.join(self.tmpdir, 'temp')
+        os.mkdir(runtime_dir, 0o700)
+        os.mkdir(temp_dir)
+        environ = os.environ.get('XDG_RUNTIME_DIR')
+        tempdir = tempfile.tempdir
+        os.environ['XDG_RUNTIME_DIR'] = runtime_dir
+        tempfile.tempdir = temp_dir
+        try:
+            self.assertEqual(os.path.join(runtime_dir, 'name'),
+                             client.server_path('name'))
+
+            # A shared runtime folder is not used
+            os.chmod(runtime_dir, 0o777)
+            socket_dir = os.path.join(
+                temp_dir, 'widgets-%s' % client.getpass.getuser())
+            self.assertEqual(os.path.join(socket_dir, 'name'),
+                             client.server_path('name'))
+            self.assertEqual(0o700, os.stat(socket_dir).st_mode & 0o777)
+
+            # Nor a folder another user could have created
+            os.chmod(socket_dir, 0o777)
+            self.assertRaises(RuntimeError, client.server_path, 'name')
+        finally:
+            if environ is None:
+                os.environ.pop('XDG_RUNTIME_DIR')
+            else:
+                os.environ['XDG_RUNTIME_DIR'] = environ
+            # end if
+            tempfile.tempdir = tempdir
+        # end try
+    # end def test_private_socket_dir
+# end class TestNotificationClient
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
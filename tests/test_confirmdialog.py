@@ -0,0 +1,87 @@
+import unittest
+
+from Qt import QtWidgets
+
+from tests.qt_helpers import application, process_events
+from widgets.confirmdialog import confirmdialog
+
+
+class TestConfirmDialog(unittest.TestCase):
+    """Test the lazily built inner widgets of the ConfirmDialog."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application."""
+        cls.app = application()
+    # end def setUpClass
+
+    def tearDown(self):
+        """Forget the cached widgets and overlays."""
+        confirmdialog.clear_inner_widget_cache()
+        confirmdialog.clear_idle_backgrounds()
+        process_events()
+    # end def tearDown
+
+    def test_failing_factory(self):
+        """A failing factory is called once, the building stops."""
+        calls = list()
+
+        def factory():
+            calls.append(None)
+            raise ValueError('failed')
+        # end def factory
+
+        dialog = confirmdialog.ConfirmDialog(auto_raise=False,
+                                             inner_widget=factory)
+        dialog.show()
+        process_events(lambda: calls, timeout=1000)
+        process_events(timeout=100)
+        self.assertEqual(1, len(calls))
+        self.assertFalse(dialog._inner_widget_timer.isActive())
+        dialog.close()
+    # end def test_failing_factory
+
+    def test_cached_widget_outlives_dialog(self):
+        """A cached widget is reused after its dialog was destroyed."""
+        calls = list()
+
+        def factory():
+            calls.append(None)
+            return QtWidgets.QLabel('cached')
+        # end def factory
+
+        dialog = confirmdialog.ConfirmDialog(
+            auto_raise=False, inner_widget=factory, inner_widget_key='key',
+            delete_on_close=True)
+        dialog.show()
+        process_events(lambda: dialog.inner_widget is not None)
+        widget = dialog.inner_widget
+        dialog.close()
+        process_events()
+
+        dialog = confirmdialog.ConfirmDialog(
+            auto_raise=False, inner_widget=factory, inner_widget_key='key')
+        dialog.show()
+        process_events(timeout=50)
+        self.assertIs(widget, dialog.inner_widget)
+        self.assertIs(dialog.inner_widget_wid, widget.parentWidget())
+        self.assertEqual(1, len(calls))
+        dialog.close()
+
+        # A destroyed widget is built again
+        widget.setParent(dialog)
+        dialog.deleteLater()
+        process_events()
+        dialog = confirmdialog.ConfirmDialog(
+            auto_raise=False, inner_widget=factory, inner_widget_key='key')
+        dialog.show()
+        process_events(lambda: dialog.inner_widget is not None)
+        self.assertEqual(2, len(calls))
+        dialog.close()
+    # end def test_cached_widget_outlives_dialog
+# end class TestConfirmDialog
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,84 @@
+import unittest
+
+from tests.qt_helpers import application, process_events
+from widgets.confirmdialog import confirmdialog
+from widgets.confirmdialog.confirmqueue import ConfirmQueue
+from widgets.confirmdialog.pool import DialogPool
+
+
+class TestConfirmQueue(unittest.TestCase):
+    """Test showing the requested confirmations one after another."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application."""
+        cls.app = application()
+    # end def setUpClass
+
+    def tearDown(self):
+        """Destroy the idle overlays."""
+        confirmdialog.clear_idle_backgrounds()
+        process_events()
+    # end def tearDown
+
+    def shown_dialog(self, queue):
+        """Wait for the dialog of the queue to be shown.
+
+        Returns:
+            The dialog.
+        """
+        self.assertTrue(process_events(
+            lambda: queue.current_dialog() is not None and
+            queue.current_dialog().isVisible()))
+        return queue.current_dialog()
+    # end def shown_dialog
+
+    def test_one_at_a_time(self):
+        """Requests wait in line, the futures resolve to the answers."""
+        queue = ConfirmQueue()
+        first = queue.ask(message='first')
+        second = queue.ask(message='second')
+        self.assertEqual(1, queue.pending_count())
+        self.shown_dialog(queue).confirm('Confirm')
+        self.assertTrue(process_events(first.done))
+        self.assertEqual('Confirm', first.result())
+        self.assertEqual('second', self.shown_dialog(queue).message)
+        queue.current_dialog().cancel('Cancel')
+        self.assertTrue(process_events(second.done))
+        self.assertEqual('Cancel', second.result())
+    # end def test_one_at_a_time
+
+    def test_chain_from_done_callback(self):
+        """A done callback can ask again and reuse the pooled dialog."""
+        pool = DialogPool(size=1)
+        queue = ConfirmQueue(pool)
+        answers = list()
+
+        def chain(future):
+            answers.append(future.result())
+            if len(answers) == 1:
+                queue.ask(message='second').add_done_callback(chain)
+            # end if
+        # end def chain
+
+        queue.ask(message='first').add_done_callback(chain)
+        # The closed dialog is the only one returning to the pool
+        pool.clear()
+        dialog = self.shown_dialog(queue)
+        dialog.confirm('Confirm')
+        self.assertTrue(process_events(lambda: answers))
+        self.assertIs(dialog, self.shown_dialog(queue))
+        self.assertEqual('second', dialog.message)
+        self.assertIsNotNone(dialog.background)
+        dialog.cancel('Cancel')
+        self.assertTrue(process_events(lambda: len(answers) == 2))
+        self.assertEqual(['Confirm', 'Cancel'], answers)
+        self.assertIsNone(dialog.background)
+        pool.clear()
+    # end def test_chain_from_done_callback
+# end class TestConfirmQueue
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,130 @@
+import unittest
+
+from Qt import QtCore
+
+from tests.qt_helpers import application
+from widgets.geometry import ScreenGeometry, screens
+
+
+class Desktop(QtCore.QObject):
+    """Stand-in for the QDesktopWidget with configurable screens."""
+
+    resized = QtCore.Signal(int)
+    workAreaResized = QtCore.Signal(int)
+    screenCountChanged = QtCore.Signal(int)
+
+    def __init__(self, geometries, primary=0):
+        """Initialize the Desktop.
+
+        Args:
+            geometries (list): The QRect of each screen.
+            primary (int): The primary screen.
+        """
+        super(Desktop, self).__init__()
+        self.geometries = geometries
+        self.primary = primary
+    # end def __init__
+
+    def screenCount(self):
+        """The number of screens."""
+        return len(self.geometries)
+    # end def screenCount
+
+    def screenGeometry(self, screen):
+        """The geometry of the screen."""
+        return self.geometries[screen]
+    # end def screenGeometry
+
+    def availableGeometry(self, screen):
+        """The geometry of the screen without a task bar."""
+        return self.geometries[screen].adjusted(0, 0, 0, -10)
+    # end def availableGeometry
+
+    def primaryScreen(self):
+        """The primary screen."""
+        return self.primary
+    # end def primaryScreen
+# end class Desktop
+
+
+class App(object):
+    """Stand-in for the QApplication."""
+
+    def __init__(self, desktop):
+        """Initialize the App."""
+        self._desktop = desktop
+    # end def __init__
+
+    def desktop(self):
+        """The desktop."""
+        return self._desktop
+    # end def desktop
+# end class App
+
+
+class TestScreenGeometry(unittest.TestCase):
+    """Test the cached screen geometry."""
+
+    def setUp(self):
+        """Two screens side by side, the second one is primary."""
+        self.desktop = Desktop([QtCore.QRect(0, 0, 100, 100),
+                                QtCore.QRect(100, 0, 200, 100)], primary=1)
+        self.screens = ScreenGeometry(App(self.desktop))
+    # end def setUp
+
+    def test_screen_at(self):
+        """The screen containing the position, else the primary one."""
+        self.assertEqual(0, self.screens.screen_at(QtCore.QPoint(50, 50)))
+        self.assertEqual(1, self.screens.screen_at(QtCore.QPoint(150, 50)))
+        self.assertEqual(0, self.screens.screen_at(QtCore.QPoint(0, 99)))
+        self.assertEqual(1, self.screens.screen_at(QtCore.QPoint(500, 500)))
+        self.assertEqual(1, self.screens.queries)
+    # end def test_screen_at
+
+    def test_geometry(self):
+        """The geometries are copies of the cached ones."""
+        geometry = self.screens.screen_geometry(1)
+        self.assertEqual(QtCore.QRect(100, 0, 200, 100), geometry)
+        geometry.setWidth(10)
+        self.assertEqual(QtCore.QRect(100, 0, 200, 100),
+                         self.screens.screen_geometry(1))
+        self.assertEqual(QtCore.QRect(100, 0, 200, 90),
+                         self.screens.available_geometry(1))
+    # end def test_geometry
+
+    def test_clamping(self):
+        """The primary screen is clamped to the existing screens."""
+        self.desktop.primary = 5
+        self.assertEqual(1, self.screens.screen_at(QtCore.QPoint(-1, -1)))
+        self.desktop.primary = -1
+        self.screens.invalidate()
+        self.assertEqual(0, self.screens.screen_at(QtCore.QPoint(-1, -1)))
+    # end def test_clamping
+
+    def test_invalidate(self):
+        """A desktop change reads the geometry again."""
+        changed = list()
+        self.screens.changed.connect(lambda: changed.append(1))
+        self.screens.screen_at(QtCore.QPoint(150, 50))
+        self.desktop.geometries = [QtCore.QRect(0, 0, 400, 100)]
+        self.desktop.primary = 0
+        self.desktop.screenCountChanged.emit(1)
+        self.assertEqual([1], changed)
+        self.assertEqual(0, self.screens.screen_at(QtCore.QPoint(150, 50)))
+        self.assertEqual(2, self.screens.queries)
+    # end def test_invalidate
+
+    def test_shared(self):
+        """The widgets share one ScreenGeometry of the application."""
+        application()
+        self.assertIs(screens(), screens())
+        geometry = screens().screen_geometry(0)
+        self.assertTrue(geometry.contains(geometry.center()))
+        self.assertEqual(0, screens().screen_at(geometry.center()))
+    # end def test_shared
+# end class TestScreenGeometry
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from widgets import instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test the recording and export of timed spans."""
+
+    def setUp(self):
+        """Start with empty statistics."""
+        self.enabled = instrumentation.is_enabled()
+        instrumentation.reset()
+    # end def setUp
+
+    def tearDown(self):
+        """Restore the previous state."""
+        if self.enabled:
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+        # end if
+        instrumentation.reset()
+    # end def tearDown
+
+    def test_disabled(self):
+        """Nothing is recorded while disabled."""
+        instrumentation.disable()
+
+        @instrumentation.timed('test.fn')
+        def fn(value):
+            return value * 2
+        # end def fn
+
+        self.assertEqual(4, fn(2))
+        with instrumentation.span('test.span'):
+            pass
+        # end with
+        self.assertEqual({}, instrumentation.stats())
+    # end def test_disabled
+
+    def test_spans(self):
+        """Spans are aggregated per name."""
+        instrumentation.enable()
+
+        @instrumentation.timed('test.fn')
+        def fn():
+            raise ValueError()
+        # end def fn
+
+        for _ in range(3):
+            self.assertRaises(ValueError, fn)
+        # end for
+        with instrumentation.span('test.span'):
+            pass
+        # end with
+        instrumentation.record('test.slow', 0.03)
+        stats = instrumentation.stats()
+        self.assertEqual(3, stats['test.fn']['count'])
+        self.assertEqual(1, stats['test.span']['count'])
+        self.assertAlmostEqual(30, stats['test.slow']['max_ms'])
+        self.assertEqual({'<=50ms': 1}, stats['test.slow']['histogram'])
+    # end def test_spans
+
+    def test_export(self):
+        """The statistics are exported and dumped."""
+        instrumentation.record('test.span', 0.001)
+        exported = list()
+        instrumentation.add_exporter(exported.append)
+        try:
+            instrumentation.export()
+        finally:
+            instrumentation._exporters.remove(exported.append)
+        # end try
+        self.assertEqual(1, exported[0]['test.span']['count'])
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'stats.json')
+            instrumentation.dump(path)
+            with open(path, 'r') as f:
+                self.assertEqual(exported[0], json.load(f))
+            # end with
+        finally:
+            shutil.rmtree(tmpdir)
+        # end try
+    # end def test_export
+# end class TestInstrumentation
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
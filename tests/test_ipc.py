@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.qt_helpers import application, process_events
+from widgets.tray_notifier.client import NotificationClient
+from widgets.tray_notifier.ipc import NotificationServer
+from widgets.tray_notifier.notifications import NotificationQueue
+
+
+class TestNotificationServer(unittest.TestCase):
+    """Test receiving notifications from other processes."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application."""
+        cls.app = application()
+    # end def setUpClass
+
+    def setUp(self):
+        """Create a server in a temporary directory."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'notifier')
+        self.queue = NotificationQueue(popup_interval=0)
+        self.server = NotificationServer(self.queue, self.path,
+                                         track_latency=True)
+    # end def setUp
+
+    def tearDown(self):
+        """Close the server and remove the socket."""
+        self.server.close()
+        shutil.rmtree(self.tmpdir)
+    # end def tearDown
+
+    def test_receive(self):
+        """Notifications sent by a client are posted to the queue."""
+        self.server.listen()
+        with NotificationClient(self.path) as client:
+            client.send_many([dict(message='a', key=['job', 1]),
+                              dict(message='b')])
+        # end with
+        self.assertTrue(process_events(lambda: self.server.received == 2))
+        self.assertEqual(2, self.queue.drain())
+        self.assertEqual(2, len(self.server.latencies))
+    # end def test_receive
+
+    def test_invalid_messages(self):
+        """Invalid messages are counted, the following ones are kept."""
+        for line in (b'not json', b'[1]', b'{"key": "no message"}',
+                     b'{"message": "a", "key": {"un": "hashable"}}',
+                     b'{"message": "a", "key": [["nested"]]}',
+                     b'{"message": "a", "sent": "yesterday"}',
+                     b'{"message": "valid", "key": ["job", 1], "sent": 1}'):
+            self.server._post(line, 2.0)
+        # end for
+        self.assertEqual(6, self.server.errors)
+        self.assertEqual(1, self.server.received)
+        self.assertEqual([1.0], list(self.server.latencies))
+        self.assertEqual(1, self.queue.drain())
+    # end def test_invalid_messages
+
+    @unittest.skipIf(os.name == 'nt', 'Requires unix domain sockets')
+    def test_single_instance(self):
+        """A running server keeps its socket, a stale one is replaced."""
+        self.server.listen()
+        other = NotificationServer(NotificationQueue(), self.path)
+        self.assertRaises(RuntimeError, other.listen)
+        with NotificationClient(self.path) as client:
+            client.send('still received')
+        # end with
+        self.assertTrue(process_events(lambda: self.server.received == 1))
+
+        # The socket file of a crashed server is left behind
+        self.server._server.close()
+        open(self.path, 'w').close()
+        other.listen()
+        other.close()
+    # end def test_single_instance
+# end class TestNotificationServer
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
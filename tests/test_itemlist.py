@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from widgets.confirmdialog.itemlist import LazyListModel, display_text
+
+
+class TestLazyListModel(unittest.TestCase):
+    """Test fetching and filtering the items lazily."""
+
+    def test_fetch_batches(self):
+        """Each fetch adds one batch until the items are exhausted."""
+        model = LazyListModel(range(25), batch_size=10)
+        self.assertEqual(0, model.rowCount())
+        self.assertTrue(model.canFetchMore())
+        model.fetchMore()
+        self.assertEqual(10, model.rowCount())
+        model.fetchMore()
+        model.fetchMore()
+        self.assertEqual(25, model.rowCount())
+        self.assertFalse(model.canFetchMore())
+        self.assertEqual(24, model.item(24))
+        self.assertEqual(u'24', model.data(model.index(24)))
+    # end def test_fetch_batches
+
+    def test_filtered_fetch(self):
+        """A filtered fetch takes one batch, even without matches."""
+        model = LazyListModel(('Item%d' % i for i in range(100)),
+                              batch_size=10)
+        model.fetchMore()
+        model.set_filter('item42')
+        self.assertEqual(0, model.rowCount())
+        model.fetchMore()
+        self.assertEqual(0, model.rowCount())
+        self.assertEqual(20, len(model._items))
+        self.assertTrue(model.canFetchMore())
+        for _ in range(3):
+            model.fetchMore()
+        # end for
+        self.assertEqual(['Item42'],
+                         [model.item(r) for r in range(model.rowCount())])
+    # end def test_filtered_fetch
+
+    def test_set_filter(self):
+        """The filter narrows and widens the fetched items."""
+        model = LazyListModel(['Apple', 'apricot', 'Banana'])
+        model.fetchMore()
+        model.set_filter('ap')
+        self.assertEqual(['Apple', 'apricot'],
+                         [model.item(r) for r in range(model.rowCount())])
+        model.set_filter('apr')
+        self.assertEqual(['apricot'],
+                         [model.item(r) for r in range(model.rowCount())])
+        model.set_filter('')
+        self.assertEqual(3, model.rowCount())
+    # end def test_set_filter
+
+    def test_display_text(self):
+        """The default display text is unicode for any item."""
+        self.assertEqual(u'caf\xe9', display_text(u'caf\xe9'))
+        self.assertEqual(u'abc', display_text(b'abc'))
+        self.assertEqual(u'1', display_text(1))
+        model = LazyListModel([u'caf\xe9'])
+        model.fetchMore()
+        self.assertEqual(u'caf\xe9', model.data(model.index(0)))
+    # end def test_display_text
+# end class TestLazyListModel
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
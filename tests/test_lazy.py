@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+
+from tests.qt_helpers import application
+from widgets import utility
+from widgets.confirmdialog import confirmdialog
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyLoading(unittest.TestCase):
+    """Test that the forms are only loaded when they are needed."""
+
+    def run_python(self, code):
+        """Run the code in a fresh interpreter.
+
+        Args:
+            code (str): The code, printing its result.
+        Returns:
+            The printed lines.
+        """
+        env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+        env['PYTHONPATH'] = os.pathsep.join(
+            [ROOT] + [p for p in [env.get('PYTHONPATH')] if p])
+        with open(os.devnull, 'w') as devnull:
+            output = subprocess.check_output(
+                [sys.executable, '-c', textwrap.dedent(code)], env=env,
+                cwd=ROOT, stderr=devnull)
+        # end with
+        return output.decode('utf-8').split()
+    # end def run_python
+
+    def test_import(self):
+        """Importing the package and the widgets loads no forms."""
+        self.assertEqual(['False', '0', '1', 'True'], self.run_python('''
+            import sys
+            import widgets
+            print('Qt' in sys.modules)
+            from widgets import utility
+            loaded = list()
+            load_ui_type = utility._load_ui_type
+            def count(*args):
+                loaded.append(args)
+                return load_ui_type(*args)
+            utility._load_ui_type = count
+            from widgets.confirmdialog import confirmdialog
+            print(len(loaded))
+            from Qt import QtWidgets
+            app = QtWidgets.QApplication([])
+            confirmdialog.ConfirmDialog(auto_raise=False)
+            confirmdialog.ConfirmDialog(auto_raise=False)
+            print(len(loaded))
+            print(widgets.ConfirmDialog is confirmdialog.ConfirmDialog)
+            '''))
+    # end def test_import
+
+    def test_first_instance(self):
+        """The form of a ui_class is loaded on its first instance."""
+        application()
+        loaded = list()
+        load_ui_type = utility._load_ui_type
+
+        def count(*args):
+            loaded.append(args)
+            return load_ui_type(*args)
+        # end def count
+
+        utility._load_ui_type = count
+        try:
+            ui_base = utility.ui_class(confirmdialog.__file__, 'ConfirmDialog')
+            self.assertEqual([], loaded)
+            self.assertFalse(hasattr(ui_base, 'setupUi'))
+            first = ui_base()
+            self.assertEqual(1, len(loaded))
+            self.assertTrue(hasattr(first, 'title_lbl'))
+            second = ui_base()
+            self.assertEqual(1, len(loaded))
+            self.assertTrue(hasattr(second, 'title_lbl'))
+        finally:
+            utility._load_ui_type = load_ui_type
+        # end try
+    # end def test_first_instance
+
+    def test_lazy_attributes(self):
+        """The widgets resolve through the lazy package module."""
+        import widgets
+        self.assertEqual('_LazyModule', type(widgets).__name__)
+        self.assertIn('ConfirmDialog', dir(widgets))
+        widgets.__dict__.pop('ConfirmDialog', None)
+        self.assertIs(confirmdialog.ConfirmDialog, widgets.ConfirmDialog)
+        self.assertIs(confirmdialog.ConfirmDialog,
+                      widgets.__dict__['ConfirmDialog'])
+        self.assertRaises(AttributeError, getattr, widgets, 'Missing')
+    # end def test_lazy_attributes
+# end class TestLazyLoading
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
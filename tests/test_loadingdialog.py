@@ -0,0 +1,163 @@
+import threading
+import time
+import unittest
+
+from Qt import QtWidgets
+
+from tests.qt_helpers import application, process_events
+from widgets.loadingdialog import tasks
+from widgets.loadingdialog.loadingdialog import LoadingDialog
+
+
+def fail():
+    """Raise an exception on the worker thread."""
+    raise ValueError('failed')
+# end def fail
+
+
+def report_often():
+    """Report the progress many times."""
+    for i in range(20001):
+        tasks.report_progress(i / 200.0, 'step %d' % i)
+    # end for
+# end def report_often
+
+
+def wait_for_cancel():
+    """Stop cooperatively once cancelled."""
+    while not tasks.cancelled():
+        time.sleep(0.01)
+    # end while
+    return 'stopped'
+# end def wait_for_cancel
+
+
+class TestLoadingDialog(unittest.TestCase):
+    """Test running the callback of the LoadingDialog on a worker."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application."""
+        cls.app = application()
+    # end def setUpClass
+
+    def setUp(self):
+        """Record the finished futures."""
+        self.finished = list()
+    # end def setUp
+
+    def tearDown(self):
+        """Delete the closed dialogs."""
+        process_events()
+    # end def tearDown
+
+    def show(self, callback, **kwargs):
+        """Show a dialog running the callback until it has finished.
+
+        Args:
+            callback (callable): The callback.
+            kwargs: The options of the LoadingDialog.
+        Returns:
+            The dialog.
+        """
+        dialog = LoadingDialog(callback=callback, **kwargs)
+        dialog.task_finished.connect(self.finished.append)
+        dialog.show()
+        self.assertIsNotNone(dialog.future)
+        return dialog
+    # end def show
+
+    def test_run(self):
+        """run returns the result of the callback on a worker thread."""
+        threads = list()
+
+        def callback():
+            threads.append(threading.current_thread())
+            return 42
+        # end def callback
+        self.assertEqual(42, LoadingDialog.run(callback))
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(threading.current_thread(), threads[0])
+    # end def test_run
+
+    def test_run_exception(self):
+        """run raises the exception of the callback again."""
+        self.assertRaises(ValueError, LoadingDialog.run, fail)
+    # end def test_run_exception
+
+    def test_return_value(self):
+        """The dialog accepts and stores the result once finished."""
+        dialog = self.show(lambda: 'done')
+        self.assertTrue(process_events(lambda: self.finished))
+        self.assertEqual([dialog.future], self.finished)
+        self.assertEqual('done', dialog.return_value)
+        self.assertIsNone(dialog.exception)
+        self.assertEqual(QtWidgets.QDialog.Accepted, dialog.result())
+        self.assertFalse(dialog.isVisible())
+    # end def test_return_value
+
+    def test_exception(self):
+        """The dialog rejects and stores the exception of the callback."""
+        dialog = self.show(fail)
+        self.assertTrue(process_events(lambda: self.finished))
+        self.assertIsInstance(dialog.exception, ValueError)
+        self.assertIsNone(dialog.return_value)
+        self.assertEqual(QtWidgets.QDialog.Rejected, dialog.result())
+        self.assertFalse(dialog.isVisible())
+    # end def test_exception
+
+    def test_cancel(self):
+        """A cancelled callback stops and the dialog rejects."""
+        dialog = self.show(wait_for_cancel, cancellable=True)
+        self.assertTrue(dialog.cancel_btn.isVisible())
+        dialog.cancel()
+        self.assertTrue(process_events(lambda: self.finished))
+        self.assertEqual('stopped', dialog.future.result())
+        self.assertIsNone(dialog.return_value)
+        self.assertEqual(QtWidgets.QDialog.Rejected, dialog.result())
+    # end def test_cancel
+
+    def test_progress_throttle(self):
+        """Frequent reports are coalesced, the last one is shown."""
+        start = time.time()
+        dialog = self.show(report_often, text='Loading')
+        self.assertTrue(process_events(lambda: self.finished, 20000))
+        elapsed = time.time() - start
+        self.assertEqual(20001, dialog.progress_reports)
+        self.assertGreaterEqual(dialog.progress_paints, 1)
+        self.assertLessEqual(dialog.progress_paints,
+                             elapsed * dialog.progress_rate + 2)
+        self.assertEqual('Loading\n100% - step 20000', dialog.text_lbl.text())
+    # end def test_progress_throttle
+
+    def test_progress_rate(self):
+        """The progress rate has to be positive."""
+        dialog = LoadingDialog(progress_rate=10)
+        self.assertEqual(10, dialog.progress_rate)
+        for rate in (0, -1):
+            with self.assertRaises(ValueError):
+                dialog.progress_rate = rate
+            # end with
+        # end for
+        self.assertEqual(10, dialog.progress_rate)
+        self.assertRaises(ValueError, LoadingDialog, progress_rate=0)
+    # end def test_progress_rate
+
+    def test_without_callback(self):
+        """Without a callback the dialog stays open until closed."""
+        dialog = LoadingDialog()
+        # The downsampled snapshot is scaled up when painted
+        self.assertTrue(dialog.image_lbl.hasScaledContents())
+        dialog.show()
+        self.assertIsNone(dialog.future)
+        process_events(timeout=50)
+        self.assertTrue(dialog.isVisible())
+        dialog.close()
+        self.assertFalse(dialog.isVisible())
+    # end def test_without_callback
+# end class TestLoadingDialog
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
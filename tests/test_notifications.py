@@ -0,0 +1,68 @@
+import threading
+import unittest
+
+from widgets.tray_notifier.notifications import NotificationQueue
+
+
+class TestNotificationQueue(unittest.TestCase):
+    """Test the coalescing and rate limiting of notifications."""
+
+    def test_coalesce(self):
+        """Notifications with the same key coalesce."""
+        queue = NotificationQueue(batch_size=3)
+        for i in range(3):
+            queue.post('Job %d finished' % i, key='jobs',
+                       summary='{count} jobs finished')
+        # end for
+        queue.post('Disk full')
+        queue.post('Disk full')
+        self.assertEqual(3, queue.drain())
+        self.assertEqual(2, queue.backlog())
+        self.assertEqual(2, queue.drain())
+        popup = queue.pop_popup()
+        self.assertEqual(['3 jobs finished', 'Disk full (2 times)'],
+                         [n.text() for n in popup])
+        self.assertEqual(2, len(queue.history))
+    # end def test_coalesce
+
+    def test_rate_limit(self):
+        """Popups are limited, pending notifications wait."""
+        queue = NotificationQueue(history_size=2, popup_interval=10)
+        queue.post('a')
+        queue.drain()
+        self.assertEqual(1, len(queue.pop_popup(now=100)))
+        queue.post('b')
+        queue.post('c')
+        queue.drain()
+        self.assertEqual([], queue.pop_popup(now=105))
+        self.assertEqual(2, len(queue.pop_popup(now=110)))
+        self.assertEqual(['b', 'c'], [n.message for n in queue.history])
+        self.assertEqual([], queue.pop_popup(now=200))
+    # end def test_rate_limit
+
+    def test_threads(self):
+        """Notifications can be posted from many threads."""
+        queue = NotificationQueue(batch_size=100000)
+
+        def post():
+            for _ in range(1000):
+                queue.post('done', key='jobs')
+            # end for
+        # end def post
+
+        threads = [threading.Thread(target=post) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        # end for
+        for thread in threads:
+            thread.join()
+        # end for
+        self.assertEqual(8000, queue.drain())
+        self.assertEqual(8000, queue.pop_popup()[0].count)
+    # end def test_threads
+# end class TestNotificationQueue
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,127 @@
+import unittest
+
+from Qt import QtGui, QtWidgets
+
+from tests.qt_helpers import application
+from widgets import palette
+
+
+CSS = '''/* comment */
+QPushButton{
+    background: rgb(93, 93, 93);
+    color: #fff;
+    font: bold;
+    border-radius: 6px;
+}
+
+QPushButton:hover{
+    background: rgb(100, 144, 227);
+}
+
+QLabel, QCheckBox{
+    color: white;
+    background: qradialgradient(cx:0.5, cy:0.5, radius:0.5);
+}
+
+QLineEdit{
+    background: rgb(40, 40, 40);
+    color: #fff;
+}
+
+QComboBox{
+    color: white;
+}
+
+QComboBox QAbstractItemView{
+    border: 1px solid;
+}
+'''
+
+
+class TestPalette(unittest.TestCase):
+    """Test the translation of stylesheet rules to palettes."""
+
+    def test_parse_rules(self):
+        """Parse the selectors and declarations."""
+        rules = palette.parse_rules(CSS)
+        self.assertEqual(len(rules), 6)
+        self.assertEqual(rules[2][0], ['QLabel', 'QCheckBox'])
+        self.assertEqual(rules[1][1], [('background', 'rgb(100, 144, 227)')])
+    # end def test_parse_rules
+
+    def test_split_stylesheet(self):
+        """Only classes whose rules are all plain are translated."""
+        palette_rules, remaining = palette.split_stylesheet(CSS)
+        self.assertEqual(palette_rules, {
+            'QLineEdit': {'background': 'rgb(40, 40, 40)', 'color': '#fff'}})
+        rules = palette.parse_rules(remaining)
+        self.assertEqual(rules, [
+            r for r in palette.parse_rules(CSS) if r[0] != ['QLineEdit']])
+    # end def test_split_stylesheet
+# end class TestPalette
+
+
+class TestPaletteRendering(unittest.TestCase):
+    """Test that the translated rules paint like the stylesheet."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application."""
+        cls.app = application()
+    # end def setUpClass
+
+    def setUp(self):
+        """Remember the application palette and font."""
+        self.palette = QtGui.QPalette(self.app.palette())
+        self.font = QtGui.QFont(self.app.font())
+    # end def setUp
+
+    def tearDown(self):
+        """Reset the class specific palettes and fonts."""
+        self.app.setPalette(self.palette)
+        self.app.setFont(self.font)
+    # end def tearDown
+
+    def render(self, widget_class, use_palette):
+        """Render a styled widget.
+
+        Args:
+            widget_class (type): The class of the widget.
+            use_palette (bool): Whether to use the palette fast path.
+        Returns:
+            The color of the pixel left of the center of the widget.
+        """
+        if use_palette:
+            palette_rules, sheet = palette.split_stylesheet(CSS)
+            palette.apply_rules(palette_rules, self.app)
+        else:
+            sheet = CSS
+        # end if
+        container = QtWidgets.QWidget()
+        container.setStyleSheet(sheet)
+        widget = widget_class(container)
+        widget.setGeometry(0, 0, 120, 60)
+        container.resize(120, 60)
+        image = QtGui.QImage(120, 60, QtGui.QImage.Format_ARGB32)
+        image.fill(0)
+        container.render(image)
+        container.deleteLater()
+        return QtGui.QColor(image.pixel(20, 30)).getRgb()[:3]
+    # end def render
+
+    def test_rendering(self):
+        """Both modes paint the widgets with the same colors."""
+        for widget_class in (QtWidgets.QPushButton, QtWidgets.QLineEdit):
+            self.assertEqual(self.render(widget_class, False),
+                             self.render(widget_class, True))
+        # end for
+        self.assertEqual((93, 93, 93),
+                         self.render(QtWidgets.QPushButton, True))
+        self.assertEqual((40, 40, 40), self.render(QtWidgets.QLineEdit, True))
+    # end def test_rendering
+# end class TestPaletteRendering
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
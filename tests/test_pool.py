@@ -0,0 +1,85 @@
+import unittest
+
+from tests.qt_helpers import application, process_events
+from widgets.confirmdialog import confirmdialog
+from widgets.confirmdialog.pool import DialogPool
+
+
+class TestDialogPool(unittest.TestCase):
+    """Test handing out and taking back the pre-built dialogs."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application."""
+        cls.app = application()
+    # end def setUpClass
+
+    def setUp(self):
+        """Create a pool of one dialog."""
+        self.pool = DialogPool(size=1)
+        self.destroyed = list()
+    # end def setUp
+
+    def tearDown(self):
+        """Destroy the pooled dialogs and the idle overlays."""
+        self.pool.clear()
+        confirmdialog.clear_idle_backgrounds()
+        process_events()
+    # end def tearDown
+
+    def watch(self, dialog):
+        """Record the destruction of the dialog."""
+        dialog.destroyed.connect(lambda *args: self.destroyed.append(1))
+        return dialog
+    # end def watch
+
+    def test_reuse_after_closed(self):
+        """A closed dialog is handed out again with the new content."""
+        dialog = self.pool.acquire(title='First', message='first')
+        self.assertEqual(1, self.pool.created)
+        dialog.show()
+        self.assertTrue(process_events(dialog.isVisible))
+        # Empty the prewarmed pool, so the closed dialog is taken back
+        self.pool.clear()
+        dialog.close()
+        self.assertEqual(1, self.pool.idle_count())
+        self.assertIs(dialog, self.pool.acquire(title='Second'))
+        self.assertEqual(1, self.pool.reused)
+        self.assertEqual('Second', dialog.title)
+        self.assertIsNone(dialog.message)
+    # end def test_reuse_after_closed
+
+    def test_bound(self):
+        """Closed dialogs beyond the size of the pool are destroyed."""
+        first = self.pool.acquire()
+        second = self.watch(self.pool.acquire())
+        self.assertEqual(2, self.pool.created)
+        first.close()
+        second.close()
+        self.assertEqual(1, self.pool.idle_count())
+        process_events()
+        self.assertEqual([1], self.destroyed)
+        self.assertIs(first, self.pool.acquire())
+    # end def test_bound
+
+    def test_prewarm_and_clear(self):
+        """The pool fills up while idle, clear destroys the idle dialogs."""
+        self.pool.size = 2
+        self.pool.prewarm()
+        self.assertTrue(process_events(lambda: self.pool.idle_count() == 2))
+        process_events(timeout=50)
+        self.assertEqual(2, self.pool.created)
+        for dialog in self.pool._idle:
+            self.watch(dialog)
+        # end for
+        self.pool.clear()
+        self.assertEqual(0, self.pool.idle_count())
+        process_events()
+        self.assertEqual([1, 1], self.destroyed)
+    # end def test_prewarm_and_clear
+# end class TestDialogPool
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import warnings
+
+import unittest
+
+from widgets import precompile, utility
+
+
+class Precompiled(object):
+    """Stands in for the index of the compiled package."""
+
+    def __init__(self, hashes):
+        self.FORMS = dict()
+        self.HASHES = hashes
+    # end def __init__
+# end class Precompiled
+
+
+class TestPrecompile(unittest.TestCase):
+    """Test the precompilation of the resources."""
+
+    def setUp(self):
+        """Create a widgets package with resources."""
+        self.source_dir = tempfile.mkdtemp()
+        for path in (('resource', 'general.css'),
+                     ('dialog', 'resource', 'Dialog.ui'),
+                     ('dialog', 'resource', 'Dialog.css'),
+                     ('dialog', 'dialog.py'),
+                     ('compiled', 'resource', 'Old.ui')):
+            path = os.path.join(self.source_dir, *path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            # end if
+            open(path, 'w').close()
+        # end for
+    # end def setUp
+
+    def tearDown(self):
+        """Remove the widgets package."""
+        shutil.rmtree(self.source_dir)
+    # end def tearDown
+
+    def test_find_resources(self):
+        """Find the ui and css files, ignoring the compiled package."""
+        ui_files, css_files = precompile.find_resources(self.source_dir)
+        self.assertEqual(
+            ui_files,
+            [os.path.join(self.source_dir, 'dialog', 'resource', 'Dialog.ui')])
+        self.assertEqual(
+            css_files,
+            [os.path.join(self.source_dir, 'dialog', 'resource', 'Dialog.css'),
+             os.path.join(self.source_dir, 'resource', 'general.css')])
+    # end def test_find_resources
+
+    def test_clean(self):
+        """Remove the compiled package."""
+        precompile.clean(self.source_dir)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.source_dir, 'compiled')))
+    # end def test_clean
+
+    def test_changed_since_precompiled(self):
+        """Precompiled resources are stale if their content differs."""
+        css_file = os.path.join(os.path.dirname(utility.__file__),
+                                'resource', 'general.css')
+        key = utility.get_resource_key(css_file)
+        precompiled = utility.precompiled
+        try:
+            utility.precompiled = Precompiled(
+                {key: utility.get_resource_hash(css_file)})
+            self.assertFalse(utility._is_changed_since_precompiled(css_file))
+            utility.precompiled = Precompiled({key: 'other'})
+            self.assertTrue(utility._is_changed_since_precompiled(css_file))
+            utility.precompiled = Precompiled({})
+            self.assertTrue(utility._is_changed_since_precompiled(css_file))
+        finally:
+            utility.precompiled = precompiled
+        # end try
+    # end def test_changed_since_precompiled
+
+    def test_compile_without_pysideuic(self):
+        """Without pysideuic, the uic of the binding compiles the form."""
+        ui_file = os.path.join(os.path.dirname(utility.__file__),
+                               'confirmdialog', 'resource', 'ConfirmDialog.ui')
+        with open(ui_file, 'rb') as f:
+            content = f.read()
+        # end reading the ui file
+        pysideuic, binding_uic = utility.pysideuic, utility._binding_uic
+        try:
+            utility.pysideuic = None
+            if binding_uic() is not None:
+                source = utility.ui_form_source(content)[2]
+                self.assertIn('class Ui_confirm_dlg', source)
+            # end if
+            utility._binding_uic = lambda: None
+            self.assertRaises(ImportError, utility.ui_form_source, content)
+        finally:
+            utility.pysideuic, utility._binding_uic = pysideuic, binding_uic
+        # end try
+    # end def test_compile_without_pysideuic
+
+    def test_precompile_without_uic(self):
+        """Without a ui compiler, the stylesheets are still precompiled."""
+        with open(os.path.join(self.source_dir, 'resource', 'general.css'),
+                  'w') as f:
+            f.write('QWidget{}')
+        # end writing the stylesheet
+        with open(os.path.join(self.source_dir, 'dialog', 'resource',
+                               'Dialog.ui'), 'w') as f:
+            f.write('<ui><class>Dialog</class>'
+                    '<widget class="QDialog" name="Dialog"/></ui>')
+        # end writing the form
+        target_dir = tempfile.mkdtemp()
+        pysideuic, binding_uic = utility.pysideuic, utility._binding_uic
+        try:
+            utility.pysideuic = None
+            utility._binding_uic = lambda: None
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                compiled_dir = precompile.precompile(self.source_dir,
+                                                     target_dir)
+            # end with
+            self.assertEqual(1, len(caught))
+            index = dict()
+            with open(os.path.join(compiled_dir, '__init__.py')) as f:
+                exec(f.read(), index)
+            # end reading the index
+            self.assertEqual({}, index['FORMS'])
+            self.assertEqual(['dialog/resource/Dialog.css',
+                              'resource/general.css'],
+                             sorted(index['HASHES']))
+            stylesheets = dict()
+            with open(os.path.join(compiled_dir, 'stylesheets.py')) as f:
+                exec(f.read(), stylesheets)
+            # end reading the stylesheets
+            self.assertEqual('QWidget{}',
+                             stylesheets['STYLESHEETS']['resource/general.css'])
+        finally:
+            utility.pysideuic, utility._binding_uic = pysideuic, binding_uic
+            shutil.rmtree(target_dir)
+        # end try
+    # end def test_precompile_without_uic
+# end class TestPrecompile
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,66 @@
+import unittest
+
+from widgets.loadingdialog.snapshot import SnapshotCache
+
+
+class Pixmap(object):
+    """Stands in for a QPixmap of one MB."""
+
+    def width(self):
+        return 512
+    # end def width
+
+    def height(self):
+        return 512
+    # end def height
+
+    def depth(self):
+        return 32
+    # end def depth
+# end class Pixmap
+
+
+class TestSnapshotCache(unittest.TestCase):
+    """Test the sharing and eviction of the screen snapshots."""
+
+    def test_reuse(self):
+        """Snapshots are reused while in use or younger than the ttl."""
+        cache = SnapshotCache(ttl=60, budget=8)
+        first = cache.acquire(0, Pixmap)
+        self.assertIs(first, cache.acquire(0, Pixmap))
+        self.assertIsNot(first, cache.acquire(1, Pixmap))
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+        self.assertEqual(2 * 1024 * 1024, cache.nbytes())
+
+        cache.ttl = 0
+        cache.release(0)
+        self.assertIs(first, cache.acquire(0, Pixmap))
+        cache.release(0)
+        cache.release(0)
+        self.assertEqual(1, len(cache))
+        self.assertIsNot(first, cache.acquire(0, Pixmap))
+    # end def test_reuse
+
+    def test_budget(self):
+        """Unused snapshots are evicted least recently used first."""
+        cache = SnapshotCache(ttl=60, budget=1.5)
+        for key in range(3):
+            cache.acquire(key, Pixmap)
+        # end for
+        self.assertEqual(3, len(cache))
+        self.assertEqual(3, cache.in_use())
+        cache.release(1)
+        self.assertEqual([0, 2], list(cache._entries))
+        cache.release(0)
+        cache.release(2)
+        self.assertEqual([2], list(cache._entries))
+        self.assertEqual(2, cache.evictions)
+        cache.clear()
+        self.assertEqual(0, len(cache))
+    # end def test_budget
+# end class TestSnapshotCache
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
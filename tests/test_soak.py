@@ -0,0 +1,74 @@
+import gc
+import os
+import unittest
+
+
+# The number of dialogs raised and closed by the soak test
+SOAK_CYCLES = int(os.environ.get('WIDGETS_SOAK_CYCLES', 10000))
+
+
+def resident_memory():
+    """The resident memory of the process in bytes, None if unknown."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        # end with
+    except (IOError, OSError, ValueError):
+        return None
+    # end try
+# end def resident_memory
+
+
+@unittest.skipUnless(os.environ.get('WIDGETS_SOAK') == '1',
+                     'Set WIDGETS_SOAK=1 to run the soak test')
+class TestSoak(unittest.TestCase):
+    """Raise and close many dialogs, the memory has to stay flat."""
+
+    def test_confirm_dialog_cycles(self):
+        """Dialogs, overlays, snapshots and animations are released."""
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from Qt import QtCore, QtWidgets
+        from widgets import diagnostics
+        from widgets.confirmdialog import confirmdialog
+        app = (QtWidgets.QApplication.instance() or
+               QtWidgets.QApplication([]))
+        diagnostics.enable()
+        warm_up = max(1, SOAK_CYCLES // 10)
+        memory = None
+        for cycle in range(SOAK_CYCLES):
+            dialog = confirmdialog.ConfirmDialog(
+                auto_raise=False, message='Cycle %d' % cycle,
+                delete_on_close=True)
+            dialog.animation_speed = 1
+            dialog.show()
+            dialog.confirm('Confirm')
+            while dialog.isVisible():
+                app.processEvents()
+            # end while
+            del dialog
+            app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+            if cycle + 1 == warm_up:
+                gc.collect()
+                memory = resident_memory()
+            # end if
+        # end for
+        gc.collect()
+        app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+        counts = diagnostics.live_counts()
+        self.assertNotIn('ConfirmDialog', counts)
+        self.assertLessEqual(counts.get('LoadingDialog', 0),
+                             confirmdialog.MAX_IDLE_BACKGROUNDS)
+        self.assertEqual(0, counts['pixmaps_in_use'])
+        self.assertEqual(0, counts['animations'])
+        if memory is not None:
+            growth = resident_memory() - memory
+            self.assertLess(growth, 16 * 1024 * 1024,
+                            'Memory grew by %d bytes' % growth)
+        # end if
+    # end def test_confirm_dialog_cycles
+# end class TestSoak
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
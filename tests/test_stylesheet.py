@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+
+import unittest
+
+from widgets.stylesheet import StyleSheetRegistry
+from widgets.theme import Theme
+
+
+class TestStyleSheetRegistry(unittest.TestCase):
+    """Test the stylesheet registry."""
+
+    def setUp(self):
+        """Create the stylesheet files."""
+        self.css_dir = tempfile.mkdtemp()
+        self.general_css = self._write('general.css', 'QWidget{}')
+        self.widget_css = self._write('Widget.css', 'QLabel{}')
+        self.registry = StyleSheetRegistry(self.general_css)
+    # end def setUp
+
+    def tearDown(self):
+        """Remove the stylesheet files."""
+        shutil.rmtree(self.css_dir)
+    # end def tearDown
+
+    def _write(self, name, css, mtime=None):
+        """Write a stylesheet file."""
+        path = os.path.join(self.css_dir, name)
+        with open(path, 'w') as f:
+            f.write(css)
+        # end with
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        # end if
+        return path
+    # end def _write
+
+    def test_read(self):
+        """The file is only read again if it has been modified."""
+        self._write('general.css', 'QWidget{}', mtime=1000)
+        self.assertEqual(self.registry.read(self.general_css), 'QWidget{}')
+        with open(self.general_css, 'w') as f:
+            f.write('QFrame{}')
+        # end with
+        os.utime(self.general_css, (1000, 1000))
+        self.assertEqual(self.registry.read(self.general_css), 'QWidget{}')
+        os.utime(self.general_css, (2000, 2000))
+        self.assertEqual(self.registry.read(self.general_css), 'QFrame{}')
+        self.assertIsNone(
+            self.registry.read(os.path.join(self.css_dir, 'missing.css')))
+    # end def test_read
+
+    def test_precompiled(self):
+        """Precompiled stylesheets are preferred."""
+        registry = StyleSheetRegistry(self.general_css,
+                                      lambda css_file: 'QDialog{}')
+        self.assertEqual(registry.read(self.general_css), 'QDialog{}')
+    # end def test_precompiled
+
+    def test_merged(self):
+        """Identical merged stylesheets are shared."""
+        merged = self.registry.merged(self.general_css, self.widget_css)
+        self.assertEqual(merged, 'QWidget{}QLabel{}')
+        other = self._write('Other.css', 'QLabel{}')
+        self.assertIs(self.registry.merged(self.general_css, other), merged)
+        self.assertEqual(self.registry.merged(self.general_css, None),
+                         'QWidget{}')
+    # end def test_merged
+
+    def test_stylesheet(self):
+        """Without an installed application, the sheets are merged."""
+        self.assertEqual(self.registry.stylesheet(self.widget_css),
+                         'QWidget{}QLabel{}')
+    # end def test_stylesheet
+
+    def test_theme(self):
+        """The stylesheets are compiled with the current theme."""
+        self._write('general.css', '/*\ncolor = red\n*/QWidget{c: $color}')
+        self._write('Widget.css', 'QLabel{c: $color}')
+        self.assertEqual(self.registry.stylesheet(self.widget_css),
+                         '/*\ncolor = red\n*/QWidget{c: red}QLabel{c: red}')
+        self.registry.set_theme(Theme('blue', {'color': 'blue'}))
+        self.assertEqual(self.registry.stylesheet(self.widget_css),
+                         '/*\ncolor = red\n*/QWidget{c: blue}QLabel{c: blue}')
+        self.registry.set_theme('default')
+        self.assertEqual(self.registry.compiled(self.widget_css),
+                         'QLabel{c: red}')
+        self.assertRaises(ValueError, self.registry.set_theme, 'unknown')
+    # end def test_theme
+# end class TestStyleSheetRegistry
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
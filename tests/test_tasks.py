@@ -0,0 +1,107 @@
+import multiprocessing
+import threading
+import time
+
+import unittest
+
+from concurrent.futures import CancelledError, TimeoutError
+
+from widgets.loadingdialog import tasks
+
+
+def square(value):
+    """Run in a separate process."""
+    return value * value
+# end def square
+
+
+def fail():
+    """Raise an exception in a separate process."""
+    raise ValueError('failed')
+# end def fail
+
+
+def wait_for_cancel():
+    """Stop cooperatively once cancelled."""
+    while not tasks.cancelled():
+        time.sleep(0.01)
+    # end while
+    return 'stopped'
+# end def wait_for_cancel
+
+
+def report_often():
+    """Report the progress many times."""
+    for i in range(20000):
+        tasks.report_progress(i / 200.0, 'step %s' % i)
+    # end for
+# end def report_often
+
+
+def sleep():
+    """Ignore the cancellation."""
+    time.sleep(30)
+# end def sleep
+
+
+class TestTasks(unittest.TestCase):
+    """Test the executors of the LoadingDialog."""
+
+    def test_thread_cancel_event(self):
+        """Threads see the cancellation through cancelled()."""
+        event = threading.Event()
+        future = tasks.thread_pool().submit(
+            tasks.with_cancel_event(wait_for_cancel, event))
+        event.set()
+        self.assertEqual(future.result(timeout=5), 'stopped')
+        self.assertFalse(tasks.cancelled())
+    # end def test_thread_cancel_event
+
+    def test_process_result(self):
+        """Results and exceptions are sent back from the process."""
+        executor = tasks.ProcessExecutor()
+        self.assertEqual(executor.submit(square, 3).result(timeout=30), 9)
+        self.assertRaises(ValueError, executor.submit(fail).result, 30)
+    # end def test_process_result
+
+    @unittest.skipUnless(hasattr(multiprocessing, 'get_context'),
+                         'Forked processes do not pickle the callable')
+    def test_process_unpicklable(self):
+        """The future fails if the callable can not be sent."""
+        future = tasks.ProcessExecutor(timeout=5).submit(lambda: 1)
+        self.assertRaises(Exception, future.result, 30)
+        self.assertNotIsInstance(future.exception(), TimeoutError)
+    # end def test_process_unpicklable
+
+    def test_process_timeout(self):
+        """The process is terminated after the timeout."""
+        executor = tasks.ProcessExecutor(timeout=0.5)
+        self.assertRaises(TimeoutError, executor.submit(sleep).result, 30)
+    # end def test_process_timeout
+
+    def test_process_cancel(self):
+        """The process is terminated if it ignores the cancellation."""
+        executor = tasks.ProcessExecutor(grace_period=0.2)
+        for callback in (wait_for_cancel, sleep):
+            future = executor.submit(callback)
+            time.sleep(0.2)
+            future.request_cancel()
+            self.assertRaises(CancelledError, future.result, 30)
+        # end for
+    # end def test_process_cancel
+
+    def test_process_progress(self):
+        """Progress reports of a process are coalesced."""
+        reports = list()
+        future = tasks.ProcessExecutor().submit(report_often)
+        future.add_progress_callback(lambda *p: reports.append(p))
+        future.result(timeout=30)
+        self.assertLess(len(reports), 20000)
+        self.assertEqual(reports[-1], (19999 / 200.0, 'step 19999', None))
+    # end def test_process_progress
+# end class TestTasks
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,45 @@
+import unittest
+
+from widgets import theme
+
+
+CSS = '''/*
+Theme variables
+
+light_grey = rgb(93, 93, 93)
+default_padding = 12px
+*/
+QPushButton{
+    background: $light_grey;
+    padding: $default_padding;
+    color: $unknown;
+}
+'''
+
+
+class TestTheme(unittest.TestCase):
+    """Test the themes."""
+
+    def test_parse_variables(self):
+        """Read the variables from the leading comment."""
+        self.assertEqual(theme.parse_variables(CSS),
+                         {'light_grey': 'rgb(93, 93, 93)',
+                          'default_padding': '12px'})
+        self.assertEqual(theme.parse_variables('a = b\nQWidget{}'), {})
+    # end def test_parse_variables
+
+    def test_compile_stylesheet(self):
+        """Replace the known variables."""
+        variables = theme.parse_variables(CSS)
+        variables.update(theme.Theme('dark', {'light_grey': 'black'}).variables)
+        compiled = theme.compile_stylesheet(CSS, variables)
+        self.assertIn('background: black;', compiled)
+        self.assertIn('padding: 12px;', compiled)
+        self.assertIn('color: $unknown;', compiled)
+    # end def test_compile_stylesheet
+# end class TestTheme
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
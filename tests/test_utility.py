@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 
 import unittest
 
@@ -23,6 +25,116 @@ class TestUtility(unittest.TestCase):
         path = utility.get_css_file_path(widget_file, widget_name)
         self.assertEqual(path, os.path.join('test', 'resource', 'TestWidget.css'))
     # end def test_get_css_file_path
+
+    def test_ui_widget_class(self):
+        """Read the top level widget class from a ui file."""
+        ui_file = utility.get_ui_file_path(
+            os.path.join(os.path.dirname(utility.__file__),
+                         'confirmdialog', 'confirmdialog.py'),
+            'ConfirmDialog')
+        self.assertEqual(utility._ui_widget_class(ui_file), 'QDialog')
+    # end def test_ui_widget_class
+
+    def test_get_resource_key(self):
+        """Resource keys are relative to the widgets package."""
+        package_dir = os.path.dirname(utility.__file__)
+        self.assertEqual(
+            utility.get_resource_key(
+                os.path.join(package_dir, 'resource', 'general.css')),
+            'resource/general.css')
+        self.assertIsNone(utility.get_resource_key(
+            os.path.join(package_dir, os.pardir, 'general.css')))
+    # end def test_get_resource_key
+
+    def test_get_ui_cache_file_path(self):
+        """The cache file path is unique per ui file."""
+        path_a = utility.get_ui_cache_file_path(
+            os.path.join('a', 'resource', 'TestWidget.ui'))
+        path_b = utility.get_ui_cache_file_path(
+            os.path.join('b', 'resource', 'TestWidget.ui'))
+        self.assertEqual(os.path.dirname(path_a), utility.UI_CACHE_DIR)
+        self.assertTrue(os.path.basename(path_a).startswith('TestWidget-'))
+        self.assertNotEqual(path_a, path_b)
+    # end def test_get_ui_cache_file_path
+
+    def test_ui_cache(self):
+        """A cached form is only returned for a matching key."""
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache_file = os.path.join(cache_dir, 'sub', 'TestWidget.uic')
+            code = compile('Ui_test = None', '<test>', 'exec')
+            form = ('QWidget', 'test', code)
+            utility._write_ui_cache(cache_file, ('hash', '1.0', 'py'), form)
+            self.assertEqual(
+                utility._read_ui_cache(cache_file, ('hash', '1.0', 'py')),
+                form)
+            self.assertIsNone(
+                utility._read_ui_cache(cache_file, ('other', '1.0', 'py')))
+            self.assertIsNone(
+                utility._read_ui_cache(cache_file + 'x', ('hash', '1.0', 'py')))
+        finally:
+            shutil.rmtree(cache_dir)
+        # end try
+    # end def test_ui_cache
+
+    def test_native_loader_unavailable(self):
+        """A missing uic makes the native loader unavailable for good."""
+        results = [lambda ui_file: None, lambda ui_file: 1 / 0]
+
+        class Binding(object):
+            __binding__ = 'PySide2'
+        # end class Binding
+
+        class Importlib(object):
+            class QtUiTools(object):
+                pass
+            # end class QtUiTools
+
+            def import_module(self, name):
+                self.QtUiTools.loadUiType = staticmethod(results.pop())
+                return self.QtUiTools
+            # end def import_module
+        # end class Importlib
+
+        qt, importlib = utility.Qt, utility.importlib
+        unavailable = utility._native_unavailable
+        try:
+            utility.Qt, utility.importlib = Binding(), Importlib()
+            utility._native_unavailable = False
+            self.assertIsNone(utility._load_ui_type_native('Test.ui'))
+            self.assertFalse(utility._native_unavailable)
+            self.assertIsNone(utility._load_ui_type_native('Test.ui'))
+            self.assertTrue(utility._native_unavailable)
+            # The binding is not asked again
+            self.assertIsNone(utility._load_ui_type_native('Test.ui'))
+        finally:
+            utility.Qt, utility.importlib = qt, importlib
+            utility._native_unavailable = unavailable
+        # end try
+    # end def test_native_loader_unavailable
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), 'Requires posix permissions')
+    def test_ui_cache_permissions(self):
+        """The cache is private, a folder others can write is ignored."""
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache_file = os.path.join(cache_dir, 'sub', 'TestWidget.uic')
+            code = compile('Ui_test = None', '<test>', 'exec')
+            form = ('QWidget', 'test', code)
+            utility._write_ui_cache(cache_file, ('hash', '1.0', 'py'), form)
+            self.assertEqual(
+                0o700, os.stat(os.path.dirname(cache_file)).st_mode & 0o777)
+
+            os.chmod(os.path.dirname(cache_file), 0o777)
+            self.assertIsNone(
+                utility._read_ui_cache(cache_file, ('hash', '1.0', 'py')))
+            os.remove(cache_file)
+            utility._write_ui_cache(cache_file, ('hash', '1.0', 'py'), form)
+            self.assertFalse(os.path.exists(cache_file))
+        finally:
+            shutil.rmtree(cache_dir)
+        # end try
+    # end def test_ui_cache_permissions
 # end class TestUtility
 
 
@@ -0,0 +1,52 @@
+"""A collection of PySide widgets.
+
+The widgets are imported on first access, so importing the package
+itself does not import Qt or load any .ui files.
+"""
+import importlib
+import sys
+import types
+
+
+_LAZY_ATTRIBUTES = {
+    'BatchConfirmer': 'widgets.confirmdialog.batch',
+    'ConfirmBridge': 'widgets.confirmdialog.bridge',
+    'ConfirmDialog': 'widgets.confirmdialog.confirmdialog',
+    'ConfirmQueue': 'widgets.confirmdialog.confirmqueue',
+    'DialogPool': 'widgets.confirmdialog.pool',
+    'ItemListWidget': 'widgets.confirmdialog.itemlist',
+    'LoadingDialog': 'widgets.loadingdialog.loadingdialog',
+    'NotifierTrayIcon': 'widgets.tray_notifier.tray_notifier',
+    'TrayNotifier': 'widgets.tray_notifier.tray_notifier'}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+class _LazyModule(types.ModuleType):
+    """The widgets package, importing the widgets on first access."""
+
+    def __getattr__(self, name):
+        """Import the module defining the requested widget."""
+        module_name = _LAZY_ATTRIBUTES.get(name)
+        if module_name is None:
+            raise AttributeError("module '%s' has no attribute '%s'" %
+                                 (self.__name__, name))
+        # end if
+        value = getattr(importlib.import_module(module_name), name)
+        setattr(self, name, value)
+        return value
+    # end def __getattr__
+
+    def __dir__(self):
+        """List the lazy attributes alongside the loaded ones."""
+        return sorted(set(self.__dict__) | set(_LAZY_ATTRIBUTES))
+    # end def __dir__
+# end class _LazyModule
+
+
+_module = _LazyModule(__name__, __doc__)
+_module.__dict__.update(sys.modules[__name__].__dict__)
+# The original module has to stay alive, its globals are used by the
+# methods of the _LazyModule
+_module._original_module = sys.modules[__name__]
+sys.modules[__name__] = _module
@@ -0,0 +1,208 @@
+"""Shared driver for the slide animations of the widgets.
+
+All running animations are advanced by a single timer, which stops when
+nothing is animated. The widgets are moved rather than resized, so their
+layouts are not recomputed on every frame. The driver measures the
+frames per second and counts the frames that have been dropped because
+a tick came late.
+"""
+import time
+from collections import deque
+
+from Qt import QtCore
+
+from widgets import instrumentation
+__all__ = ['Animator', 'animator']
+
+
+_animator = None
+
+
+class _Slide(object):
+    """The state of one slide animation."""
+
+    __slots__ = ('start', 'end', 'duration', 'started', 'finished')
+
+    def setup(self, start, end, duration, started, finished):
+        """Set up the slide for a new animation.
+
+        Args:
+            start (QPoint): The start position.
+            end (QPoint): The end position.
+            duration (float): The duration in seconds.
+            started (float): The start time.
+            finished (callable): Called once the end is reached.
+        """
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.started = started
+        self.finished = finished
+    # end def setup
+# end class _Slide
+
+
+class Animator(QtCore.QObject):
+    """Slide widgets from one position to another."""
+
+    def __init__(self, fps=60, easing=QtCore.QEasingCurve.OutCubic):
+        """Initialize the Animator.
+
+        Args:
+            fps (int): The target frames per second.
+            easing (QEasingCurve.Type): The easing of the slides.
+        """
+        super(Animator, self).__init__()
+        self.easing = QtCore.QEasingCurve(easing)
+        self.frames = 0
+        self.dropped_frames = 0
+        self._slides = dict()
+        self._unused = list()
+        self._frame_times = deque(maxlen=fps * 2)
+        self._last_tick = None
+        self._timer = QtCore.QTimer(self)
+        if hasattr(self._timer, 'setTimerType'):
+            self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        # end if
+        self._timer.timeout.connect(self._tick)
+        self.fps = fps
+    # end def __init__
+
+    @property
+    def fps(self):
+        """The target frames per second."""
+        return 1000.0 / self._timer.interval()
+    # end def fps
+
+    @fps.setter
+    def fps(self, fps):
+        """Set the target frames per second."""
+        self._timer.setInterval(max(1, int(1000.0 / fps)))
+    # end def fps
+
+    def slide(self, widget, start, end, duration=100, finished=None):
+        """Move the widget from the start to the end position.
+
+        A running slide of the widget is replaced.
+        Args:
+            widget (QWidget): The widget.
+            start (QPoint): The start position.
+            end (QPoint): The end position.
+            duration (int): The duration in milliseconds.
+            finished (callable): Called once the end is reached.
+        """
+        slide = self._slides.get(widget)
+        if slide is None:
+            slide = self._unused.pop() if self._unused else _Slide()
+            self._slides[widget] = slide
+        # end if
+        slide.setup(QtCore.QPoint(start), QtCore.QPoint(end),
+                    max(duration, 1) / 1000.0, time.time(), finished)
+        widget.move(start)
+        if not self._timer.isActive():
+            self._last_tick = None
+            self._frame_times.clear()
+            self._timer.start()
+        # end if
+    # end def slide
+
+    def stop(self, widget):
+        """Stop the slide of the widget where it is.
+
+        Args:
+            widget (QWidget): The widget.
+        """
+        slide = self._slides.pop(widget, None)
+        if slide is not None:
+            slide.finished = None
+            self._unused.append(slide)
+        # end if
+    # end def stop
+
+    def is_animating(self, widget=None):
+        """Whether the widget, or any widget, is being animated."""
+        if widget is None:
+            return bool(self._slides)
+        # end if
+        return widget in self._slides
+    # end def is_animating
+
+    def active_count(self):
+        """The number of running slides."""
+        return len(self._slides)
+    # end def active_count
+
+    def measured_fps(self):
+        """The frames per second measured over the recent frames."""
+        if len(self._frame_times) < 2:
+            return 0.0
+        # end if
+        elapsed = self._frame_times[-1] - self._frame_times[0]
+        if elapsed <= 0:
+            return 0.0
+        # end if
+        return (len(self._frame_times) - 1) / elapsed
+    # end def measured_fps
+
+    @instrumentation.timed('Animator.tick')
+    def _tick(self):
+        """Advance all slides by one frame."""
+        now = time.time()
+        interval = self._timer.interval() / 1000.0
+        if self._last_tick is not None:
+            self.dropped_frames += max(
+                0, int((now - self._last_tick) / interval + 0.5) - 1)
+        # end if
+        self._last_tick = now
+        self.frames += 1
+        self._frame_times.append(now)
+        finished = list()
+        for widget, slide in list(self._slides.items()):
+            progress = min(1.0, (now - slide.started) / slide.duration)
+            value = self.easing.valueForProgress(progress)
+            try:
+                widget.move(
+                    int(slide.start.x() +
+                        (slide.end.x() - slide.start.x()) * value),
+                    int(slide.start.y() +
+                        (slide.end.y() - slide.start.y()) * value))
+            except RuntimeError:
+                # The C++ object of the widget has already been deleted
+                progress = 1.0
+                slide.finished = None
+            # end try
+            if progress >= 1.0:
+                if instrumentation.is_enabled():
+                    instrumentation.record('Animator.slide',
+                                           now - slide.started)
+                # end if
+                del self._slides[widget]
+                finished.append(slide.finished)
+                slide.finished = None
+                self._unused.append(slide)
+            # end if
+        # end for
+        if not self._slides:
+            self._timer.stop()
+        # end if
+        for callback in finished:
+            if callback is not None:
+                callback()
+            # end if
+        # end for
+    # end def _tick
+# end class Animator
+
+
+def animator():
+    """The Animator shared by the widgets.
+
+    Returns:
+        The Animator, created on first use.
+    """
+    global _animator
+    if _animator is None:
+        _animator = Animator()
+    # end if
+    return _animator
+# end def animator
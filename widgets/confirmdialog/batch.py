@@ -0,0 +1,229 @@
+"""Coalesce many confirmation requests into one dialog.
+
+Requests with the same title and buttons arriving within a short window
+are shown together in one ConfirmDialog, listing the messages of the
+requests in its inner widget. The user answers all of them with one of
+the buttons, or picks the items to confirm and applies the selection.
+Every requester gets its own answer.
+"""
+from functools import partial
+
+from concurrent.futures import Future
+
+from Qt import QtCore, QtWidgets
+
+from widgets.confirmdialog.confirmqueue import default_queue
+__all__ = ['BatchConfirmer', 'BatchWidget']
+
+
+# The button answering the checked items with the default button and
+# the others with the cancel button
+APPLY_SELECTION = 'Apply selection'
+
+
+def _batch_key(options):
+    """The key of the batch a request with the given options joins.
+
+    Args:
+        options (dict): The options of the request.
+    Returns:
+        The hashable key, a unique key if an option is not hashable,
+        so the request is not batched.
+    """
+    key = tuple(sorted(options.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return object()
+    # end try
+    return key
+# end def _batch_key
+
+
+def _selection_answers(options):
+    """The answers for the checked and the unchecked items.
+
+    Args:
+        options (dict): The options of the requests.
+    Returns:
+        The default button, or the first button if the default is not
+        one of the buttons, and the cancel button, or the last button.
+    """
+    buttons = options['buttons']
+    default_button = options.get('default_button')
+    if default_button not in buttons:
+        default_button = buttons[0]
+    # end if
+    cancel_button = options.get('cancel_button')
+    if cancel_button not in buttons:
+        cancel_button = buttons[-1]
+    # end if
+    return default_button, cancel_button
+# end def _selection_answers
+
+
+class BatchWidget(QtWidgets.QWidget):
+    """Inner widget listing the items of a batch with checkboxes."""
+
+    def __init__(self, items, parent=None):
+        """Initialize the BatchWidget.
+
+        Args:
+            items (list[str]): The items, all checked initially.
+            parent (QWidget): The parent.
+        """
+        super(BatchWidget, self).__init__(parent)
+        self.focused_button = None
+        self.all_chk = QtWidgets.QCheckBox('All %d items' % len(items))
+        self.all_chk.setChecked(True)
+        self.all_chk.clicked.connect(self.set_all_checked)
+        self.list_wid = QtWidgets.QListWidget()
+        self.list_wid.setUniformItemSizes(True)
+        for text in items:
+            item = QtWidgets.QListWidgetItem(str(text))
+            item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+            item.setCheckState(QtCore.Qt.Checked)
+            self.list_wid.addItem(item)
+        # end for
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.all_chk)
+        layout.addWidget(self.list_wid)
+    # end def __init__
+
+    def set_all_checked(self, checked):
+        """Check or uncheck all items.
+
+        Args:
+            checked (bool): The new check state.
+        """
+        state = QtCore.Qt.Checked if checked else QtCore.Qt.Unchecked
+        for row in range(self.list_wid.count()):
+            self.list_wid.item(row).setCheckState(state)
+        # end for
+    # end def set_all_checked
+
+    def is_checked(self, row):
+        """Whether the item in the given row is checked.
+
+        Args:
+            row (int): The row.
+        Returns:
+            True if the item is checked.
+        """
+        return self.list_wid.item(row).checkState() == QtCore.Qt.Checked
+    # end def is_checked
+# end class BatchWidget
+
+
+class BatchConfirmer(QtCore.QObject):
+    """Collect the requests of a window and show them in one dialog.
+
+    The ask method matches ConfirmQueue.ask, so a BatchConfirmer can be
+    used as queue of a ConfirmBridge. The methods have to be called
+    from the GUI thread.
+    """
+
+    def __init__(self, window=0.2, queue=None, parent=None):
+        """Initialize the BatchConfirmer.
+
+        Args:
+            window (float): Seconds to wait for more requests after the
+                            first request of a batch.
+            queue (ConfirmQueue): Shows the dialogs, defaults to the
+                                  default queue.
+            parent (QObject): The parent.
+        """
+        super(BatchConfirmer, self).__init__(parent)
+        self.window = window
+        self.queue = queue
+        self._batches = dict()
+    # end def __init__
+
+    def ask(self, message=None, **options):
+        """Request the confirmation of an item.
+
+        Args:
+            message (str): Describes the item, listed in the dialog.
+            options: The other options of ConfirmDialog.reconfigure,
+                     requests with the same options are batched.
+        Returns:
+            A Future resolving to the answer for the item, the clicked
+            button or None if the dialog has been dismissed. Cancelling
+            the future withdraws the request.
+        """
+        options.setdefault('buttons', ('Confirm', 'Cancel'))
+        options['buttons'] = tuple(options['buttons'])
+        key = _batch_key(options)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = (options, list())
+            QtCore.QTimer.singleShot(int(self.window * 1000),
+                                     partial(self._flush, key))
+        # end if
+        future = Future()
+        batch[1].append((message, future))
+        return future
+    # end def ask
+
+    def current_dialog(self):
+        """The dialog currently shown by the queue or None."""
+        return self._queue().current_dialog()
+    # end def current_dialog
+
+    def _queue(self):
+        """The queue showing the dialogs."""
+        return self.queue or default_queue()
+    # end def _queue
+
+    def _flush(self, key):
+        """Show the dialog for the collected requests.
+
+        Args:
+            key (tuple): The key of the batch.
+        """
+        options, requests = self._batches.pop(key)
+        requests = [r for r in requests if not r[1].cancelled()]
+        if not requests:
+            return
+        # end if
+        options = dict(options)
+        if len(requests) == 1:
+            request = self._queue().ask(message=requests[0][0], **options)
+            request.add_done_callback(partial(self._dispatch, requests, None,
+                                              None))
+            return
+        # end if
+        widget = BatchWidget([message for message, _ in requests])
+        answers = _selection_answers(options)
+        buttons = options['buttons']
+        options['buttons'] = buttons[:-1] + (APPLY_SELECTION, ) + buttons[-1:]
+        options['inner_widget'] = widget
+        request = self._queue().ask(**options)
+        request.add_done_callback(partial(self._dispatch, requests, widget,
+                                          answers))
+    # end def _flush
+
+    def _dispatch(self, requests, widget, answers, request):
+        """Resolve the futures of the requests with their answers.
+
+        Args:
+            requests (list): The (message, future) of the requests.
+            widget (BatchWidget): The inner widget of the dialog.
+            answers (tuple): The answers for the checked and unchecked
+                             items, if the selection is applied.
+            request (Future): The resolved future of the dialog.
+        """
+        clicked = None if request.cancelled() else request.result()
+        for row, (_, future) in enumerate(requests):
+            if future.cancelled():
+                continue
+            # end if
+            answer = clicked
+            if clicked == APPLY_SELECTION:
+                answer = answers[0] if widget.is_checked(row) else answers[1]
+            # end if
+            future.set_result(answer)
+        # end for
+    # end def _dispatch
+# end class BatchConfirmer
@@ -0,0 +1,167 @@
+"""Request confirmations from worker threads.
+
+Dialogs can only be created on the GUI thread. The ConfirmBridge
+relays the request with a queued signal to the GUI thread, where it is
+shown by a ConfirmQueue, and blocks only the calling worker until the
+answer arrives. The workers wait on their future, no thread is created
+per request.
+"""
+import threading
+from functools import partial
+
+from concurrent.futures import Future, TimeoutError
+
+from Qt import QtCore
+
+from widgets.confirmdialog.confirmqueue import default_queue
+__all__ = ['ConfirmBridge', 'confirm_from_thread']
+
+
+_default_bridge = None
+_default_bridge_lock = threading.Lock()
+
+
+class ConfirmBridge(QtCore.QObject):
+    """Marshal confirmation requests onto the GUI thread."""
+
+    # Relays a (future, options) request to the GUI thread
+    _requested = QtCore.Signal(object)
+
+    # Relays a timed out request to the GUI thread
+    _withdrawn = QtCore.Signal(object)
+
+    def __init__(self, queue=None):
+        """Initialize the ConfirmBridge.
+
+        The bridge lives in the GUI thread, wherever it is created.
+        Args:
+            queue (ConfirmQueue): Shows the dialogs, defaults to the
+                                  default queue.
+        """
+        super(ConfirmBridge, self).__init__()
+        self.queue = queue
+        self._lock = threading.Lock()
+        self.moveToThread(QtCore.QCoreApplication.instance().thread())
+        self._requested.connect(self._ask, QtCore.Qt.QueuedConnection)
+        self._withdrawn.connect(self._withdraw, QtCore.Qt.QueuedConnection)
+    # end def __init__
+
+    def confirm(self, timeout=None, default=None, **options):
+        """Ask for a confirmation and wait for the answer.
+
+        Must not be called from the GUI thread, use ConfirmQueue.ask
+        there.
+        Args:
+            timeout (float): Seconds to wait for the answer, None to
+                             wait until the dialog closes.
+            default (object): Returned if the timeout expires, the
+                              dialog is withdrawn.
+            options: The options of ConfirmDialog.reconfigure.
+        Returns:
+            The clicked button, None if the dialog has been dismissed.
+        """
+        if QtCore.QThread.currentThread() == self.thread():
+            raise RuntimeError('confirm would block the GUI thread, '
+                               'use ConfirmQueue.ask instead')
+        # end if
+        answer = Future()
+        self._requested.emit((answer, options))
+        try:
+            return answer.result(timeout)
+        except TimeoutError:
+            with self._lock:
+                withdrawn = answer.cancel()
+            # end with
+            if not withdrawn:
+                return answer.result()
+            # end if
+            self._withdrawn.emit(answer)
+            return default
+        # end try
+    # end def confirm
+
+    def _ask(self, request):
+        """Show the requested dialog, runs in the GUI thread.
+
+        Args:
+            request (tuple): The answer future and the options.
+        """
+        answer, options = request
+        if answer.cancelled():
+            return
+        # end if
+        queue = self.queue or default_queue()
+        answer.request = queue.ask(**options)
+        answer.request.add_done_callback(partial(self._relay, answer))
+    # end def _ask
+
+    def _relay(self, answer, request):
+        """Pass the answer on to the waiting worker.
+
+        Args:
+            answer (Future): The future the worker waits on.
+            request (Future): The resolved future of the ConfirmQueue.
+        """
+        with self._lock:
+            if answer.cancelled():
+                return
+            # end if
+            if request.cancelled():
+                answer.set_result(None)
+            elif request.exception() is not None:
+                answer.set_exception(request.exception())
+            else:
+                answer.set_result(request.result())
+            # end if
+        # end with
+    # end def _relay
+
+    def _withdraw(self, answer):
+        """Remove the dialog of a timed out request, runs in the GUI thread.
+
+        Args:
+            answer (Future): The cancelled future of the worker.
+        """
+        request = getattr(answer, 'request', None)
+        if request is None or request.cancel():
+            return
+        # end if
+        queue = self.queue or default_queue()
+        dialog = queue.current_dialog()
+        if not request.done() and dialog is not None:
+            dialog.cancel(None)
+        # end if
+    # end def _withdraw
+# end class ConfirmBridge
+
+
+def default_bridge():
+    """The ConfirmBridge used by confirm_from_thread.
+
+    Returns:
+        The bridge, created on first use.
+    """
+    global _default_bridge
+    with _default_bridge_lock:
+        if _default_bridge is None:
+            _default_bridge = ConfirmBridge()
+        # end if
+    # end with
+    return _default_bridge
+# end def default_bridge
+
+
+def confirm_from_thread(timeout=None, default=None, **options):
+    """Ask for a confirmation from a worker thread.
+
+    See ConfirmBridge.confirm.
+    Args:
+        timeout (float): Seconds to wait for the answer.
+        default (object): Returned if the timeout expires.
+        options: The options of ConfirmDialog.reconfigure.
+    Returns:
+        The clicked button.
+    """
+    return default_bridge().confirm(timeout=timeout, default=default,
+                                    **options)
+# end def confirm_from_thread
@@ -1,11 +1,134 @@
 """Animated confirm dialog for a better guidance of the user."""
+import types
 from functools import partial
 
 from Qt import QtCore, QtWidgets
 
-from widgets import utility
+from widgets import diagnostics, utility
+from widgets.animation import animator
+from widgets.geometry import screens
+from widgets.instrumentation import timed
 from widgets.loadingdialog.loadingdialog import LoadingDialog
-__all__ = ['ConfirmDialog']
+__all__ = ['ConfirmDialog', 'clear_idle_backgrounds',
+           'clear_inner_widget_cache']
+
+
+# The lazily built inner widgets, by the inner_widget_key
+_inner_widget_cache = dict()
+
+
+class _LazyInnerWidget(object):
+    """Build an inner widget from a factory, possibly in steps.
+
+    A factory returning a generator yields the widget first, every
+    further next() call builds the next chunk of it.
+    """
+
+    def __init__(self, factory):
+        """Initialize the _LazyInnerWidget.
+
+        Args:
+            factory (callable): Returns the widget or a generator.
+        """
+        self.factory = factory
+        self.widget = None
+        self._steps = None
+    # end def __init__
+
+    def step(self):
+        """Run the next build step.
+
+        Returns:
+            True once the widget is complete.
+        """
+        try:
+            if self.widget is None:
+                result = self.factory()
+                if isinstance(result, types.GeneratorType):
+                    self._steps = result
+                    self.widget = next(result)
+                else:
+                    self.widget = result
+                # end if
+            elif self._steps is not None:
+                try:
+                    next(self._steps)
+                except StopIteration:
+                    self._steps = None
+                # end try
+            # end if
+        except Exception:
+            # A failed build is not continued
+            self._steps = None
+            raise
+        # end try
+        return self._steps is None
+    # end def step
+
+    def is_alive(self):
+        """Whether the built widget, if any, has not been destroyed."""
+        if self.widget is None:
+            return True
+        # end if
+        try:
+            self.widget.objectName()
+        except RuntimeError:
+            # The C++ object of the widget has already been deleted
+            return False
+        # end try
+        return True
+    # end def is_alive
+# end class _LazyInnerWidget
+
+
+def clear_inner_widget_cache():
+    """Forget the cached inner widgets."""
+    _inner_widget_cache.clear()
+# end def clear_inner_widget_cache
+
+
+# The number of closed background overlays kept for the next dialogs
+MAX_IDLE_BACKGROUNDS = 2
+
+_idle_backgrounds = list()
+
+
+def _acquire_background():
+    """A background overlay, recycled from a closed dialog if possible.
+
+    Returns:
+        The LoadingDialog.
+    """
+    if _idle_backgrounds:
+        return _idle_backgrounds.pop()
+    # end if
+    return LoadingDialog()
+# end def _acquire_background
+
+
+def _release_background(background):
+    """Close the background overlay and keep it for the next dialog.
+
+    Closing releases its snapshot, the overlay is destroyed if enough
+    overlays are idle.
+    Args:
+        background (LoadingDialog): The overlay.
+    """
+    background.close()
+    if len(_idle_backgrounds) < MAX_IDLE_BACKGROUNDS:
+        _idle_backgrounds.append(background)
+    else:
+        background.deleteLater()
+    # end if
+# end def _release_background
+
+
+def clear_idle_backgrounds():
+    """Destroy the background overlays kept for reuse."""
+    while _idle_backgrounds:
+        _idle_backgrounds.pop().deleteLater()
+    # end while
+# end def clear_idle_backgrounds
 
 
 class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
@@ -15,6 +138,9 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
     screen width. The dialog slides out to right when closed.
     """
 
+    # Emitted once the dialog has been closed
+    closed = QtCore.Signal()
+
     def __init__(self,
                  parent=None,
                  title='Confirm Dialog',
@@ -25,7 +151,9 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
                  cancel_button='Cancel',
                  inner_widget=None,
                  size=None,
-                 auto_raise=True):
+                 auto_raise=True,
+                 inner_widget_key=None,
+                 delete_on_close=False):
         """Initialize the ConfirmDialog.
 
         Args:
@@ -35,21 +163,92 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
             default_button (str): The preselected button.
             cancel_button (str): The cancel button.
             inner_widget (str): A qt widget that is to be displayed in
-                                the ConfirmDialog.
+                                the ConfirmDialog, or a callable
+                                building it when the dialog is shown.
+                                If the callable returns a generator,
+                                its first item is the widget and each
+                                further item ends a chunk of the build,
+                                one chunk is built per event loop
+                                iteration.
             size ((int, int)): The size of the dialog.
             auto_raise (bool): Whether to automatically raise the dialog.
+            inner_widget_key (hashable): Caches the widget built by the
+                                         inner_widget callable for all
+                                         dialogs using the same key.
+            delete_on_close (bool): Whether to destroy the dialog once
+                                    closed.
         """
         super(ConfirmDialog, self).__init__(parent=parent)
+        self.animation_speed = 100
+        self.background = None
+        self.inner_widget = None
+        self.buttons = list()
+        self._lazy_inner_widget = None
+        self._inner_widget_timer = QtCore.QTimer(self)
+        self._inner_widget_timer.setInterval(0)
+        self._inner_widget_timer.timeout.connect(self._build_inner_widget)
+        self.setWindowFlags(QtCore.Qt.Widget |
+                            QtCore.Qt.FramelessWindowHint |
+                            QtCore.Qt.WindowStaysOnTopHint)
+        self.setAttribute(QtCore.Qt.WA_DeleteOnClose, delete_on_close)
+        diagnostics.track(self)
+
+        self.reconfigure(title=title, subtitle=subtitle, message=message,
+                         buttons=buttons, default_button=default_button,
+                         cancel_button=cancel_button,
+                         inner_widget=inner_widget, size=size,
+                         inner_widget_key=inner_widget_key)
+
+        if auto_raise:
+            self.exec_()
+    # end def __init__
+
+    def reconfigure(self,
+                    title='Confirm Dialog',
+                    subtitle='Please cancel or confirm',
+                    message=None,
+                    buttons=('Confirm', 'Cancel'),
+                    default_button='Confirm',
+                    cancel_button='Cancel',
+                    inner_widget=None,
+                    size=None,
+                    inner_widget_key=None):
+        """Reset the dialog and apply new content, so it can be reused.
+
+        The arguments are the same as for the initialization. The
+        dialog has to be hidden.
+        """
         self.title = title
         self.subtitle = subtitle
         self.message = message
         self.default_button = default_button
         self.cancel_button = cancel_button
+        self.inner_widget_key = inner_widget_key
+        self._inner_widget_timer.stop()
+        self._lazy_inner_widget = None
+        if callable(inner_widget):
+            if inner_widget_key is None:
+                self._lazy_inner_widget = _LazyInnerWidget(inner_widget)
+            else:
+                lazy = _inner_widget_cache.get(inner_widget_key)
+                if lazy is None or not lazy.is_alive():
+                    lazy = _LazyInnerWidget(inner_widget)
+                    _inner_widget_cache[inner_widget_key] = lazy
+                # end if
+                self._lazy_inner_widget = lazy
+            # end if
+            # A cached widget is shown right away
+            inner_widget = self._lazy_inner_widget.widget
+        # end if
+        previous = self.inner_widget
+        if previous is not None and previous is not inner_widget:
+            self.inner_widget_wid.layout().removeWidget(previous)
+            previous.setParent(None)
+        # end if
         self.inner_widget = inner_widget
 
         self.status = False
         self.clicked_button = None
-        self.animation_speed = 100
         self.focused_button = None
 
         if size is not None:
@@ -58,25 +257,28 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
 
         self._setup_ui()
         self._setup_buttons(buttons)
-
-        self.background = LoadingDialog()
-
-        if auto_raise:
-            self.exec_()
-    # end def __init__
+    # end def reconfigure
 
     def show(self):
         """Show the blurred background."""
-        self.background.show()
+        self._show_background()
         super(ConfirmDialog, self).show()
     # end def show
 
     def exec_(self):
         """Show the blurred background."""
-        self.background.show()
+        self._show_background()
         super(ConfirmDialog, self).exec_()
     # end def exec_
 
+    def _show_background(self):
+        """Show a background overlay, it is given back on close."""
+        if self.background is None:
+            self.background = _acquire_background()
+        # end if
+        self.background.show()
+    # end def _show_background
+
     def _setup_ui(self):
         """Set up the UI.
 
@@ -87,24 +289,37 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
         self.setWindowTitle(self.title)
         self.title_lbl.setText(self.title)
         self.subtitle_lbl.setText(self.subtitle)
-        self.setWindowFlags(QtCore.Qt.Widget |
-                            QtCore.Qt.FramelessWindowHint |
-                            QtCore.Qt.WindowStaysOnTopHint)
         if self.message is not None:
             self.message_lbl.setText(self.message)
+            self.message_lbl.show()
         else:
             self.message_lbl.hide()
         # end if
         if self.inner_widget is not None:
-            self.inner_widget.dialog = self
-            self.inner_widget_wid.layout().addWidget(self.inner_widget)
+            self._add_inner_widget()
+            self.inner_widget_wid.show()
+        elif self._lazy_inner_widget is not None:
+            self.inner_widget_wid.show()
         else:
             self.inner_widget_wid.hide()
         # end if
     # end def _setup_ui
 
+    def _add_inner_widget(self):
+        """Put the inner widget into the dialog, unless it is already."""
+        self.inner_widget.dialog = self
+        layout = self.inner_widget_wid.layout()
+        if layout.indexOf(self.inner_widget) < 0:
+            layout.addWidget(self.inner_widget)
+        # end if
+    # end def _add_inner_widget
+
     def _setup_buttons(self, buttons):
         """Set up the buttons with the correct signals."""
+        for button in self.buttons:
+            self.actions_wid.layout().removeWidget(button)
+            button.deleteLater()
+        # end for
         self.buttons = list()
         for i, button_name in enumerate(buttons):
             button = QtWidgets.QPushButton(button_name)
@@ -137,18 +352,69 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
         # end for
     # end def _focus_button
 
+    @timed('ConfirmDialog.show_event')
     def showEvent(self, event):
-        """Run the start animation."""
+        """Run the start animation, then build a lazy inner widget."""
         self._start_animation()
+        if self.inner_widget is not None:
+            # A cached inner widget is detached on close
+            self._add_inner_widget()
+        # end if
+        if self._lazy_inner_widget is not None:
+            self._inner_widget_timer.start()
+        # end if
         event.accept()
     # end def showEvent
 
+    @timed('ConfirmDialog.close_event')
     def closeEvent(self, event):
-        """Close the blurred background too."""
-        self.background.close()
+        """Close the blurred background too and give it back."""
+        self._inner_widget_timer.stop()
+        animator().stop(self)
+        self._detach_cached_inner_widget()
+        if self.background is not None:
+            _release_background(self.background)
+            self.background = None
+        # end if
         event.accept()
+        self.closed.emit()
     # end def closeEvent
 
+    def _detach_cached_inner_widget(self):
+        """Take a cached inner widget out, so it survives the dialog.
+
+        The widget is put back if the dialog is shown again.
+        """
+        if self.inner_widget_key is None or self.inner_widget is None:
+            return
+        # end if
+        self.inner_widget_wid.layout().removeWidget(self.inner_widget)
+        self.inner_widget.setParent(None)
+        self.inner_widget.dialog = None
+    # end def _detach_cached_inner_widget
+
+    def _build_inner_widget(self):
+        """Run the next build step of the lazy inner widget.
+
+        A failing build step stops the building, its exception is
+        raised once.
+        """
+        lazy = self._lazy_inner_widget
+        done = True
+        try:
+            done = lazy.step()
+        finally:
+            if done:
+                self._inner_widget_timer.stop()
+            # end if
+        # end try
+        if lazy.widget is not None and self.inner_widget is not lazy.widget:
+            self.inner_widget = lazy.widget
+            self._add_inner_widget()
+        # end if
+    # end def _build_inner_widget
+
+    @timed('ConfirmDialog.key_press_event')
     def keyPressEvent(self, event):
         """Integrate key signals into to dialog.
 
@@ -224,29 +490,26 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
         self._end_animation()
     # end def cancel
 
+    @timed('ConfirmDialog.start_animation')
     def _start_animation(self):
         """Execute the start animation.
 
         Slides the dialog into the screen from the left side.
         """
-        self.start_anim = QtCore.QPropertyAnimation(self, 'geometry')
-        self.start_anim.setDuration(self.animation_speed)
-        self.start_anim.setStartValue(self._get_start_geometry())
-        self.start_anim.setEndValue(self._get_display_geometry())
-        self.start_anim.start()
+        display_geometry = self._get_display_geometry()
+        self.setGeometry(display_geometry)
+        animator().slide(self, self._get_start_geometry().topLeft(),
+                         display_geometry.topLeft(), self.animation_speed)
     # end def _start_animation
 
+    @timed('ConfirmDialog.end_animation')
     def _end_animation(self):
         """Execute the end animation.
 
         Slides the dialog out to the right.
         """
-        self.end_anim = QtCore.QPropertyAnimation(self, 'geometry')
-        self.end_anim.setDuration(self.animation_speed)
-        self.end_anim.setStartValue(self.geometry())
-        self.end_anim.setEndValue(self._get_end_geometry())
-        self.end_anim.finished.connect(self.close)
-        self.end_anim.start()
+        animator().slide(self, self.pos(), self._get_end_geometry().topLeft(),
+                         self.animation_speed, finished=self.close)
     # end def _end_animation
 
     def _get_start_geometry(self):
@@ -255,10 +518,9 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
         Returns:
             A QRect with the correct geometry data.
         """
-        desktop = QtWidgets.QApplication.instance().desktop()
-        available_geometry = desktop.screenGeometry(QtWidgets.QCursor().pos())
+        available_geometry = screens().screen_geometry()
         x = available_geometry.x() - self.width()
-        y = (available_geometry.height()/2) - (self.height()/2)
+        y = self._get_center_y(available_geometry)
         w = self.width()
         h = self.height()
         return QtCore.QRect(x, y, w, h)
@@ -270,10 +532,9 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
         Returns:
             A QRect with the correct geometry data.
         """
-        desktop = QtWidgets.QApplication.instance().desktop()
-        available_geometry = desktop.screenGeometry(QtWidgets.QCursor().pos())
+        available_geometry = screens().screen_geometry()
         x = available_geometry.x()
-        y = (available_geometry.height()/2) - (self.height()/2)
+        y = self._get_center_y(available_geometry)
         w = available_geometry.width()
         h = self.height()
         return QtCore.QRect(x, y, w, h)
@@ -285,14 +546,25 @@ class ConfirmDialog(utility.ui_class(__file__, 'ConfirmDialog')):
         Returns:
             A QRect with the correct geometry data.
         """
-        desktop = QtWidgets.QApplication.instance().desktop()
-        available_geometry = desktop.screenGeometry(QtWidgets.QCursor().pos())
+        available_geometry = screens().screen_geometry()
         x = available_geometry.x() + available_geometry.width()
-        y = (available_geometry.height()/2) - (self.height()/2)
+        y = self._get_center_y(available_geometry)
         w = 0
         h = self.height()
         return QtCore.QRect(x, y, w, h)
     # end def _get_end_geometry
+
+    def _get_center_y(self, available_geometry):
+        """The y coordinate centering the dialog on the screen.
+
+        Args:
+            available_geometry (QRect): The geometry of the screen.
+        Returns:
+            The y coordinate, including the offset of the screen.
+        """
+        return (available_geometry.y() +
+                (available_geometry.height() - self.height()) // 2)
+    # end def _get_center_y
 # end class ConfirmDialog
 
 
@@ -0,0 +1,174 @@
+"""Ask for confirmations without blocking the caller.
+
+ConfirmDialog.exec_ spins a nested event loop until the dialog closes.
+The ConfirmQueue shows the dialogs with show instead and resolves a
+future with the clicked button once the dialog has closed. Requests
+made while a dialog is shown wait in line, so only one dialog is shown
+at a time.
+"""
+from collections import deque
+from functools import partial
+
+from concurrent.futures import Future
+
+from Qt import QtCore
+
+from widgets.confirmdialog.confirmdialog import ConfirmDialog
+__all__ = ['ConfirmQueue', 'ask', 'ask_async']
+
+
+_default_queue = None
+
+
+class ConfirmQueue(QtCore.QObject):
+    """Show the requested confirmations one after another.
+
+    The methods have to be called from the GUI thread.
+    """
+
+    def __init__(self, pool=None, parent=None):
+        """Initialize the ConfirmQueue.
+
+        Args:
+            pool (DialogPool): Provides the dialogs, they are built on
+                               demand otherwise.
+            parent (QObject): The parent.
+        """
+        super(ConfirmQueue, self).__init__(parent)
+        self.pool = pool
+        self._pending = deque()
+        self._current = None
+    # end def __init__
+
+    def ask(self, **options):
+        """Request a confirmation.
+
+        Args:
+            options: The options of ConfirmDialog.reconfigure.
+        Returns:
+            A Future resolving to the clicked button, None if the dialog
+            has been dismissed. The dialog is available as the dialog
+            attribute of the future once resolved. Cancelling the future
+            before the dialog is shown withdraws the request.
+        """
+        future = Future()
+        self._pending.append((future, options))
+        if self._current is None:
+            self._show_next()
+        # end if
+        return future
+    # end def ask
+
+    def ask_async(self, loop=None, **options):
+        """Request a confirmation from a coroutine.
+
+        The asyncio event loop has to run on the Qt event loop, e.g.
+        with qasync.
+        Args:
+            loop (asyncio.AbstractEventLoop): The loop, defaults to the
+                                              current event loop.
+            options: The options of ConfirmDialog.reconfigure.
+        Returns:
+            An awaitable resolving to the clicked button.
+        """
+        import asyncio
+        return asyncio.wrap_future(self.ask(**options), loop=loop)
+    # end def ask_async
+
+    def pending_count(self):
+        """The number of requests waiting for their dialog."""
+        return len(self._pending)
+    # end def pending_count
+
+    def current_dialog(self):
+        """The dialog currently shown or None."""
+        return self._current[1] if self._current is not None else None
+    # end def current_dialog
+
+    def _show_next(self):
+        """Show the dialog of the next request, if any."""
+        while self._pending:
+            future, options = self._pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            # end if
+            if self.pool is not None:
+                dialog = self.pool.acquire(**options)
+            else:
+                dialog = ConfirmDialog(auto_raise=False, **options)
+            # end if
+            self._current = (future, dialog)
+            dialog.closed.connect(self._dialog_closed)
+            dialog.show()
+            return
+        # end while
+        self._current = None
+    # end def _show_next
+
+    def _dialog_closed(self):
+        """Resolve the future once the closed dialog has been hidden.
+
+        A done callback of the future may ask for the next confirmation
+        right away, which can get the same dialog from the pool. So the
+        closing dialog has to finish first.
+        """
+        future, dialog = self._current
+        dialog.closed.disconnect(self._dialog_closed)
+        QtCore.QTimer.singleShot(0, partial(self._resolve, future, dialog))
+    # end def _dialog_closed
+
+    def _resolve(self, future, dialog):
+        """Resolve the future of the closed dialog, show the next one.
+
+        Args:
+            future (Future): The future of the request.
+            dialog (ConfirmDialog): The closed dialog.
+        """
+        self._current = None
+        future.dialog = dialog
+        future.set_result(dialog.clicked_button)
+        if self._current is None:
+            self._show_next()
+        # end if
+    # end def _resolve
+# end class ConfirmQueue
+
+
+def default_queue():
+    """The ConfirmQueue used by ask and ask_async.
+
+    Returns:
+        The queue, created on first use.
+    """
+    global _default_queue
+    if _default_queue is None:
+        _default_queue = ConfirmQueue()
+    # end if
+    return _default_queue
+# end def default_queue
+
+
+def ask(**options):
+    """Request a confirmation on the default queue, see ConfirmQueue.ask.
+
+    Args:
+        options: The options of ConfirmDialog.reconfigure.
+    Returns:
+        A Future resolving to the clicked button.
+    """
+    return default_queue().ask(**options)
+# end def ask
+
+
+def ask_async(loop=None, **options):
+    """Request a confirmation from a coroutine on the default queue.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): The loop, defaults to the
+                                          current event loop.
+        options: The options of ConfirmDialog.reconfigure.
+    Returns:
+        An awaitable resolving to the clicked button.
+    """
+    return default_queue().ask_async(loop=loop, **options)
+# end def ask_async
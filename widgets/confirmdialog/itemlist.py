@@ -0,0 +1,255 @@
+"""Inner widget listing a large number of items.
+
+The items are pulled from an iterator in batches, only when the view
+scrolls towards the end of the fetched items, so listing 100k paths
+neither builds 100k widgets nor materializes the whole list up front.
+"""
+import itertools
+import sys
+
+from Qt import QtCore, QtWidgets
+__all__ = ['LazyListModel', 'ItemListWidget']
+
+
+try:
+    _text_type = unicode
+except NameError:
+    _text_type = str
+# end try
+
+
+def display_text(item):
+    """The default display text of an item, unicode on Python 2 too.
+
+    Args:
+        item: The item, byte strings are decoded with the file system
+              encoding.
+    Returns:
+        The text.
+    """
+    if isinstance(item, bytes):
+        return item.decode(sys.getfilesystemencoding() or 'utf-8', 'replace')
+    # end if
+    return _text_type(item)
+# end def display_text
+
+
+class LazyListModel(QtCore.QAbstractListModel):
+    """List model fetching its items lazily from an iterator.
+
+    The filter is a case insensitive substring match on the display
+    text. It only scans the items fetched so far, further items are
+    filtered as they are fetched. A fetch with a filter may add no rows,
+    canFetchMore stays True until the iterator is exhausted.
+    """
+
+    def __init__(self, items, batch_size=500, display=display_text,
+                 parent=None):
+        """Initialize the LazyListModel.
+
+        Args:
+            items (iterable): The items, e.g. a generator.
+            batch_size (int): The number of items fetched at once.
+            display (callable): Returns the text of an item.
+            parent (QObject): The parent.
+        """
+        super(LazyListModel, self).__init__(parent)
+        self.batch_size = batch_size
+        self.display = display
+        self._source = iter(items)
+        self._exhausted = False
+        self._items = list()
+        self._texts = list()
+        self._filter = ''
+        self._rows = None
+    # end def __init__
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """The number of fetched items matching the filter."""
+        if parent.isValid():
+            return 0
+        # end if
+        return len(self._items if self._rows is None else self._rows)
+    # end def rowCount
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """The display text of the item."""
+        if not index.isValid() or role not in (QtCore.Qt.DisplayRole,
+                                               QtCore.Qt.ToolTipRole):
+            return None
+        # end if
+        return self._texts[self.source_row(index.row())]
+    # end def data
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        """Whether the iterator has more items."""
+        return not parent.isValid() and not self._exhausted
+    # end def canFetchMore
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        """Fetch the next batch of items.
+
+        With a filter, the batch may not add any matching rows.
+        """
+        if parent.isValid() or self._exhausted:
+            return
+        # end if
+        batch = list(itertools.islice(self._source, self.batch_size))
+        if len(batch) < self.batch_size:
+            self._exhausted = True
+        # end if
+        start = len(self._items)
+        texts = [self.display(item) for item in batch]
+        if self._rows is None:
+            new_rows = None
+            count = len(batch)
+        else:
+            new_rows = [start + i for i, text in enumerate(texts)
+                        if self._matches(text)]
+            count = len(new_rows)
+        # end if
+        first = self.rowCount()
+        if count:
+            self.beginInsertRows(QtCore.QModelIndex(), first,
+                                 first + count - 1)
+        # end if
+        self._items.extend(batch)
+        self._texts.extend(texts)
+        if new_rows is not None:
+            self._rows.extend(new_rows)
+        # end if
+        if count:
+            self.endInsertRows()
+        # end if
+    # end def fetchMore
+
+    def set_filter(self, text):
+        """Show only the items containing the text.
+
+        Narrowing the filter only scans the currently matching items.
+        Args:
+            text (str): The filter, an empty string shows all items.
+        """
+        text = text.lower()
+        if text == self._filter:
+            return
+        # end if
+        narrowing = self._rows is not None and text.startswith(self._filter)
+        self.beginResetModel()
+        self._filter = text
+        if not text:
+            self._rows = None
+        elif narrowing:
+            self._rows = [r for r in self._rows
+                          if self._matches(self._texts[r])]
+        else:
+            self._rows = [r for r, t in enumerate(self._texts)
+                          if self._matches(t)]
+        # end if
+        self.endResetModel()
+    # end def set_filter
+
+    def source_row(self, row):
+        """The index of the item shown in the given row.
+
+        Args:
+            row (int): The row of the model.
+        Returns:
+            The index of the item in the fetched items.
+        """
+        return row if self._rows is None else self._rows[row]
+    # end def source_row
+
+    def item(self, row):
+        """The item shown in the given row."""
+        return self._items[self.source_row(row)]
+    # end def item
+
+    def _matches(self, text):
+        """Whether the text matches the current filter."""
+        return self._filter in text.lower()
+    # end def _matches
+# end class LazyListModel
+
+
+class ItemListWidget(QtWidgets.QWidget):
+    """A filterable list of items for the ConfirmDialog.
+
+    Pass it as inner_widget to a ConfirmDialog.
+    """
+
+    # Milliseconds of typing pause before the filter is applied
+    filter_delay = 150
+
+    def __init__(self, items, batch_size=500, display=display_text,
+                 parent=None):
+        """Initialize the ItemListWidget.
+
+        Args:
+            items (iterable): The items, e.g. a generator.
+            batch_size (int): The number of items fetched at once.
+            display (callable): Returns the text of an item.
+            parent (QWidget): The parent.
+        """
+        super(ItemListWidget, self).__init__(parent)
+        # Enter in the dialog clicks the focused button of the inner widget
+        self.focused_button = None
+        self.model = LazyListModel(items, batch_size, display, self)
+        self.filter_le = QtWidgets.QLineEdit()
+        self.filter_le.setPlaceholderText('Filter')
+        self.list_view = QtWidgets.QListView()
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QtWidgets.QListView.Batched)
+        self.list_view.setSelectionMode(
+            QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.list_view.setModel(self.model)
+        self._filter_timer = QtCore.QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(self.filter_delay)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self.filter_le.textChanged.connect(self._schedule_filter)
+        # A filtered fetch may add no rows, so the view would stop fetching
+        self._fill_timer = QtCore.QTimer(self)
+        self._fill_timer.setSingleShot(True)
+        self._fill_timer.setInterval(0)
+        self._fill_timer.timeout.connect(self._fill)
+        self.list_view.verticalScrollBar().valueChanged.connect(
+            self._schedule_fill)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.filter_le)
+        layout.addWidget(self.list_view)
+    # end def __init__
+
+    def selected_items(self):
+        """The selected items."""
+        return [self.model.item(index.row()) for index in
+                self.list_view.selectionModel().selectedRows()]
+    # end def selected_items
+
+    def _schedule_filter(self, text):
+        """Apply the filter once the typing pauses."""
+        self._filter_timer.start()
+    # end def _schedule_filter
+
+    def _apply_filter(self):
+        """Filter the list by the text of the filter line edit."""
+        self.model.set_filter(self.filter_le.text())
+        self._fill_timer.start()
+    # end def _apply_filter
+
+    def _schedule_fill(self, *args):
+        """Fetch more items in the next event loop pass."""
+        self._fill_timer.start()
+    # end def _schedule_fill
+
+    def _fill(self):
+        """Fetch one batch per event loop pass until the view is filled."""
+        scroll_bar = self.list_view.verticalScrollBar()
+        if (self.model.canFetchMore() and
+                scroll_bar.value() >= scroll_bar.maximum()):
+            self.model.fetchMore()
+            self._fill_timer.start()
+        # end if
+    # end def _fill
+# end class ItemListWidget
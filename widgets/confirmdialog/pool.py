@@ -0,0 +1,121 @@
+"""A pool of pre-built ConfirmDialogs.
+
+Building a ConfirmDialog loads the Ui, creates the buttons and applies
+the stylesheets. The pool
+does this ahead of time, while the event loop is idle, and hands out
+the dialogs reconfigured with new content. Closed dialogs return to
+the pool instead of being destroyed.
+"""
+from functools import partial
+
+from Qt import QtCore
+
+from widgets.confirmdialog.confirmdialog import ConfirmDialog
+__all__ = ['DialogPool']
+
+
+class DialogPool(QtCore.QObject):
+    """Keep a number of idle ConfirmDialogs ready for use."""
+
+    def __init__(self, size=2, dialog_class=ConfirmDialog, parent=None):
+        """Initialize the DialogPool.
+
+        Args:
+            size (int): The maximum number of idle dialogs.
+            dialog_class (type): The ConfirmDialog class to build.
+            parent (QObject): The parent.
+        """
+        super(DialogPool, self).__init__(parent)
+        self.size = size
+        self.dialog_class = dialog_class
+        self.created = 0
+        self.reused = 0
+        self._idle = list()
+        self._prewarm_timer = QtCore.QTimer(self)
+        self._prewarm_timer.setInterval(0)
+        self._prewarm_timer.timeout.connect(self._prewarm_one)
+    # end def __init__
+
+    def prewarm(self):
+        """Fill the pool while the event loop is idle.
+
+        One dialog is built per event loop iteration, so the user
+        interface stays responsive.
+        """
+        if len(self._idle) < self.size:
+            self._prewarm_timer.start()
+        # end if
+    # end def prewarm
+
+    def acquire(self, **options):
+        """Get a dialog showing the given content.
+
+        Args:
+            options: The options of ConfirmDialog.reconfigure.
+        Returns:
+            An idle dialog or a new one if the pool is empty. It returns
+            to the pool once closed.
+        """
+        if self._idle:
+            dialog = self._idle.pop()
+            self.reused += 1
+        else:
+            dialog = self._create()
+        # end if
+        dialog.reconfigure(**options)
+        self.prewarm()
+        return dialog
+    # end def acquire
+
+    def release(self, dialog):
+        """Take the closed dialog back.
+
+        The dialog is destroyed if the pool is full.
+        Args:
+            dialog (ConfirmDialog): The dialog.
+        """
+        if dialog in self._idle:
+            return
+        # end if
+        if len(self._idle) < self.size:
+            self._idle.append(dialog)
+        else:
+            dialog.deleteLater()
+        # end if
+    # end def release
+
+    def idle_count(self):
+        """The number of dialogs ready for use."""
+        return len(self._idle)
+    # end def idle_count
+
+    def clear(self):
+        """Destroy the idle dialogs."""
+        self._prewarm_timer.stop()
+        for dialog in self._idle:
+            dialog.deleteLater()
+        # end for
+        self._idle = list()
+    # end def clear
+
+    def _prewarm_one(self):
+        """Build one dialog, stop once the pool is full."""
+        if len(self._idle) >= self.size:
+            self._prewarm_timer.stop()
+            return
+        # end if
+        self._idle.append(self._create())
+    # end def _prewarm_one
+
+    def _create(self):
+        """Build a dialog that returns to the pool once closed.
+
+        Returns:
+            The dialog.
+        """
+        dialog = self.dialog_class(auto_raise=False)
+        dialog.closed.connect(partial(self.release, dialog))
+        self.created += 1
+        return dialog
+    # end def _create
+# end class DialogPool
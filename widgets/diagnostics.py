@@ -0,0 +1,85 @@
+"""Opt-in tracking of the live objects of the widgets, to find leaks.
+
+Set WIDGETS_DIAGNOSTICS=1 or call enable() before the widgets are
+created. The tracked widgets are counted until their C++ object is
+destroyed. live_counts() reports them together with the cached screen
+snapshots and the running animations.
+"""
+import os
+from collections import defaultdict
+from functools import partial
+
+from widgets import animation
+from widgets.loadingdialog.snapshot import snapshot_cache
+__all__ = ['enable', 'disable', 'is_enabled', 'track', 'live_counts']
+
+
+_enabled = os.environ.get('WIDGETS_DIAGNOSTICS') == '1'
+_live = defaultdict(int)
+
+
+def enable():
+    """Start tracking the created widgets."""
+    global _enabled
+    _enabled = True
+# end def enable
+
+
+def disable():
+    """Stop tracking new widgets, tracked ones are still counted."""
+    global _enabled
+    _enabled = False
+# end def disable
+
+
+def is_enabled():
+    """Whether created widgets are tracked."""
+    return _enabled
+# end def is_enabled
+
+
+def track(obj, kind=None):
+    """Count the object as live until it is destroyed.
+
+    Args:
+        obj (QObject): The object.
+        kind (str): The name it is counted under, defaults to the
+                    class name.
+    """
+    if not _enabled:
+        return
+    # end if
+    kind = kind or obj.__class__.__name__
+    _live[kind] += 1
+    # The slot must not reference the object, or it would never die
+    obj.destroyed.connect(partial(_untrack, kind))
+# end def track
+
+
+def _untrack(kind, *args):
+    """Count a tracked object as destroyed.
+
+    Args:
+        kind (str): The name it is counted under.
+    """
+    _live[kind] -= 1
+# end def _untrack
+
+
+def live_counts():
+    """The live objects.
+
+    Returns:
+        The number of live tracked objects per kind, the cached
+        snapshots ('pixmaps'), the snapshots shown by a dialog
+        ('pixmaps_in_use'), their memory ('pixmap_bytes') and the
+        running animations ('animations').
+    """
+    counts = dict((kind, count) for kind, count in _live.items() if count)
+    counts['pixmaps'] = len(snapshot_cache)
+    counts['pixmaps_in_use'] = snapshot_cache.in_use()
+    counts['pixmap_bytes'] = snapshot_cache.nbytes()
+    counts['animations'] = (animation.animator().active_count()
+                            if animation._animator is not None else 0)
+    return counts
+# end def live_counts
@@ -0,0 +1,128 @@
+"""Cached geometry of the screens for positioning the widgets.
+
+Querying the desktop for the screen under the cursor on every animation
+step is comparatively slow. The ScreenGeometry reads the geometry of all
+screens once and keeps it until a screen is added, removed or resized.
+"""
+from Qt import QtCore, QtGui, QtWidgets
+__all__ = ['ScreenGeometry', 'screens']
+
+
+_screens = None
+
+
+class ScreenGeometry(QtCore.QObject):
+    """The geometry of the screens, invalidated on desktop changes."""
+
+    # Emitted after a screen has been added, removed or resized
+    changed = QtCore.Signal()
+
+    def __init__(self, app=None):
+        """Initialize the ScreenGeometry.
+
+        Args:
+            app (QApplication): The application, defaults to the current
+                                instance.
+        """
+        super(ScreenGeometry, self).__init__()
+        app = app or QtWidgets.QApplication.instance()
+        self.desktop = app.desktop()
+        self.queries = 0
+        self._screens = None
+        self._primary = 0
+        self._last_hit = 0
+        self.desktop.resized.connect(self.invalidate)
+        self.desktop.workAreaResized.connect(self.invalidate)
+        self.desktop.screenCountChanged.connect(self.invalidate)
+    # end def __init__
+
+    def invalidate(self, *args):
+        """Read the geometry again on the next request."""
+        self._screens = None
+        self.changed.emit()
+    # end def invalidate
+
+    def screen_at(self, pos=None):
+        """The screen containing the position.
+
+        Args:
+            pos (QPoint): The position, defaults to the cursor position.
+        Returns:
+            The index of the screen, the primary screen if no screen
+            contains the position.
+        """
+        screens = self._geometries()
+        if pos is None:
+            pos = QtGui.QCursor.pos()
+        # end if
+        if screens[self._last_hit][0].contains(pos):
+            return self._last_hit
+        # end if
+        for index, (geometry, _) in enumerate(screens):
+            if geometry.contains(pos):
+                self._last_hit = index
+                return index
+            # end if
+        # end for
+        return self._primary
+    # end def screen_at
+
+    def screen_geometry(self, screen=None):
+        """The full geometry of the screen.
+
+        Args:
+            screen (int): The screen, defaults to the screen under the
+                          cursor.
+        Returns:
+            A copy of the QRect of the screen.
+        """
+        if screen is None:
+            screen = self.screen_at()
+        # end if
+        return QtCore.QRect(self._geometries()[screen][0])
+    # end def screen_geometry
+
+    def available_geometry(self, screen=None):
+        """The geometry of the screen without task bars and docks.
+
+        Args:
+            screen (int): The screen, defaults to the screen under the
+                          cursor.
+        Returns:
+            A copy of the available QRect of the screen.
+        """
+        if screen is None:
+            screen = self.screen_at()
+        # end if
+        return QtCore.QRect(self._geometries()[screen][1])
+    # end def available_geometry
+
+    def _geometries(self):
+        """The full and available geometry per screen, read on demand."""
+        if self._screens is None:
+            self.queries += 1
+            count = max(1, self.desktop.screenCount())
+            self._screens = [(self.desktop.screenGeometry(i),
+                              self.desktop.availableGeometry(i))
+                             for i in range(count)]
+            self._primary = min(max(0, self.desktop.primaryScreen()),
+                                count - 1)
+            self._last_hit = self._primary
+        # end if
+        return self._screens
+    # end def _geometries
+# end class ScreenGeometry
+
+
+def screens():
+    """The ScreenGeometry shared by the widgets.
+
+    Returns:
+        The ScreenGeometry, created on first use.
+    """
+    global _screens
+    if _screens is None:
+        _screens = ScreenGeometry()
+    # end if
+    return _screens
+# end def screens
@@ -0,0 +1,263 @@
+"""Opt-in timing of the hot paths of the widgets.
+
+Set WIDGETS_INSTRUMENTATION=1 or call enable() to record timed spans
+around the ui loading, stylesheets, screen grab, blur, animations and
+event handling. The spans are aggregated per name into a count, the
+total, minimum and maximum time and a histogram. With
+WIDGETS_INSTRUMENTATION_FILE set, the statistics are written to that
+file as JSON when the process exits.
+
+While disabled, a timed function costs one extra call and a flag check.
+"""
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import timeit
+__all__ = ['enable', 'disable', 'is_enabled', 'span', 'timed', 'record',
+           'stats', 'reset', 'dump', 'add_exporter', 'export']
+
+
+# The upper bounds of the histogram buckets in milliseconds
+BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+_enabled = os.environ.get('WIDGETS_INSTRUMENTATION') == '1'
+_lock = threading.Lock()
+_stats = dict()
+_exporters = list()
+
+
+class _Stat(object):
+    """The aggregated spans of one name."""
+
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        """Initialize the _Stat."""
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(BUCKETS) + 1)
+    # end def __init__
+
+    def add(self, seconds):
+        """Add the duration of a span.
+
+        Args:
+            seconds (float): The duration.
+        """
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds * 1000)] += 1
+    # end def add
+
+    def as_dict(self):
+        """The statistics in milliseconds."""
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total * 1000 / self.count if self.count else 0,
+            'min_ms': (self.min or 0) * 1000,
+            'max_ms': (self.max or 0) * 1000,
+            'histogram': dict(
+                ('<=%sms' % bound if bound is not None else '>%sms' %
+                 BUCKETS[-1], count)
+                for bound, count in zip(BUCKETS + (None, ), self.buckets)
+                if count)}
+    # end def as_dict
+# end class _Stat
+
+
+class _Span(object):
+    """Context manager recording its duration."""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        """Initialize the _Span.
+
+        Args:
+            name (str): The name of the span.
+        """
+        self.name = name
+        self.start = None
+    # end def __init__
+
+    def __enter__(self):
+        """Start the span."""
+        self.start = timeit.default_timer()
+        return self
+    # end def __enter__
+
+    def __exit__(self, *args):
+        """Record the span."""
+        record(self.name, timeit.default_timer() - self.start)
+    # end def __exit__
+# end class _Span
+
+
+class _NoSpan(object):
+    """Context manager doing nothing, used while disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        """Do nothing."""
+        return self
+    # end def __enter__
+
+    def __exit__(self, *args):
+        """Do nothing."""
+    # end def __exit__
+# end class _NoSpan
+
+
+_NO_SPAN = _NoSpan()
+
+
+def enable():
+    """Start recording spans."""
+    global _enabled
+    _enabled = True
+# end def enable
+
+
+def disable():
+    """Stop recording spans, the statistics are kept."""
+    global _enabled
+    _enabled = False
+# end def disable
+
+
+def is_enabled():
+    """Whether spans are recorded."""
+    return _enabled
+# end def is_enabled
+
+
+def span(name):
+    """Time the enclosed block.
+
+    Args:
+        name (str): The name of the span.
+    Returns:
+        A context manager.
+    """
+    return _Span(name) if _enabled else _NO_SPAN
+# end def span
+
+
+def timed(name):
+    """Decorate a function to time its calls.
+
+    Args:
+        name (str): The name of the span.
+    Returns:
+        The decorator.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            # end if
+            start = timeit.default_timer()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, timeit.default_timer() - start)
+            # end try
+        # end def wrapper
+        return wrapper
+    # end def decorator
+    return decorator
+# end def timed
+
+
+def record(name, seconds):
+    """Record the duration of a span.
+
+    Args:
+        name (str): The name of the span.
+        seconds (float): The duration.
+    """
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = _Stat()
+        # end if
+        stat.add(seconds)
+    # end with
+# end def record
+
+
+def stats():
+    """The aggregated spans.
+
+    Returns:
+        The statistics by span name, the times in milliseconds.
+    """
+    with _lock:
+        return dict((name, stat.as_dict()) for name, stat in _stats.items())
+    # end with
+# end def stats
+
+
+def reset():
+    """Forget the recorded spans."""
+    with _lock:
+        _stats.clear()
+    # end with
+# end def reset
+
+
+def add_exporter(exporter):
+    """Register a function receiving the statistics on export.
+
+    Args:
+        exporter (callable): Called with the result of stats().
+    """
+    _exporters.append(exporter)
+# end def add_exporter
+
+
+def export():
+    """Pass the statistics to the registered exporters."""
+    current = stats()
+    for exporter in _exporters:
+        exporter(current)
+    # end for
+# end def export
+
+
+def dump(path):
+    """Write the statistics to a JSON file.
+
+    Args:
+        path (str): The file.
+    """
+    with open(path, 'w') as f:
+        json.dump(stats(), f, indent=2, sort_keys=True)
+    # end writing the statistics
+# end def dump
+
+
+def _dump_at_exit():
+    """Export and dump the statistics when the process exits."""
+    if not _stats:
+        return
+    # end if
+    export()
+    path = os.environ.get('WIDGETS_INSTRUMENTATION_FILE')
+    if path:
+        dump(path)
+    # end if
+# end def _dump_at_exit
+
+
+atexit.register(_dump_at_exit)
@@ -0,0 +1,197 @@
+"""Blur pipeline for the background of the LoadingDialog.
+
+The screen snapshot is scaled down and blurred once, the result can be
+scaled back up or kept small and scaled when it is painted. It is a
+static pixmap, so repainting the background does not run a graphics
+effect again.
+With NumPy available, the blur is a vectorized box blur over the image
+buffer, repeated passes approximate a gaussian blur. Without NumPy, a
+QGraphicsBlurEffect is rendered once into an image.
+"""
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+# end try
+
+from Qt import QtCore, QtGui, QtWidgets
+__all__ = ['BACKENDS', 'blur_pixmap', 'box_blur']
+
+
+BACKENDS = ('numpy', 'qt')
+
+
+def blur_pixmap(pixmap, radius=12, downsample=4, backend=None, quality=3,
+                restore_size=True):
+    """Blur the pixmap.
+
+    Args:
+        pixmap (QPixmap): The pixmap to blur.
+        radius (float): The blur radius in pixels of the pixmap.
+        downsample (int): The factor by which the pixmap is scaled down
+                          before blurring.
+        backend (str): One of the BACKENDS, defaults to 'numpy' if
+                       NumPy is available, 'qt' otherwise.
+        quality (int): The number of box blur passes of the 'numpy'
+                       backend, 3 approximates a gaussian blur.
+        restore_size (bool): Whether to scale the blurred pixmap back up
+                             to the size of the given pixmap.
+    Returns:
+        The blurred pixmap, in the size of the given pixmap or scaled
+        down by the downsample factor.
+    """
+    backend = backend or ('numpy' if numpy is not None else 'qt')
+    if backend not in BACKENDS:
+        raise ValueError('Unknown blur backend "%s", choose from %s' %
+                         (backend, ', '.join(BACKENDS)))
+    # end if
+    if backend == 'numpy' and numpy is None:
+        raise ValueError('The numpy blur backend requires numpy')
+    # end if
+    if pixmap.isNull():
+        # Nothing to blur, e.g. the screen could not be grabbed
+        return QtGui.QPixmap(pixmap)
+    # end if
+    size = pixmap.size()
+    downsample = max(1, int(downsample))
+    image = pixmap.toImage().convertToFormat(QtGui.QImage.Format_RGB32)
+    if downsample > 1:
+        image = image.scaled(max(1, size.width() // downsample),
+                             max(1, size.height() // downsample),
+                             QtCore.Qt.IgnoreAspectRatio,
+                             QtCore.Qt.SmoothTransformation)
+    # end if
+    if backend == 'numpy':
+        array = _image_to_array(image).astype(numpy.float32)
+        sigma = radius / 2.0 / downsample
+        array = box_blur(array, _box_radius(sigma, quality), quality)
+        image = _array_to_image(array.round().astype(numpy.uint8))
+    else:
+        image = _qt_blur(image, float(radius) / downsample)
+    # end if
+    if downsample > 1 and restore_size:
+        image = image.scaled(size, QtCore.Qt.IgnoreAspectRatio,
+                             QtCore.Qt.SmoothTransformation)
+    # end if
+    return QtGui.QPixmap.fromImage(image)
+# end def blur_pixmap
+
+
+def box_blur(array, radius, passes=3):
+    """Blur the image array with a separable box filter.
+
+    Args:
+        array (numpy.ndarray): The (height, width, channels) image.
+        radius (int): The radius of the box.
+        passes (int): The number of passes.
+    Returns:
+        The blurred float array.
+    """
+    if radius < 1:
+        return array
+    # end if
+    for _ in range(passes):
+        array = _box_blur_rows(array, radius)
+        array = _box_blur_rows(array.swapaxes(0, 1), radius).swapaxes(0, 1)
+    # end for
+    return array
+# end def box_blur
+
+
+def _box_blur_rows(array, radius):
+    """Box blur along the first axis, repeating the edge pixels.
+
+    Args:
+        array (numpy.ndarray): The image array.
+        radius (int): The radius of the box.
+    Returns:
+        The blurred array.
+    """
+    size = 2 * radius + 1
+    padded = numpy.concatenate((numpy.repeat(array[:1], radius + 1, axis=0),
+                                array,
+                                numpy.repeat(array[-1:], radius, axis=0)))
+    summed = numpy.cumsum(padded, axis=0, dtype=numpy.float64)
+    return ((summed[size:] - summed[:-size]) / size).astype(array.dtype)
+# end def _box_blur_rows
+
+
+def _box_radius(sigma, passes):
+    """The box radius that approximates a gaussian in the given passes.
+
+    Args:
+        sigma (float): The standard deviation of the gaussian.
+        passes (int): The number of box blur passes.
+    Returns:
+        The box radius.
+    """
+    passes = max(1, passes)
+    return int(round((math.sqrt(1 + 12.0 * sigma * sigma / passes) - 1) / 2))
+# end def _box_radius
+
+
+def _image_to_array(image):
+    """Copy the RGB32 image into a (height, width, 4) uint8 array.
+
+    Args:
+        image (QImage): The image.
+    Returns:
+        The array.
+    """
+    if hasattr(image, 'sizeInBytes'):
+        size = image.sizeInBytes()
+    else:
+        size = image.byteCount()
+    # end if
+    bits = image.constBits()
+    if hasattr(bits, 'setsize'):
+        bits.setsize(size)
+    # end if
+    array = numpy.frombuffer(bits, numpy.uint8, count=size)
+    array = array.reshape(image.height(), image.bytesPerLine())
+    return array[:, :image.width() * 4].reshape(
+        image.height(), image.width(), 4).copy()
+# end def _image_to_array
+
+
+def _array_to_image(array):
+    """Convert a (height, width, 4) uint8 array to a RGB32 image.
+
+    Args:
+        array (numpy.ndarray): The array.
+    Returns:
+        The image, owning a copy of the data.
+    """
+    height, width = array.shape[:2]
+    data = numpy.ascontiguousarray(array).tobytes()
+    image = QtGui.QImage(data, width, height, width * 4,
+                         QtGui.QImage.Format_RGB32)
+    return image.copy()
+# end def _array_to_image
+
+
+def _qt_blur(image, radius):
+    """Blur the image by rendering a QGraphicsBlurEffect once.
+
+    Args:
+        image (QImage): The image.
+        radius (float): The blur radius.
+    Returns:
+        The blurred image.
+    """
+    scene = QtWidgets.QGraphicsScene()
+    item = QtWidgets.QGraphicsPixmapItem(QtGui.QPixmap.fromImage(image))
+    effect = QtWidgets.QGraphicsBlurEffect()
+    effect.setBlurRadius(radius)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+    # The blurred edges are transparent, the original shines through
+    result = QtGui.QImage(image)
+    rect = QtCore.QRectF(0, 0, image.width(), image.height())
+    painter = QtGui.QPainter(result)
+    scene.render(painter, rect, rect)
+    painter.end()
+    return result
+# end def _qt_blur
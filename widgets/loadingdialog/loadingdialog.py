@@ -1,7 +1,14 @@
 """A loading screen for time consuming processes."""
-from Qt import QtCore, QtWidgets
+import threading
+from functools import partial
 
-from widgets import utility
+from Qt import QtCore, QtGui, QtWidgets
+
+from widgets import diagnostics, utility
+from widgets.geometry import screens
+from widgets.instrumentation import span, timed
+from widgets.loadingdialog import blur, tasks
+from widgets.loadingdialog.snapshot import snapshot_cache
 __all__ = ['LoadingDialog']
 
 
@@ -9,52 +16,317 @@ class LoadingDialog(utility.ui_class(__file__, 'LoadingDialog')):
     """Show a screen while running a background process.
 
     The dialog will be shown until the given callback has terminated.
+    The callback runs on a worker thread or, in 'process' mode, in a
+    separate process, so the dialog stays responsive. Without a
+    callback, the dialog is shown until closed.
+    A cancellable dialog shows a cancel button, the callback can poll
+    tasks.cancelled() to stop. Callbacks in a process are terminated if
+    they do not stop or exceed the timeout.
+    Progress is reported with report_progress, from any thread, or with
+    tasks.report_progress from within the callback. The reports are
+    coalesced and painted at most progress_rate times per second.
+    The background is a snapshot of the screen, blurred once according
+    to the blur_* attributes. The snapshot is kept at the downsampled
+    size and scaled up by the image label when painted.
     """
 
-    def __init__(self, callback=lambda: None, text=''):
+    # Emitted with the future of the callback once it has terminated
+    task_finished = QtCore.Signal(object)
+
+    # Relays the finished future from the worker to the GUI thread
+    _task_done = QtCore.Signal(object)
+
+    # The blur of the screen snapshot, see blur.blur_pixmap
+    blur_radius = 12
+    blur_downsample = 4
+    blur_quality = 3
+    blur_backend = None
+
+    def __init__(self, callback=None, text='', executor=None, mode='thread',
+                 timeout=None, cancellable=False, progress_rate=30):
         """Initialize the LoadingDialog.
 
         Args:
             callback (object): The function to execute during the
                                loading dialog
             text (str): The text to show
+            executor (Executor): The executor to run the callback,
+                                 defaults to the shared thread pool or
+                                 a ProcessExecutor, depending on mode.
+            mode (str): 'thread' or 'process', the callback has to be
+                        picklable in 'process' mode.
+            timeout (float): Seconds after which the callback is
+                             terminated, only in 'process' mode.
+            cancellable (bool): Whether to show a cancel button.
+            progress_rate (float): The maximum number of progress
+                                   updates painted per second.
         """
         super(LoadingDialog, self).__init__()
+        if mode not in ('thread', 'process'):
+            raise ValueError('Unknown mode "%s"' % mode)
+        # end if
         self.callback = callback
         self.text = text
+        self.executor = executor
+        self.mode = mode
+        self.timeout = timeout
+        self.cancellable = cancellable
+        self.future = None
+        self.progress_reports = 0
+        self.progress_paints = 0
+        self._cancel_event = threading.Event()
+        self._progress_lock = threading.Lock()
+        self._progress = None
+        self._painted_progress = None
         self.return_value = None
+        self.exception = None
         self.painted = False
+        self._snapshot_key = None
+        self._task_done.connect(self._finish)
+        diagnostics.track(self)
 
         # Set the window frame less mode
         self.setWindowFlags(QtCore.Qt.Widget |
                             QtCore.Qt.FramelessWindowHint |
                             QtCore.Qt.WindowStaysOnTopHint)
 
-        cursor = QtWidgets.QCursor()
+        cursor = QtGui.QCursor()
         cursor.setShape(QtCore.Qt.WaitCursor)
         self.setCursor(cursor)
 
+        self.cancel_btn = QtWidgets.QPushButton('Cancel', self)
+        self.cancel_btn.setCursor(QtCore.Qt.ArrowCursor)
+        self.cancel_btn.clicked.connect(self.cancel)
+        self.cancel_btn.setVisible(cancellable)
+
+        self._progress_timer = QtCore.QTimer(self)
+        self._progress_timer.timeout.connect(self._paint_progress)
+        self.progress_rate = progress_rate
+
         self._blur()
     # end def __init__
 
+    @classmethod
+    def run(cls, callback, text='', **kwargs):
+        """Run the callback while showing the LoadingDialog.
+
+        Args:
+            callback (object): The function to execute.
+            text (str): The text to show.
+            kwargs: The options of the LoadingDialog.
+        Returns:
+            The return value of the callback, exceptions raised by the
+            callback are raised again.
+        """
+        dialog = cls(callback=callback, text=text, **kwargs)
+        dialog.exec_()
+        return dialog.future.result()
+    # end def run
+
+    def start(self):
+        """Run the callback on the executor.
+
+        The dialog closes itself once the callback has terminated.
+        Returns:
+            The future of the callback or None if there is no callback.
+        """
+        if self.callback is None or self.future is not None:
+            return self.future
+        # end if
+        if self.mode == 'process':
+            executor = self.executor or tasks.ProcessExecutor(
+                max_workers=1, timeout=self.timeout)
+            self.future = executor.submit(self.callback)
+            self.future.add_progress_callback(self.report_progress)
+        else:
+            executor = self.executor or tasks.thread_pool()
+            self.future = executor.submit(tasks.with_cancel_event(
+                self.callback, self._cancel_event, self.report_progress))
+        # end if
+        self._progress_timer.start()
+        self.future.add_done_callback(self._task_done.emit)
+        return self.future
+    # end def start
+
+    @property
+    def progress_rate(self):
+        """The maximum number of progress updates painted per second."""
+        return 1000.0 / self._progress_timer.interval()
+    # end def progress_rate
+
+    @progress_rate.setter
+    def progress_rate(self, rate):
+        """Set the maximum number of progress updates per second.
+
+        Raises:
+            ValueError: If the rate is not positive.
+        """
+        if not rate > 0:
+            raise ValueError('The progress rate has to be positive, got %s' %
+                             rate)
+        # end if
+        self._progress_timer.setInterval(max(1, int(1000.0 / rate)))
+    # end def progress_rate
+
+    def report_progress(self, percent=None, message=None, eta=None):
+        """Report the progress, can be called from any thread.
+
+        Only the latest report is kept, it is painted with the next
+        tick of the progress timer.
+        Args:
+            percent (float): The progress in percent.
+            message (str): A message describing the current step.
+            eta (float): The estimated remaining time in seconds.
+        """
+        with self._progress_lock:
+            self._progress = (percent, message, eta)
+            self.progress_reports += 1
+        # end with
+    # end def report_progress
+
+    def _paint_progress(self):
+        """Show the latest progress report in the text label."""
+        with self._progress_lock:
+            progress = self._progress
+        # end with
+        if (progress is None or progress == self._painted_progress or
+                self._cancel_event.is_set()):
+            return
+        # end if
+        self._painted_progress = progress
+        self.progress_paints += 1
+        percent, message, eta = progress
+        details = list()
+        if percent is not None:
+            details.append('%d%%' % percent)
+        # end if
+        if message:
+            details.append(message)
+        # end if
+        if eta is not None:
+            minutes, seconds = divmod(int(eta), 60)
+            details.append('%d:%02d left' % (minutes, seconds))
+        # end if
+        lines = [self.text] if self.text else list()
+        lines.append(' - '.join(details))
+        self.text_lbl.setText('\n'.join(lines))
+    # end def _paint_progress
+
+    def cancel(self):
+        """Request the cancellation of the callback.
+
+        The dialog closes once the callback has stopped, or has been
+        terminated in 'process' mode.
+        """
+        if self.future is None or self.future.done():
+            return
+        # end if
+        self._cancel_event.set()
+        if hasattr(self.future, 'request_cancel'):
+            self.future.request_cancel()
+        else:
+            self.future.cancel()
+        # end if
+        self.cancel_btn.setEnabled(False)
+        self.text_lbl.setText('Cancelling ...')
+    # end def cancel
+
+    def keyPressEvent(self, event):
+        """Cancel on escape instead of closing the running dialog."""
+        if event.key() == QtCore.Qt.Key_Escape and self.future is not None:
+            if self.cancellable:
+                self.cancel()
+            # end if
+            event.accept()
+            return
+        # end if
+        super(LoadingDialog, self).keyPressEvent(event)
+    # end def keyPressEvent
+
+    def show(self):
+        """Show the dialog and run the callback."""
+        super(LoadingDialog, self).show()
+        self.start()
+    # end def show
+
+    def exec_(self):
+        """Run the callback and show the dialog until it terminated."""
+        self.start()
+        return super(LoadingDialog, self).exec_()
+    # end def exec_
+
+    def _finish(self, future):
+        """Store the outcome of the callback and close the dialog.
+
+        Args:
+            future (Future): The terminated future of the callback.
+        """
+        # The last report may have come after the last tick
+        self._paint_progress()
+        self._progress_timer.stop()
+        if future.cancelled() or self._cancel_event.is_set():
+            self.reject()
+        elif future.exception() is not None:
+            self.exception = future.exception()
+            self.reject()
+        else:
+            self.return_value = future.result()
+            self.accept()
+        # end if
+        self.task_finished.emit(future)
+    # end def _finish
+
+    def showEvent(self, event):
+        """Take the snapshot again if it has been released on hide."""
+        if self._snapshot_key is None:
+            self._blur()
+        # end if
+        super(LoadingDialog, self).showEvent(event)
+    # end def showEvent
+
+    def hideEvent(self, event):
+        """Release the snapshot, so the shared cache can evict it."""
+        self.release_snapshot()
+        super(LoadingDialog, self).hideEvent(event)
+    # end def hideEvent
+
+    def release_snapshot(self):
+        """Give the snapshot back to the shared cache.
+
+        The screen is grabbed again when the dialog is shown.
+        """
+        if self._snapshot_key is not None:
+            snapshot_cache.release(self._snapshot_key)
+            self._snapshot_key = None
+            self.image_lbl.clear()
+        # end if
+    # end def release_snapshot
+
+    @timed('LoadingDialog.blur')
     def _blur(self):
-        """Blur a snapshot of the current screen and display it."""
+        """Display a blurred snapshot of the current screen.
+
+        The snapshot is shared with the other LoadingDialogs on the same
+        screen, see snapshot.SnapshotCache.
+        """
         # Full screen
-        desktop = QtWidgets.QApplication.instance().desktop()
-        available_geometry = desktop.screenGeometry(QtWidgets.QCursor().pos())
+        screen = screens().screen_at()
+        available_geometry = screens().screen_geometry(screen)
         self.setGeometry(available_geometry)
-        self.image_lbl.setGeometry(available_geometry)
-        self.text_lbl.setGeometry(available_geometry)
+        local_geometry = QtCore.QRect(0, 0, available_geometry.width(),
+                                      available_geometry.height())
+        self.image_lbl.setGeometry(local_geometry)
+        self.image_lbl.setScaledContents(True)
+        self.text_lbl.setGeometry(local_geometry)
         self.update(self.rect())
 
-        # Grab current screen
-        pxm = QtWidgets.QPixmap.grabWindow(
-                                    QtWidgets.QApplication.desktop().winId())
-
-        # Blur it
-        effect = QtWidgets.QGraphicsBlurEffect(self.image_lbl)
-        self.image_lbl.setGraphicsEffect(effect)
-        effect.setBlurRadius(12)
+        # Grab and blur the screen, unless a recent snapshot exists
+        self.release_snapshot()
+        self._snapshot_key = (
+            screen, available_geometry.getRect(), self.blur_radius,
+            self.blur_downsample, self.blur_quality, self.blur_backend)
+        pxm = snapshot_cache.acquire(
+            self._snapshot_key, partial(self._grab_blurred, available_geometry))
 
         # Set the image
         self.image_lbl.setPixmap(pxm)
@@ -62,13 +334,45 @@ class LoadingDialog(utility.ui_class(__file__, 'LoadingDialog')):
         # Set the text and put it on top of the image
         self.text_lbl.setText(self.text)
         self.text_lbl.setParent(self)
+
+        # Put the cancel button below the text
+        self.cancel_btn.adjustSize()
+        self.cancel_btn.move(
+            (self.width() - self.cancel_btn.width()) // 2,
+            self.height() // 2 + self.text_lbl.fontMetrics().height() * 2)
+        self.cancel_btn.raise_()
     # end def _blur
+
+    def _grab_blurred(self, geometry):
+        """Grab the screen area and blur it once.
+
+        Args:
+            geometry (QRect): The area of the screen.
+        Returns:
+            The blurred pixmap, in the downsampled size.
+        """
+        with span('LoadingDialog.grab'):
+            pxm = QtGui.QPixmap.grabWindow(
+                QtWidgets.QApplication.desktop().winId(),
+                geometry.x(), geometry.y(), geometry.width(),
+                geometry.height())
+        # end with
+        with span('LoadingDialog.blur_pixmap'):
+            return blur.blur_pixmap(pxm, radius=self.blur_radius,
+                                    downsample=self.blur_downsample,
+                                    backend=self.blur_backend,
+                                    quality=self.blur_quality,
+                                    restore_size=False)
+        # end with
+    # end def _grab_blurred
 # end class LoadingDialog
 
 
 if __name__ == '__main__':
     import sys
+    import time
     app = QtWidgets.QApplication(sys.argv)
+    LoadingDialog.run(lambda: time.sleep(2), text='Loading ...')
     dialog = LoadingDialog()
     dialog.exec_()
     sys.exit(app.exec_())
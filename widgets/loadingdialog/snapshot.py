@@ -0,0 +1,165 @@
+"""Process wide cache for the blurred screen snapshots.
+
+Grabbing and blurring the screen is expensive and the resulting pixmaps
+are large, so the LoadingDialogs share them. A snapshot is reused while
+any dialog still shows it and for a short time after it has been taken,
+so dialogs raised in quick succession do not grab the screen again.
+Snapshots that are no longer shown are evicted, least recently used
+first, once the cache exceeds its memory budget.
+"""
+import os
+import time
+from collections import OrderedDict
+__all__ = ['SnapshotCache', 'snapshot_cache']
+
+
+# Seconds a snapshot is reused after it has been taken
+SNAPSHOT_TTL = float(os.environ.get('WIDGETS_SNAPSHOT_TTL', 1.0))
+
+# Memory budget of the shared cache in MB
+SNAPSHOT_BUDGET = float(os.environ.get('WIDGETS_SNAPSHOT_BUDGET', 64))
+
+
+class _Entry(object):
+    """A cached snapshot."""
+
+    __slots__ = ('pixmap', 'created', 'nbytes', 'refs')
+
+    def __init__(self, pixmap, created, nbytes):
+        """Initialize the _Entry.
+
+        Args:
+            pixmap (QPixmap): The snapshot.
+            created (float): The time the snapshot has been taken.
+            nbytes (int): The memory used by the snapshot.
+        """
+        self.pixmap = pixmap
+        self.created = created
+        self.nbytes = nbytes
+        self.refs = 0
+    # end def __init__
+# end class _Entry
+
+
+class SnapshotCache(object):
+    """Share snapshots by key, e.g. the screen and blur settings.
+
+    Every acquire has to be paired with a release once the snapshot is
+    no longer shown. Snapshots in use are never evicted.
+    """
+
+    def __init__(self, ttl=SNAPSHOT_TTL, budget=SNAPSHOT_BUDGET):
+        """Initialize the SnapshotCache.
+
+        Args:
+            ttl (float): Seconds a snapshot is reused after it has been
+                         taken.
+            budget (float): The memory budget in MB.
+        """
+        self.ttl = ttl
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+    # end def __init__
+
+    def acquire(self, key, factory):
+        """Get the snapshot for the key, taking a new one if needed.
+
+        A snapshot is reused if it is still in use or younger than the
+        ttl.
+        Args:
+            key (hashable): Identifies the snapshot, e.g. the screen.
+            factory (callable): Takes the snapshot, returns a QPixmap.
+        Returns:
+            The snapshot.
+        """
+        now = time.time()
+        entry = self._entries.pop(key, None)
+        if entry is not None and (entry.refs or now - entry.created <=
+                                  self.ttl):
+            self.hits += 1
+        else:
+            self.misses += 1
+            pixmap = factory()
+            entry = _Entry(pixmap, now, _pixmap_bytes(pixmap))
+        # end if
+        entry.refs += 1
+        self._entries[key] = entry
+        self._evict(now)
+        return entry.pixmap
+    # end def acquire
+
+    def release(self, key):
+        """Mark one use of the snapshot as finished.
+
+        Args:
+            key (hashable): The key the snapshot has been acquired with.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.refs > 0:
+            entry.refs -= 1
+        # end if
+        self._evict(time.time())
+    # end def release
+
+    def nbytes(self):
+        """The memory used by the cached snapshots."""
+        return sum(e.nbytes for e in self._entries.values())
+    # end def nbytes
+
+    def in_use(self):
+        """The number of snapshots shown by a dialog."""
+        return sum(1 for e in self._entries.values() if e.refs)
+    # end def in_use
+
+    def __len__(self):
+        """The number of cached snapshots."""
+        return len(self._entries)
+    # end def __len__
+
+    def clear(self):
+        """Drop all snapshots that are not in use."""
+        for key, entry in list(self._entries.items()):
+            if not entry.refs:
+                del self._entries[key]
+            # end if
+        # end for
+    # end def clear
+
+    def _evict(self, now):
+        """Drop expired unused snapshots and enforce the budget.
+
+        Args:
+            now (float): The current time.
+        """
+        budget = self.budget * 1024 * 1024
+        total = self.nbytes()
+        for key, entry in list(self._entries.items()):
+            if entry.refs:
+                continue
+            # end if
+            if total > budget or now - entry.created > self.ttl:
+                del self._entries[key]
+                total -= entry.nbytes
+                self.evictions += 1
+            # end if
+        # end for
+    # end def _evict
+# end class SnapshotCache
+
+
+def _pixmap_bytes(pixmap):
+    """The approximate memory used by the pixmap.
+
+    Args:
+        pixmap (QPixmap): The pixmap.
+    Returns:
+        The number of bytes.
+    """
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+# end def _pixmap_bytes
+
+
+snapshot_cache = SnapshotCache()
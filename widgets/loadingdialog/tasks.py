@@ -0,0 +1,387 @@
+"""Executors for the callbacks run behind a LoadingDialog.
+
+Callbacks run either on the shared thread pool, for I/O bound work, or
+in a separate process, for CPU bound work that would otherwise starve
+the GUI thread because of the GIL.
+In both modes, a callback can poll cancelled() to stop cooperatively
+and call report_progress() as often as it likes, the LoadingDialog
+coalesces the reports.
+Processes can also be terminated, on timeout or when a requested
+cancellation is not honoured within a grace period.
+"""
+import multiprocessing
+import threading
+import time
+import traceback
+
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError
+__all__ = ['thread_pool', 'cancelled', 'report_progress',
+           'with_cancel_event', 'ProcessExecutor', 'ProcessFuture']
+
+
+# The maximum number of worker threads of the shared thread pool
+MAX_WORKERS = 4
+
+# Minimum seconds between two progress reports sent by a process
+PROGRESS_INTERVAL = 1.0 / 120
+
+_thread_pool = None
+_thread_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def thread_pool():
+    """The thread pool shared by all LoadingDialogs.
+
+    Returns:
+        The ThreadPoolExecutor, created on first use.
+    """
+    global _thread_pool
+    with _thread_pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        # end if
+    # end with
+    return _thread_pool
+# end def thread_pool
+
+
+def cancelled():
+    """Whether the cancellation of the running callback was requested.
+
+    Callbacks call this periodically to stop cooperatively.
+    Returns:
+        True if the task has been cancelled.
+    """
+    event = getattr(_local, 'cancel_event', None)
+    return event is not None and event.is_set()
+# end def cancelled
+
+
+def report_progress(percent=None, message=None, eta=None):
+    """Report the progress of the running callback.
+
+    Does nothing if the callback does not run behind a LoadingDialog.
+    Args:
+        percent (float): The progress in percent.
+        message (str): A message describing the current step.
+        eta (float): The estimated remaining time in seconds.
+    """
+    reporter = getattr(_local, 'progress', None)
+    if reporter is not None:
+        reporter(percent, message, eta)
+    # end if
+# end def report_progress
+
+
+def with_cancel_event(callback, cancel_event, progress=None):
+    """Wrap the callback, so cancelled() reports the given event.
+
+    Args:
+        callback (callable): The callback.
+        cancel_event (threading.Event): The cancellation event.
+        progress (callable): Receives the report_progress calls of the
+                             callback.
+    Returns:
+        The wrapped callback.
+    """
+    def run(*args, **kwargs):
+        _local.cancel_event = cancel_event
+        _local.progress = progress
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            _local.cancel_event = None
+            _local.progress = None
+        # end try
+    # end def run
+    return run
+# end def with_cancel_event
+
+
+class ProcessFuture(Future):
+    """The future of a callback running in a separate process."""
+
+    def __init__(self, cancel_event):
+        """Initialize the ProcessFuture.
+
+        Args:
+            cancel_event (multiprocessing.Event): Set to request the
+                                                  cancellation.
+        """
+        super(ProcessFuture, self).__init__()
+        self.cancel_event = cancel_event
+        self.progress = None
+        self._progress_callbacks = list()
+    # end def __init__
+
+    def add_progress_callback(self, fn):
+        """Call fn with the (percent, message, eta) progress reports.
+
+        The callback is called from the monitoring thread, right away
+        with the latest report if there is one.
+        Args:
+            fn (callable): The callback.
+        """
+        self._progress_callbacks.append(fn)
+        progress = self.progress
+        if progress is not None:
+            fn(*progress)
+        # end if
+    # end def add_progress_callback
+
+    def _set_progress(self, progress):
+        """Pass a progress report on to the callbacks.
+
+        Args:
+            progress (tuple): The percent, message and eta.
+        """
+        self.progress = progress
+        for fn in list(self._progress_callbacks):
+            fn(*progress)
+        # end for
+    # end def _set_progress
+
+    def request_cancel(self):
+        """Ask the running callback to stop.
+
+        A pending callback is cancelled right away, a running callback
+        is terminated if it does not stop within the grace period.
+        """
+        if not self.cancel():
+            self.cancel_event.set()
+        # end if
+    # end def request_cancel
+
+    def cancel_requested(self):
+        """Whether the cancellation has been requested."""
+        return self.cancelled() or self.cancel_event.is_set()
+    # end def cancel_requested
+# end class ProcessFuture
+
+
+class ProcessExecutor(object):
+    """Run picklable callables in separate processes.
+
+    Unlike a ProcessPoolExecutor, every callable gets a fresh process,
+    which can be terminated if it exceeds the timeout or ignores a
+    cancellation request. A monitoring thread per callable relays the
+    progress reports and the result or exception to the future.
+    """
+
+    # Seconds between the checks of the monitoring thread
+    poll_interval = 0.02
+
+    def __init__(self, max_workers=None, timeout=None, grace_period=2.0):
+        """Initialize the ProcessExecutor.
+
+        Args:
+            max_workers (int): The maximum number of concurrent
+                               processes, defaults to the cpu count.
+            timeout (float): Seconds after which a callable is
+                             terminated, None for no timeout.
+            grace_period (float): Seconds a callable has to stop after
+                                  its cancellation was requested.
+        """
+        self.timeout = timeout
+        self.grace_period = grace_period
+        self._slots = threading.Semaphore(
+            max_workers or multiprocessing.cpu_count())
+        if hasattr(multiprocessing, 'get_context'):
+            # Do not fork the Qt application
+            self._context = multiprocessing.get_context('spawn')
+        else:
+            self._context = multiprocessing
+        # end if
+    # end def __init__
+
+    def submit(self, fn, *args, **kwargs):
+        """Run the callable in a separate process.
+
+        Args:
+            fn (callable): The picklable callable.
+            args: The arguments for the callable.
+            kwargs: The keyword arguments for the callable.
+        Returns:
+            The ProcessFuture of the callable.
+        """
+        future = ProcessFuture(self._context.Event())
+        thread = threading.Thread(target=self._monitor,
+                                  args=(future, fn, args, kwargs))
+        thread.daemon = True
+        thread.start()
+        return future
+    # end def submit
+
+    def _monitor(self, future, fn, args, kwargs):
+        """Run the process and resolve the future with its outcome.
+
+        Args:
+            future (ProcessFuture): The future of the callable.
+            fn (callable): The callable.
+            args (tuple): The arguments for the callable.
+            kwargs (dict): The keyword arguments for the callable.
+        """
+        with self._slots:
+            if not future.set_running_or_notify_cancel():
+                return
+            # end if
+            receiver, sender = self._context.Pipe(duplex=False)
+            process = None
+            try:
+                process = self._context.Process(
+                    target=_process_main,
+                    args=(sender, fn, args, kwargs, future.cancel_event))
+                process.daemon = True
+                process.start()
+                sender.close()
+                outcome = self._wait(future, process, receiver)
+            except Exception as err:
+                # E.g. the callable can not be pickled or the outcome
+                # can not be unpickled
+                outcome = (False, err)
+            finally:
+                sender.close()
+                if process is not None and process.pid is not None:
+                    if process.is_alive():
+                        process.terminate()
+                    # end if
+                    process.join()
+                # end if
+                receiver.close()
+            # end try
+        # end with
+        if future.cancel_event.is_set():
+            future.set_exception(CancelledError())
+        elif outcome[0]:
+            future.set_result(outcome[1])
+        else:
+            future.set_exception(outcome[1])
+        # end if
+    # end def _monitor
+
+    def _wait(self, future, process, receiver):
+        """Wait for the outcome of the process.
+
+        Args:
+            future (ProcessFuture): The future of the callable.
+            process (Process): The process running the callable.
+            receiver (Connection): Receives the outcome.
+        Returns:
+            A (success, result or exception) tuple.
+        """
+        start = time.time()
+        cancel_deadline = None
+        while True:
+            if receiver.poll(self.poll_interval):
+                try:
+                    kind, data = receiver.recv()
+                except EOFError:
+                    return False, RuntimeError(
+                        'The process exited with code %s' % process.exitcode)
+                # end try
+                if kind == 'outcome':
+                    return data
+                # end if
+                future._set_progress(data)
+                continue
+            # end if
+            if not process.is_alive() and not receiver.poll():
+                return False, RuntimeError(
+                    'The process exited with code %s' % process.exitcode)
+            # end if
+            now = time.time()
+            if self.timeout is not None and now - start > self.timeout:
+                return False, TimeoutError(
+                    'The process exceeded the timeout of %ss' % self.timeout)
+            # end if
+            if future.cancel_event.is_set():
+                if cancel_deadline is None:
+                    cancel_deadline = now + self.grace_period
+                elif now > cancel_deadline:
+                    return False, CancelledError()
+                # end if
+            # end if
+        # end while
+    # end def _wait
+# end class ProcessExecutor
+
+
+class _ProgressSender(object):
+    """Send the progress reports of a process to the parent process.
+
+    Reports arriving faster than the PROGRESS_INTERVAL are coalesced,
+    only the latest one is sent.
+    """
+
+    def __init__(self, sender):
+        """Initialize the _ProgressSender.
+
+        Args:
+            sender (Connection): The connection to the parent process.
+        """
+        self.sender = sender
+        self.lock = threading.Lock()
+        self.pending = None
+        self.last_sent = 0
+    # end def __init__
+
+    def __call__(self, percent=None, message=None, eta=None):
+        """Send or keep the progress report."""
+        with self.lock:
+            self.pending = (percent, message, eta)
+            if time.time() - self.last_sent >= PROGRESS_INTERVAL:
+                self._send_pending()
+            # end if
+        # end with
+    # end def __call__
+
+    def send(self, kind, data):
+        """Send a message after the pending progress report."""
+        with self.lock:
+            self._send_pending()
+            self.sender.send((kind, data))
+        # end with
+    # end def send
+
+    def _send_pending(self):
+        """Send the pending progress report, if any."""
+        if self.pending is not None:
+            self.sender.send(('progress', self.pending))
+            self.pending = None
+            self.last_sent = time.time()
+        # end if
+    # end def _send_pending
+# end class _ProgressSender
+
+
+def _process_main(sender, fn, args, kwargs, cancel_event):
+    """Run the callable and send the outcome to the parent process.
+
+    Args:
+        sender (Connection): Sends the progress and the outcome.
+        fn (callable): The callable.
+        args (tuple): The arguments for the callable.
+        kwargs (dict): The keyword arguments for the callable.
+        cancel_event (multiprocessing.Event): The cancellation event.
+    """
+    progress = _ProgressSender(sender)
+    _local.cancel_event = cancel_event
+    _local.progress = progress
+    try:
+        outcome = (True, fn(*args, **kwargs))
+    except BaseException as err:
+        err.remote_traceback = traceback.format_exc()
+        outcome = (False, err)
+    # end try
+    try:
+        progress.send('outcome', outcome)
+    except Exception as err:
+        # The result or the exception can not be pickled
+        progress.send('outcome', (False, RuntimeError(
+            'Can not send the outcome of the process: %r\n%s' % (
+                err, getattr(outcome[1], 'remote_traceback', '')))))
+    # end try
+    sender.close()
+# end def _process_main
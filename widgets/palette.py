@@ -0,0 +1,214 @@
+"""Translate simple stylesheet rules into palettes and fonts.
+
+Widgets styled with a stylesheet are polished and painted by Qt's
+stylesheet style, which is considerably slower than painting with the
+native palette. Rules that only set colors and fonts on a widget class
+can be expressed with QPalette and QFont instead, everything else
+(borders, radius, padding, pseudo states, sub controls, properties)
+stays in the stylesheet. A class that is still styled by the stylesheet
+keeps all its rules there, the stylesheet style would not paint the
+colors moved to the palette.
+"""
+import re
+
+from Qt import QtGui, QtWidgets
+__all__ = ['split_stylesheet', 'apply_rules']
+
+
+# The palette roles set by the color properties
+COLOR_ROLES = {
+    'color': ('WindowText', 'Text', 'ButtonText'),
+    'background': ('Window', 'Base', 'Button'),
+    'background-color': ('Window', 'Base', 'Button')}
+
+_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_SIMPLE_SELECTOR = re.compile(r'^Q[A-Za-z]+$')
+_CLASS_NAME = re.compile(r'(?<![\w#.-])Q[A-Za-z]+')
+_RGB = re.compile(r'^rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*'
+                  r'(?:,\s*(\d+)\s*)?\)$')
+_HEX = re.compile(r'^#(?:[0-9a-fA-F]{3}){1,2}$')
+_NAME = re.compile(r'^[a-z]+$')
+_FONT_SIZE = re.compile(r'^(\d+)(px|pt)$')
+
+
+def parse_rules(css):
+    """Parse the rules of the stylesheet.
+
+    Args:
+        css (str): The stylesheet.
+    Returns:
+        A list of (selectors, declarations) tuples, the declarations
+        being a list of (property, value) tuples.
+    """
+    rules = list()
+    for block in _COMMENT.sub('', css).split('}'):
+        if '{' not in block:
+            continue
+        # end if
+        selector, body = block.split('{', 1)
+        selectors = [s.strip() for s in selector.split(',') if s.strip()]
+        declarations = list()
+        for declaration in body.split(';'):
+            if ':' not in declaration:
+                continue
+            # end if
+            prop, value = declaration.split(':', 1)
+            declarations.append((prop.strip().lower(), value.strip()))
+        # end for
+        if selectors:
+            rules.append((selectors, declarations))
+        # end if
+    # end for
+    return rules
+# end def parse_rules
+
+
+def split_stylesheet(css):
+    """Split the stylesheet into palette rules and the remaining sheet.
+
+    A rule is translated if it only selects plain widget classes and
+    all its values are plain colors or fonts. A class mentioned by any
+    rule that is kept in the stylesheet is not translated at all.
+    Args:
+        css (str): The stylesheet.
+    Returns:
+        The palette rules as a dict of {class name: {property: value}},
+        and the stylesheet with the remaining rules.
+    """
+    rules = parse_rules(css)
+    styled = set()
+    for selectors, declarations in rules:
+        if not _is_translatable_rule(selectors, declarations):
+            for selector in selectors:
+                styled.update(_CLASS_NAME.findall(selector))
+            # end for
+        # end if
+    # end for
+    palette_rules = dict()
+    remaining = list()
+    for selectors, declarations in rules:
+        if (_is_translatable_rule(selectors, declarations) and
+                not styled.intersection(selectors)):
+            for selector in selectors:
+                palette_rules.setdefault(selector, dict()).update(
+                    declarations)
+            # end for
+        elif declarations:
+            remaining.append('%s{\n%s\n}\n' % (
+                ', '.join(selectors),
+                '\n'.join('    %s: %s;' % d for d in declarations)))
+        # end if
+    # end for
+    return palette_rules, ''.join(remaining)
+# end def split_stylesheet
+
+
+def _is_translatable_rule(selectors, declarations):
+    """Whether the whole rule can be expressed by palettes and fonts.
+
+    Args:
+        selectors (list): The selectors of the rule.
+        declarations (list): The (property, value) declarations.
+    Returns:
+        True if the rule only selects plain widget classes and only
+        sets plain colors and fonts.
+    """
+    return (all(_SIMPLE_SELECTOR.match(s) for s in selectors) and
+            all(_translatable(prop, value) for prop, value in declarations))
+# end def _is_translatable_rule
+
+
+def _translatable(prop, value):
+    """Whether the declaration can be expressed by a palette or font.
+
+    Args:
+        prop (str): The property.
+        value (str): The value.
+    Returns:
+        True if the declaration can be translated.
+    """
+    if prop in COLOR_ROLES:
+        return _color_components(value) is not None
+    # end if
+    if prop == 'font':
+        return all(t in ('bold', 'italic', 'normal') or _FONT_SIZE.match(t)
+                   for t in value.split())
+    # end if
+    return False
+# end def _translatable
+
+
+def _color_components(value):
+    """Parse a plain color value.
+
+    Args:
+        value (str): A rgb(), rgba(), hex or named color.
+    Returns:
+        The arguments for a QColor or None if the value is not a plain
+        color, e.g. a gradient.
+    """
+    match = _RGB.match(value)
+    if match is not None:
+        return tuple(int(c) for c in match.groups() if c is not None)
+    # end if
+    if _HEX.match(value) or (_NAME.match(value) and
+                             value not in ('none', 'transparent')):
+        return (value, )
+    # end if
+    return None
+# end def _color_components
+
+
+def apply_rules(palette_rules, app=None):
+    """Set the palette rules as class specific palettes and fonts.
+
+    Args:
+        palette_rules (dict): The rules, see split_stylesheet.
+        app (QApplication): The application, defaults to the current
+                            instance.
+    """
+    app = app or QtWidgets.QApplication.instance()
+    for class_name, declarations in palette_rules.items():
+        palette = QtGui.QPalette(app.palette())
+        font = None
+        for prop, value in declarations.items():
+            if prop in COLOR_ROLES:
+                color = QtGui.QColor(*_color_components(value))
+                for role in COLOR_ROLES[prop]:
+                    palette.setColor(getattr(QtGui.QPalette, role), color)
+                # end for
+            elif prop == 'font':
+                font = _font(QtGui.QFont(app.font()), value)
+            # end if
+        # end for
+        app.setPalette(palette, class_name)
+        if font is not None:
+            app.setFont(font, class_name)
+        # end if
+    # end for
+# end def apply_rules
+
+
+def _font(font, value):
+    """Apply the font shorthand to the font.
+
+    Args:
+        font (QFont): The font to modify.
+        value (str): The value of the font property.
+    Returns:
+        The font.
+    """
+    for token in value.split():
+        match = _FONT_SIZE.match(token)
+        if token == 'bold':
+            font.setBold(True)
+        elif token == 'italic':
+            font.setItalic(True)
+        elif match is not None and match.group(2) == 'px':
+            font.setPixelSize(int(match.group(1)))
+        elif match is not None:
+            font.setPointSize(int(match.group(1)))
+        # end if
+    # end for
+    return font
+# end def _font
@@ -0,0 +1,210 @@
+"""Precompile the .ui and .css resources into python modules.
+
+The forms of all resource/*.ui files are converted to python code and
+all resource/*.css files are merged into a single stylesheet bundle.
+The artifacts are written to the widgets.compiled package, where
+utility.ui_class and utility.set_stylesheet pick them up, so neither
+pysideuic nor the xml files are needed at runtime. The forms are
+converted with pysideuic or the uic of the binding, without either the
+stylesheets are precompiled on their own.
+
+Usage:
+    python -m widgets.precompile [--target DIR] [--clean]
+"""
+import argparse
+import os
+import shutil
+import warnings
+
+from widgets import utility
+__all__ = ['find_resources', 'precompile', 'clean']
+
+
+COMPILED_PACKAGE = 'compiled'
+
+HEADER = '''# -*- coding: utf-8 -*-
+"""%s
+
+Generated by widgets.precompile, do not edit.
+"""
+'''
+
+
+def find_resources(source_dir):
+    """Find all ui and stylesheet files in the resource folders.
+
+    Args:
+        source_dir (str): The widgets package folder.
+    Returns:
+        The sorted lists of .ui and .css files.
+    """
+    ui_files = list()
+    css_files = list()
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if d != COMPILED_PACKAGE)
+        if os.path.basename(root) != 'resource':
+            continue
+        # end if
+        for name in sorted(files):
+            if name.endswith('.ui'):
+                ui_files.append(os.path.join(root, name))
+            elif name.endswith('.css'):
+                css_files.append(os.path.join(root, name))
+            # end if
+        # end for
+    # end for
+    return ui_files, css_files
+# end def find_resources
+
+
+def precompile(source_dir=None, target_dir=None):
+    """Precompile the resources of the source into the target folder.
+
+    Args:
+        source_dir (str): The widgets package folder to read the
+                          resources from, defaults to this package.
+        target_dir (str): The widgets package folder to write the
+                          compiled package to, defaults to source_dir.
+    Returns:
+        The folder of the compiled package.
+    """
+    source_dir = source_dir or os.path.dirname(os.path.abspath(__file__))
+    target_dir = target_dir or source_dir
+    compiled_dir = os.path.join(target_dir, COMPILED_PACKAGE)
+    clean(target_dir)
+    os.makedirs(compiled_dir)
+    try:
+        _write_package(source_dir, compiled_dir)
+    except BaseException:
+        # A partial package would be taken for the precompiled resources
+        clean(target_dir)
+        raise
+    # end try
+    return compiled_dir
+# end def precompile
+
+
+def _write_package(source_dir, compiled_dir):
+    """Write the precompiled forms, stylesheets and the index.
+
+    Args:
+        source_dir (str): The widgets package folder.
+        compiled_dir (str): The folder of the compiled package.
+    """
+    ui_files, css_files = find_resources(source_dir)
+
+    forms = dict()
+    hashes = dict()
+    try:
+        _write_forms(source_dir, compiled_dir, ui_files, forms, hashes)
+    except ImportError as err:
+        warnings.warn('The forms are not precompiled, %s' % err)
+    # end try
+
+    with open(os.path.join(compiled_dir, 'stylesheets.py'), 'w') as f:
+        f.write(HEADER % 'Bundle of all precompiled stylesheets.')
+        f.write('STYLESHEETS = {\n')
+        for css_file in css_files:
+            hashes[_resource_key(source_dir, css_file)] = (
+                utility.get_resource_hash(css_file))
+            with open(css_file, 'r') as css:
+                f.write('    %r: %r,\n' % (_resource_key(source_dir, css_file),
+                                          css.read()))
+            # end reading the css file
+        # end for
+        f.write('}\n')
+    # end writing the stylesheet bundle
+
+    # The index lists the content hashes of the sources, a changed
+    # source is not taken from the precompiled artifacts
+    with open(os.path.join(compiled_dir, '__init__.py'), 'w') as f:
+        f.write(HEADER % 'Index of the precompiled forms.')
+        f.write('FORMS = {\n')
+        for key in sorted(forms):
+            f.write('    %r: %r,\n' % (key, forms[key]))
+        # end for
+        f.write('}\n\nHASHES = {\n')
+        for key in sorted(hashes):
+            f.write('    %r: %r,\n' % (key, hashes[key]))
+        # end for
+        f.write('}\n')
+    # end writing the index
+# end def _write_package
+
+
+def _write_forms(source_dir, compiled_dir, ui_files, forms, hashes):
+    """Write the precompiled forms.
+
+    Args:
+        source_dir (str): The widgets package folder.
+        compiled_dir (str): The folder of the compiled package.
+        ui_files (list): The .ui files.
+        forms (dict): Receives the index entries of the forms.
+        hashes (dict): Receives the content hashes of the .ui files.
+    Raises:
+        ImportError: If no ui compiler is available.
+    """
+    for ui_file in ui_files:
+        key = _resource_key(source_dir, ui_file)
+        with open(ui_file, 'rb') as f:
+            content = f.read()
+        # end reading the ui file
+        widget_class, form_class, source = utility.ui_form_source(content)
+        module_name = os.path.splitext(key)[0].replace(
+            '/resource/', '_').replace('/', '_')
+        with open(os.path.join(compiled_dir, module_name + '.py'), 'w') as f:
+            f.write(HEADER % ('Precompiled form of %s.' % key))
+            f.write(source)
+        # end writing the form module
+        forms[key] = (widget_class, module_name, form_class)
+        hashes[key] = utility.get_resource_hash(ui_file)
+    # end for
+# end def _write_forms
+
+
+def clean(target_dir=None):
+    """Remove the compiled package from the target folder.
+
+    Args:
+        target_dir (str): The widgets package folder, defaults to this
+                          package.
+    """
+    target_dir = target_dir or os.path.dirname(os.path.abspath(__file__))
+    compiled_dir = os.path.join(target_dir, COMPILED_PACKAGE)
+    if os.path.isdir(compiled_dir):
+        shutil.rmtree(compiled_dir)
+    # end if
+# end def clean
+
+
+def _resource_key(source_dir, resource_file):
+    """The path of the resource relative to the widgets package.
+
+    Args:
+        source_dir (str): The widgets package folder.
+        resource_file (str): The resource file.
+    Returns:
+        The relative path, using forward slashes.
+    """
+    return os.path.relpath(resource_file, source_dir).replace(os.sep, '/')
+# end def _resource_key
+
+
+def main(argv=None):
+    """Run the precompilation from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--target', default=None,
+                        help='The widgets package folder to write to.')
+    parser.add_argument('--clean', action='store_true',
+                        help='Only remove the precompiled resources.')
+    args = parser.parse_args(argv)
+    if args.clean:
+        clean(args.target)
+    else:
+        print(precompile(target_dir=args.target))
+    # end if
+# end def main
+
+
+if __name__ == '__main__':
+    main()
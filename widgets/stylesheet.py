@@ -0,0 +1,306 @@
+"""Registry for the stylesheets of the widgets."""
+import os
+import weakref
+
+from Qt import QtWidgets
+
+from widgets.palette import apply_rules, split_stylesheet
+from widgets.theme import (DEFAULT_THEME, Theme, compile_stylesheet,
+                           parse_variables)
+__all__ = ['StyleSheetRegistry']
+
+
+class StyleSheetRegistry(object):
+    """Read, merge and apply the stylesheets of the widgets.
+
+    The content of the stylesheet files is cached and only read again
+    when the modification time of a file changes. Identical merged
+    stylesheets are shared between the widgets.
+    If the general stylesheet is installed on the QApplication, the
+    widgets only get their own stylesheet, so Qt does not have to parse
+    the general stylesheet for every widget.
+    The stylesheets are compiled with the current theme, see
+    widgets.theme. Switching the theme re-applies the stylesheets to
+    the live widgets whose stylesheet changed.
+    With use_palette, the simple color and font rules of the general
+    stylesheet are set as palettes and fonts on the application instead,
+    see widgets.palette.
+    """
+
+    def __init__(self, general_css_file, precompiled=None, use_palette=False):
+        """Initialize the StyleSheetRegistry.
+
+        Args:
+            general_css_file (str): The stylesheet applied to all
+                                    widgets.
+            precompiled (callable): Optional function returning the
+                                    precompiled content of a stylesheet
+                                    file or None.
+            use_palette (bool): Whether to use the palette fast path.
+        """
+        self.general_css_file = general_css_file
+        self.precompiled = precompiled
+        self.use_palette = use_palette
+        self.application = None
+        self.themes = {DEFAULT_THEME: Theme(DEFAULT_THEME)}
+        self.theme = self.themes[DEFAULT_THEME]
+        self._files = dict()
+        self._variables = dict()
+        self._compiled = dict()
+        self._merged = dict()
+        self._sheets = dict()
+        self._palette_split = None
+        self._palette_applied = None
+        self._widgets = weakref.WeakKeyDictionary()
+    # end def __init__
+
+    def read(self, css_file):
+        """Read the content of the given stylesheet file.
+
+        Args:
+            css_file (str): The .css file.
+        Returns:
+            The content of the file or None if it does not exist.
+        """
+        try:
+            mtime = os.path.getmtime(css_file)
+        except OSError:
+            mtime = None
+        # end try
+        cached = self._files.get(css_file)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        # end if
+        css = None
+        if self.precompiled is not None:
+            css = self.precompiled(css_file)
+        # end if
+        if css is None and mtime is not None:
+            with open(css_file, 'r') as f:
+                css = f.read()
+            # end reading the css file
+        # end if
+        self._files[css_file] = (mtime, css)
+        return css
+    # end def read
+
+    def variables(self, theme=None):
+        """The values of the stylesheet variables for the theme.
+
+        Args:
+            theme (Theme): The theme, defaults to the current theme.
+        Returns:
+            The default variables of the general stylesheet, updated
+            with the variables of the theme.
+        """
+        theme = theme or self.theme
+        general_css = self.read(self.general_css_file) or ''
+        cached = self._variables.get(theme.name)
+        if cached is not None and cached[0] is general_css:
+            return cached[1]
+        # end if
+        variables = parse_variables(general_css)
+        variables.update(theme.variables)
+        self._variables[theme.name] = (general_css, variables)
+        return variables
+    # end def variables
+
+    def compiled(self, css_file):
+        """The content of the stylesheet file compiled with the theme.
+
+        The compiled stylesheets are cached per theme.
+        Args:
+            css_file (str): The .css file.
+        Returns:
+            The compiled stylesheet or None if the file does not exist.
+        """
+        css = self.read(css_file)
+        if css is None:
+            return None
+        # end if
+        variables = self.variables()
+        key = (self.theme.name, css_file)
+        cached = self._compiled.get(key)
+        if cached is not None and cached[0] is css and cached[1] is variables:
+            return cached[2]
+        # end if
+        compiled = compile_stylesheet(css, variables)
+        self._compiled[key] = (css, variables, compiled)
+        return compiled
+    # end def compiled
+
+    def merged(self, *css_files):
+        """Merge the given stylesheet files into one stylesheet.
+
+        Missing files are skipped. Identical stylesheets are returned
+        as the same string object.
+        Args:
+            css_files (str): The .css files.
+        Returns:
+            The merged stylesheet, compiled with the current theme.
+        """
+        contents = tuple(self.general_stylesheet()
+                         if f == self.general_css_file else self.compiled(f)
+                         for f in css_files if f is not None)
+        key = (self.theme.name, self.use_palette, css_files)
+        cached = self._merged.get(key)
+        if cached is not None and cached[0] == contents:
+            return cached[1]
+        # end if
+        sheet = ''.join(c for c in contents if c is not None)
+        sheet = self._sheets.setdefault(sheet, sheet)
+        self._merged[key] = (contents, sheet)
+        return sheet
+    # end def merged
+
+    def general_stylesheet(self):
+        """The general stylesheet, compiled with the current theme.
+
+        With use_palette, the rules translated to palettes and fonts are
+        removed from the stylesheet and set on the application instead.
+        Returns:
+            The general stylesheet.
+        """
+        sheet = self.compiled(self.general_css_file) or ''
+        if not self.use_palette:
+            return sheet
+        # end if
+        if self._palette_split is None or self._palette_split[0] is not sheet:
+            self._palette_split = (sheet, ) + split_stylesheet(sheet)
+        # end if
+        app = QtWidgets.QApplication.instance()
+        if app is not None and self._palette_applied is not sheet:
+            apply_rules(self._palette_split[1], app)
+            self._palette_applied = sheet
+        # end if
+        return self._palette_split[2]
+    # end def general_stylesheet
+
+    def install(self, app=None):
+        """Install the general stylesheet on the application.
+
+        Args:
+            app (QApplication): The application, defaults to the
+                                current instance.
+        """
+        app = app or QtWidgets.QApplication.instance()
+        app.setStyleSheet(self.merged(self.general_css_file))
+        self.application = app
+    # end def install
+
+    def uninstall(self):
+        """Remove the general stylesheet from the application."""
+        if self.application is not None:
+            self.application.setStyleSheet('')
+        # end if
+        self.application = None
+    # end def uninstall
+
+    def is_installed(self):
+        """Whether the general stylesheet is set on the application."""
+        return (self.application is not None and
+                self.application is QtWidgets.QApplication.instance())
+    # end def is_installed
+
+    def stylesheet(self, widget_css_file=None):
+        """The stylesheet for a widget.
+
+        Args:
+            widget_css_file (str): The optional stylesheet of the widget.
+        Returns:
+            The widget stylesheet only if the general stylesheet is
+            installed on the application, otherwise the general and
+            widget stylesheet merged.
+        """
+        if self.is_installed():
+            return self.merged(widget_css_file)
+        # end if
+        return self.merged(self.general_css_file, widget_css_file)
+    # end def stylesheet
+
+    def apply(self, widget, widget_css_file=None):
+        """Set the stylesheet to the widget.
+
+        The stylesheet is only set if it differs from the current
+        stylesheet of the widget, setting it makes Qt parse it again.
+        The widget is tracked, so its stylesheet is updated when the
+        theme changes.
+        Args:
+            widget (QWidget): The widget.
+            widget_css_file (str): The optional stylesheet of the widget.
+        Returns:
+            Whether the stylesheet of the widget has been set.
+        """
+        try:
+            self._widgets[widget] = widget_css_file
+        except TypeError:
+            pass
+        # end try
+        sheet = self.stylesheet(widget_css_file)
+        if widget.styleSheet() == sheet:
+            return False
+        # end if
+        widget.setStyleSheet(sheet)
+        return True
+    # end def apply
+
+    def add_theme(self, theme):
+        """Make the theme available for set_theme.
+
+        Args:
+            theme (Theme): The theme.
+        """
+        self.themes[theme.name] = theme
+        self._variables.pop(theme.name, None)
+    # end def add_theme
+
+    def set_theme(self, theme):
+        """Switch to the given theme.
+
+        The general stylesheet is updated on the application, if
+        installed. The stylesheets of the live widgets are only set
+        again if they changed with the theme.
+        Args:
+            theme (Theme or str): The theme or the name of a theme
+                                  added with add_theme.
+        Returns:
+            The number of widgets whose stylesheet has been set.
+        """
+        if isinstance(theme, Theme):
+            self.add_theme(theme)
+        elif theme not in self.themes:
+            raise ValueError('Unknown theme "%s", choose from %s' %
+                             (theme, ', '.join(sorted(self.themes))))
+        else:
+            theme = self.themes[theme]
+        # end if
+        self.theme = theme
+        if self.is_installed():
+            sheet = self.merged(self.general_css_file)
+            if self.application.styleSheet() != sheet:
+                self.application.setStyleSheet(sheet)
+            # end if
+        # end if
+        updated = 0
+        for widget, widget_css_file in list(self._widgets.items()):
+            try:
+                updated += self.apply(widget, widget_css_file)
+            except RuntimeError:
+                # The C++ object of the widget has already been deleted
+                self._widgets.pop(widget, None)
+            # end try
+        # end for
+        return updated
+    # end def set_theme
+
+    def clear(self):
+        """Clear the cached files and stylesheets."""
+        self._files.clear()
+        self._variables.clear()
+        self._compiled.clear()
+        self._merged.clear()
+        self._sheets.clear()
+        self._palette_split = None
+        self._palette_applied = None
+    # end def clear
+# end class StyleSheetRegistry
@@ -0,0 +1,84 @@
+"""Themes for the templated stylesheets.
+
+The stylesheets reference theme variables as $name. The default values
+of the variables are defined in the leading comment of the general
+stylesheet, one "name = value" per line. A Theme overrides any of these
+values.
+"""
+import re
+import string
+__all__ = ['DEFAULT_THEME', 'Theme', 'parse_variables', 'compile_stylesheet']
+
+
+DEFAULT_THEME = 'default'
+
+_VARIABLE = re.compile(r'^\s*([A-Za-z_]\w*)\s*=\s*(.+?)\s*$', re.MULTILINE)
+
+
+class Theme(object):
+    """A named set of values for the stylesheet variables."""
+
+    def __init__(self, name, variables=None):
+        """Initialize the Theme.
+
+        Args:
+            name (str): The name of the theme.
+            variables (dict): The values of the variables, overriding
+                              the default values.
+        """
+        self.name = name
+        self.variables = dict(variables or {})
+    # end def __init__
+
+    @classmethod
+    def from_css(cls, name, css):
+        """Create a theme from the variables defined in a stylesheet.
+
+        Args:
+            name (str): The name of the theme.
+            css (str): The stylesheet, see parse_variables.
+        Returns:
+            The Theme.
+        """
+        return cls(name, parse_variables(css))
+    # end def from_css
+
+    def __repr__(self):
+        """The name of the theme."""
+        return 'Theme(%r)' % self.name
+    # end def __repr__
+# end class Theme
+
+
+def parse_variables(css):
+    """Read the variables from the leading comment of the stylesheet.
+
+    Args:
+        css (str): The stylesheet.
+    Returns:
+        The variables by name.
+    """
+    css = css.lstrip()
+    if not css.startswith('/*'):
+        return dict()
+    # end if
+    comment = css[2:css.find('*/')]
+    return dict(_VARIABLE.findall(comment))
+# end def parse_variables
+
+
+def compile_stylesheet(css, variables):
+    """Replace the variables in the stylesheet with their values.
+
+    Unknown variables are left untouched.
+    Args:
+        css (str): The templated stylesheet.
+        variables (dict): The values of the variables.
+    Returns:
+        The compiled stylesheet.
+    """
+    if '$' not in css:
+        return css
+    # end if
+    return string.Template(css).safe_substitute(variables)
+# end def compile_stylesheet
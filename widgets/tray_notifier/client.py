@@ -0,0 +1,178 @@
+"""Send notifications to the TrayNotifier of another process.
+
+The client does not need Qt, see ipc.NotificationServer for the
+protocol.
+"""
+import getpass
+import json
+import os
+import socket
+import stat
+import tempfile
+import time
+__all__ = ['NotificationClient', 'server_path']
+
+
+def server_path(name=None):
+    """The path of the socket the server listens on.
+
+    The socket is placed in a folder only the user can access, so no
+    other user can take the name over or listen in.
+    Args:
+        name (str): The name of the server or the path of the socket,
+                    defaults to one server per user.
+    Returns:
+        The socket path, or the pipe name on Windows.
+    Raises:
+        RuntimeError: If the socket folder is accessible by other users.
+    """
+    name = name or 'widgets-tray-notifier-%s' % getpass.getuser()
+    if os.name == 'nt' or os.path.isabs(name):
+        return name
+    # end if
+    return os.path.join(_socket_dir(), name)
+# end def server_path
+
+
+def _socket_dir():
+    """The folder of the sockets of the user.
+
+    Returns:
+        The XDG_RUNTIME_DIR or a folder in the temp folder, created if
+        missing.
+    Raises:
+        RuntimeError: If the folder is accessible by other users.
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and _is_private_dir(runtime_dir):
+        return runtime_dir
+    # end if
+    directory = os.path.join(tempfile.gettempdir(),
+                             'widgets-%s' % getpass.getuser())
+    try:
+        os.mkdir(directory, 0o700)
+    except OSError:
+        # Created before, or by someone else, checked below
+        pass
+    # end try
+    if not _is_private_dir(directory):
+        raise RuntimeError('The socket folder %s is accessible by other '
+                           'users' % directory)
+    # end if
+    return directory
+# end def _socket_dir
+
+
+def _is_private_dir(directory):
+    """Whether the folder is owned and only accessible by the user.
+
+    Args:
+        directory (str): The folder.
+    Returns:
+        True if the folder can hold the sockets.
+    """
+    try:
+        status = os.lstat(directory)
+    except OSError:
+        return False
+    # end try
+    return (stat.S_ISDIR(status.st_mode) and
+            status.st_uid == os.getuid() and
+            not status.st_mode & 0o077)
+# end def _is_private_dir
+
+
+class NotificationClient(object):
+    """Send notifications to a NotificationServer.
+
+    The connection is opened on the first send and kept open. Sending
+    blocks while the server applies backpressure.
+    """
+
+    def __init__(self, name=None, timeout=10.0):
+        """Initialize the NotificationClient.
+
+        Args:
+            name (str): The name of the server, see server_path.
+            timeout (float): Seconds a send may block.
+        """
+        self.path = server_path(name)
+        self.timeout = timeout
+        self._connection = None
+    # end def __init__
+
+    def send(self, message, key=None, title=None, summary=None):
+        """Send one notification.
+
+        Args:
+            message (str): The message.
+            key (hashable): Notifications with the same key coalesce.
+            title (str): The title.
+            summary (str): The text of coalesced notifications,
+                           formatted with the count.
+        """
+        self.send_many([dict(message=message, key=key, title=title,
+                             summary=summary)])
+    # end def send
+
+    def send_many(self, notifications):
+        """Send several notifications with one write.
+
+        Args:
+            notifications (list[dict]): The fields of the notifications.
+        """
+        sent = time.time()
+        data = ''.join(json.dumps(dict(n, sent=sent)) + '\n'
+                       for n in notifications).encode('utf-8')
+        try:
+            self._write(data)
+        except socket.timeout:
+            raise
+        except (IOError, OSError):
+            # The server might have been restarted, reconnect once
+            self.close()
+            self._write(data)
+        # end try
+    # end def send_many
+
+    def close(self):
+        """Close the connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        # end if
+    # end def close
+
+    def __enter__(self):
+        """Use the client as context manager."""
+        return self
+    # end def __enter__
+
+    def __exit__(self, *args):
+        """Close the connection."""
+        self.close()
+    # end def __exit__
+
+    def _write(self, data):
+        """Write the data, connecting first if needed.
+
+        Args:
+            data (bytes): The data.
+        """
+        if self._connection is None:
+            if os.name == 'nt':
+                self._connection = open(r'\\.\pipe\%s' % self.path, 'wb', 0)
+            else:
+                connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                connection.settimeout(self.timeout)
+                connection.connect(self.path)
+                self._connection = connection
+            # end if
+        # end if
+        if os.name == 'nt':
+            self._connection.write(data)
+        else:
+            self._connection.sendall(data)
+        # end if
+    # end def _write
+# end class NotificationClient
@@ -0,0 +1,202 @@
+"""Receive notifications from other processes over a local socket.
+
+The NotificationServer listens on a QLocalServer, a Unix domain socket
+or a named pipe on Windows. Clients keep their connection open and
+write newline delimited JSON objects:
+
+    {"message": "Render finished", "key": "render", "title": "Farm",
+     "summary": "{count} renders finished", "sent": 1500000000.0}
+
+Only "message" is required. Everything a socket received is read at
+once and split into lines. When the notification queue falls behind,
+the server stops reading, the socket buffers fill up and the writing
+clients block until the queue has caught up.
+The processes send with a client.NotificationClient.
+"""
+import json
+import time
+from collections import deque
+from functools import partial
+
+from Qt import QtCore, QtNetwork
+
+from widgets.tray_notifier.client import server_path
+__all__ = ['NotificationServer']
+
+
+class NotificationServer(QtCore.QObject):
+    """Post the notifications received from local clients to a queue."""
+
+    # Reading pauses while the queue has more undrained notifications
+    max_backlog = 10000
+
+    # The bytes Qt buffers per socket before it stops reading
+    read_buffer_size = 64 * 1024
+
+    # Milliseconds between the checks whether paused reading can resume
+    resume_interval = 20
+
+    # Milliseconds to wait for a running server to accept a connection
+    probe_timeout = 200
+
+    def __init__(self, queue, name=None, track_latency=False, parent=None):
+        """Initialize the NotificationServer.
+
+        Args:
+            queue (NotificationQueue): Receives the notifications.
+            name (str): The name of the server, see server_path.
+            track_latency (bool): Whether to record the delay between
+                                  sending and receiving of the messages
+                                  carrying a "sent" time.
+            parent (QObject): The parent.
+        """
+        super(NotificationServer, self).__init__(parent)
+        self.queue = queue
+        self.path = server_path(name)
+        self.received = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=100000) if track_latency else None
+        self._server = QtNetwork.QLocalServer(self)
+        self._server.newConnection.connect(self._accept)
+        self._buffers = dict()
+        self._paused = set()
+        self._resume_timer = QtCore.QTimer(self)
+        self._resume_timer.setInterval(self.resume_interval)
+        self._resume_timer.timeout.connect(self._resume)
+    # end def __init__
+
+    def listen(self):
+        """Start listening, replacing a stale socket of a dead server.
+
+        Raises:
+            RuntimeError: If another server is running under the name or
+                          listening fails.
+        """
+        if self._is_running():
+            raise RuntimeError('Another notifier is listening on %s' %
+                               self.path)
+        # end if
+        QtNetwork.QLocalServer.removeServer(self.path)
+        if hasattr(self._server, 'setSocketOptions'):
+            # Qt 5, restricts the socket and the Windows pipe to the user
+            self._server.setSocketOptions(
+                QtNetwork.QLocalServer.UserAccessOption)
+        # end if
+        if not self._server.listen(self.path):
+            raise RuntimeError('Can not listen on %s: %s' % (
+                self.path, self._server.errorString()))
+        # end if
+    # end def listen
+
+    def _is_running(self):
+        """Whether a server accepts connections under the name."""
+        probe = QtNetwork.QLocalSocket()
+        probe.connectToServer(self.path)
+        running = probe.waitForConnected(self.probe_timeout)
+        probe.abort()
+        return running
+    # end def _is_running
+
+    def close(self):
+        """Stop listening and disconnect all clients."""
+        self._resume_timer.stop()
+        self._server.close()
+        for connection in list(self._buffers):
+            connection.abort()
+        # end for
+        self._buffers.clear()
+        self._paused.clear()
+    # end def close
+
+    def connection_count(self):
+        """The number of connected clients."""
+        return len(self._buffers)
+    # end def connection_count
+
+    def _accept(self):
+        """Accept the pending client connections."""
+        while self._server.hasPendingConnections():
+            connection = self._server.nextPendingConnection()
+            connection.setReadBufferSize(self.read_buffer_size)
+            self._buffers[connection] = b''
+            connection.readyRead.connect(partial(self._read, connection))
+            connection.disconnected.connect(partial(self._drop, connection))
+        # end while
+    # end def _accept
+
+    def _drop(self, connection):
+        """Read what is left and forget the disconnected client."""
+        self._read(connection, force=True)
+        self._buffers.pop(connection, None)
+        self._paused.discard(connection)
+        connection.deleteLater()
+    # end def _drop
+
+    def _read(self, connection, force=False):
+        """Read everything the client sent, unless the queue is behind.
+
+        Args:
+            connection (QLocalSocket): The client connection.
+            force (bool): Read even if the queue is behind.
+        """
+        if connection not in self._buffers:
+            return
+        # end if
+        if not force and self.queue.backlog() >= self.max_backlog:
+            self._paused.add(connection)
+            self._resume_timer.start()
+            return
+        # end if
+        lines = (self._buffers[connection] +
+                 bytes(connection.readAll())).split(b'\n')
+        self._buffers[connection] = lines.pop()
+        now = time.time()
+        for line in lines:
+            if line.strip():
+                self._post(line, now)
+            # end if
+        # end for
+    # end def _read
+
+    def _post(self, line, now):
+        """Post the notification of one line.
+
+        Args:
+            line (bytes): The JSON object.
+            now (float): The time of receiving.
+        """
+        try:
+            fields = json.loads(line.decode('utf-8'))
+            message = fields['message']
+            key = fields.get('key')
+            if isinstance(key, list):
+                key = tuple(key)
+            # end if
+            # The key is hashed when the queue is drained
+            hash(key)
+            sent = float(fields['sent']) if 'sent' in fields else None
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.errors += 1
+            return
+        # end try
+        self.queue.post(message, key=key,
+                        title=fields.get('title') or 'TrayNotifier',
+                        summary=fields.get('summary'))
+        self.received += 1
+        if self.latencies is not None and sent is not None:
+            self.latencies.append(now - sent)
+        # end if
+    # end def _post
+
+    def _resume(self):
+        """Read from the paused clients once the queue caught up."""
+        if self.queue.backlog() >= self.max_backlog // 2:
+            return
+        # end if
+        self._resume_timer.stop()
+        paused, self._paused = self._paused, set()
+        for connection in paused:
+            self._read(connection)
+        # end for
+    # end def _resume
+# end class NotificationServer
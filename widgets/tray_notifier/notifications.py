@@ -0,0 +1,160 @@
+"""Thread-safe notification pipeline for the TrayNotifier.
+
+Any thread posts notifications, which only appends them to a deque.
+The GUI thread drains the deque in batches, coalesces the notifications
+by key, e.g. "12 jobs finished" instead of twelve popups, and pops them
+up at a limited rate. The shown notifications are kept in a bounded
+history.
+"""
+import time
+from collections import OrderedDict, deque
+__all__ = ['Notification', 'NotificationQueue']
+
+
+class Notification(object):
+    """A notification, possibly standing for several coalesced ones."""
+
+    __slots__ = ('key', 'title', 'message', 'summary', 'count', 'first',
+                 'last')
+
+    def __init__(self, key, title, message, summary, timestamp):
+        """Initialize the Notification.
+
+        Args:
+            key (hashable): Notifications with the same key coalesce.
+            title (str): The title.
+            message (str): The message.
+            summary (str): Shown instead of the message for coalesced
+                           notifications, formatted with the count,
+                           e.g. "{count} jobs finished".
+            timestamp (float): The time of posting.
+        """
+        self.key = key
+        self.title = title
+        self.message = message
+        self.summary = summary
+        self.count = 1
+        self.first = timestamp
+        self.last = timestamp
+    # end def __init__
+
+    def text(self):
+        """The text of the notification."""
+        if self.count == 1:
+            return self.message
+        # end if
+        if self.summary:
+            return self.summary.format(count=self.count)
+        # end if
+        return '%s (%d times)' % (self.message, self.count)
+    # end def text
+
+    def __repr__(self):
+        """The text of the notification."""
+        return 'Notification(%r)' % self.text()
+    # end def __repr__
+# end class Notification
+
+
+class NotificationQueue(object):
+    """Collect, coalesce and rate limit notifications.
+
+    post can be called from any thread, the other methods only from the
+    GUI thread.
+    """
+
+    def __init__(self, history_size=500, popup_interval=2.0, batch_size=1000):
+        """Initialize the NotificationQueue.
+
+        Args:
+            history_size (int): The number of shown notifications kept.
+            popup_interval (float): The minimum seconds between popups.
+            batch_size (int): The maximum number of notifications
+                              drained at once.
+        """
+        self.popup_interval = popup_interval
+        self.batch_size = batch_size
+        self.history = deque(maxlen=history_size)
+        self.received = 0
+        self.popups = 0
+        self._incoming = deque()
+        self._pending = OrderedDict()
+        self._last_popup = None
+    # end def __init__
+
+    def post(self, message, key=None, title='TrayNotifier', summary=None):
+        """Add a notification, can be called from any thread.
+
+        Args:
+            message (str): The message.
+            key (hashable): Notifications with the same key are
+                            coalesced, defaults to the title and message,
+                            so duplicates coalesce.
+            title (str): The title.
+            summary (str): The text of coalesced notifications,
+                           formatted with the count.
+        """
+        # deque.append is atomic, no lock needed
+        self._incoming.append((time.time(), key, title, message, summary))
+    # end def post
+
+    def drain(self):
+        """Move a batch of posted notifications into the pending ones.
+
+        Returns:
+            The number of drained notifications.
+        """
+        incoming = self._incoming
+        pending = self._pending
+        drained = 0
+        while drained < self.batch_size:
+            try:
+                timestamp, key, title, message, summary = incoming.popleft()
+            except IndexError:
+                break
+            # end try
+            drained += 1
+            if key is None:
+                key = (title, message)
+            # end if
+            notification = pending.get(key)
+            if notification is None:
+                pending[key] = Notification(key, title, message, summary,
+                                            timestamp)
+            else:
+                notification.count += 1
+                notification.message = message
+                notification.last = timestamp
+            # end if
+        # end while
+        self.received += drained
+        return drained
+    # end def drain
+
+    def pop_popup(self, now=None):
+        """Take the pending notifications, unless rate limited.
+
+        Args:
+            now (float): The current time.
+        Returns:
+            The coalesced notifications to show, an empty list if there
+            are none or the last popup is too recent.
+        """
+        now = time.time() if now is None else now
+        if not self._pending or (self._last_popup is not None and
+                                 now - self._last_popup < self.popup_interval):
+            return list()
+        # end if
+        notifications = list(self._pending.values())
+        self._pending.clear()
+        self.history.extend(notifications)
+        self._last_popup = now
+        self.popups += 1
+        return notifications
+    # end def pop_popup
+
+    def backlog(self):
+        """The number of posted notifications not drained yet."""
+        return len(self._incoming)
+    # end def backlog
+# end class NotificationQueue
@@ -1,9 +1,12 @@
 """Notifier Widget, that hides itself in the tray bar."""
 import os
 
-from Qt import QtCore, QtWidgets
+from Qt import QtCore, QtGui, QtWidgets
 
-from widgets import utility
+from widgets import diagnostics, utility
+from widgets.animation import animator
+from widgets.geometry import screens
+from widgets.tray_notifier.notifications import NotificationQueue
 __all__ = ['NotifierTrayIcon', 'TrayNotifier']
 
 
@@ -25,26 +28,108 @@ class TrayNotifier(utility.ui_class(__file__, 'TrayNotifier')):
 
     It collapses to a tray icon and pops up at a position near
     the tray icon.
+    Notifications posted with notify, from any thread, are drained in
+    batches on the GUI thread, coalesced and shown as tray messages at
+    most every popup_interval seconds. The list shows the history.
     """
 
-    def __init__(self):
-        """Setup the tray icon and signals."""
+    # Milliseconds between two drains of the notification queue
+    drain_interval = 50
+
+    # The maximum number of notifications listed in one tray message
+    max_popup_lines = 5
+
+    def __init__(self, history_size=500, popup_interval=2.0):
+        """Setup the tray icon and signals.
+
+        Args:
+            history_size (int): The number of notifications listed.
+            popup_interval (float): The minimum seconds between two
+                                    tray messages.
+        """
         super(TrayNotifier, self).__init__()
         self.setupUi(self)
         self.width = 150
         self.height = 100
+        self.animation_speed = 150
         self._init_tray_icon()
         self._close_action = False
         self.setWindowFlags(QtCore.Qt.Widget |
                             QtCore.Qt.FramelessWindowHint |
                             QtCore.Qt.WindowStaysOnTopHint)
+        self.notifications = NotificationQueue(history_size, popup_interval)
+        self._drain_timer = QtCore.QTimer(self)
+        self._drain_timer.setInterval(self.drain_interval)
+        self._drain_timer.timeout.connect(self._drain_notifications)
+        self._drain_timer.start()
+        diagnostics.track(self)
     # end def __init__
 
+    def notify(self, message, key=None, title='TrayNotifier', summary=None):
+        """Post a notification, can be called from any thread.
+
+        See NotificationQueue.post.
+        Args:
+            message (str): The message.
+            key (hashable): Notifications with the same key coalesce.
+            title (str): The title.
+            summary (str): The text of coalesced notifications,
+                           formatted with the count.
+        """
+        self.notifications.post(message, key=key, title=title,
+                                summary=summary)
+    # end def notify
+
+    def listen(self, name=None):
+        """Receive notifications from other processes.
+
+        See ipc.NotificationServer, the processes send with a
+        client.NotificationClient.
+        Args:
+            name (str): The name of the server, defaults to one server
+                        per user.
+        Returns:
+            The NotificationServer.
+        """
+        from widgets.tray_notifier.ipc import NotificationServer
+        self.server = NotificationServer(self.notifications, name, parent=self)
+        self.server.listen()
+        return self.server
+    # end def listen
+
+    def _drain_notifications(self):
+        """Coalesce the posted notifications and pop them up."""
+        self.notifications.drain()
+        popup = self.notifications.pop_popup()
+        if not popup:
+            return
+        # end if
+        if len(popup) == 1:
+            title = popup[0].title
+        else:
+            title = '%d notifications' % sum(n.count for n in popup)
+        # end if
+        lines = [n.text() for n in popup[:self.max_popup_lines]]
+        if len(popup) > self.max_popup_lines:
+            lines.append('... and %d more' % (
+                len(popup) - self.max_popup_lines))
+        # end if
+        self.system_tray_icon.showMessage(title, '\n'.join(lines))
+        self._show_history()
+    # end def _drain_notifications
+
+    def _show_history(self):
+        """List the shown notifications, the newest first."""
+        self.listWidget.clear()
+        self.listWidget.addItems(
+            [n.text() for n in reversed(self.notifications.history)])
+    # end def _show_history
+
     def _init_tray_icon(self):
         """Initialize the tray icon."""
         icon = os.path.join(os.path.dirname(__file__),
                             'resource', 'TrayNotifier.png')
-        icon = QtWidgets.QIcon(QtWidgets.QPixmap(icon))
+        icon = QtGui.QIcon(QtGui.QPixmap(icon))
         self.system_tray_icon = NotifierTrayIcon(icon, self)
         self.system_tray_icon.setVisible(True)
         self.system_tray_icon.setToolTip('TrayNotifier')
@@ -75,15 +160,19 @@ class TrayNotifier(utility.ui_class(__file__, 'TrayNotifier')):
     def show(self):
         """Show the TrayNotifier."""
         trayicon_geo = self.system_tray_icon.geometry()
-        avaibable_geo = (QtWidgets.QApplication.instance().desktop()
-                         .availableGeometry())
-        x = (trayicon_geo.x() +
-             avaibable_geo.x() +
-             trayicon_geo.width() -
-             self.width)
-        y = avaibable_geo.height() - self.height - 30
+        avaibable_geo = screens().available_geometry(
+            screens().screen_at(trayicon_geo.center()))
+        x = trayicon_geo.x() + trayicon_geo.width() - self.width
+        x = max(avaibable_geo.x(),
+                min(x, avaibable_geo.x() + avaibable_geo.width() - self.width))
+        y = avaibable_geo.y() + avaibable_geo.height() - self.height - 30
         self.setGeometry(x, y, self.width, self.height)
         QtWidgets.QWidget.show(self)
+        # Slide up from the bottom of the screen
+        animator().slide(
+            self,
+            QtCore.QPoint(x, avaibable_geo.y() + avaibable_geo.height()),
+            QtCore.QPoint(x, y), self.animation_speed)
     # end def show
 
     def closeEvent(self, event):
@@ -1,52 +1,625 @@
 """Useful qt utility functions."""
+import hashlib
+import importlib
+import io
+import marshal
 import os
+import subprocess
+import sys
 import xml.etree.ElementTree as xml
-from cStringIO import StringIO
+from collections import OrderedDict
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+# end try
 
-import pysideuic
+import Qt
 from Qt import QtWidgets
+try:
+    import pysideuic
+except ImportError:
+    try:
+        import pyside2uic as pysideuic
+    except ImportError:
+        pysideuic = None
+    # end try
+# end try
 
+from widgets.instrumentation import timed
+from widgets.stylesheet import StyleSheetRegistry
+try:
+    from widgets import compiled as precompiled
+except ImportError:
+    precompiled = None
+# end try
+
+
+# The compiled .ui forms are cached in this folder of the user, an
+# empty string disables the cache. The cached code is executed, so the
+# folder is only used if no other user can write to it.
+UI_CACHE_DIR = os.environ.get(
+    'WIDGETS_UI_CACHE_DIR',
+    os.path.join(os.environ.get('XDG_CACHE_HOME') or
+                 os.path.join(os.path.expanduser('~'), '.cache'),
+                 'widgets_ui_cache'))
+
+# The loader used to load the .ui files, one of the UI_LOADERS or
+# 'auto' to use the first available loader.
+UI_LOADER = os.environ.get('WIDGETS_UI_LOADER', 'auto')
+
+# Whether the binding has been found to lack a working loadUiType, it
+# is not tried again in this process
+_native_unavailable = False
+
+
+@timed('utility.ui_class')
+def ui_class(widget_file, widget_name, loader=None):
+    """Build a class from a designer .ui file.
+
+    Only the class of the top level widget is read from the .ui file
+    when the class is built. The form itself is loaded when the first
+    instance is created, so importing a module that derives a widget
+    from a ui_class does not compile the .ui file.
+    Args:
+        widget_file (str): The file path to the widget code.
+        widget_name (str): The class name of the widget.
+        loader (str): The ui loader, defaults to UI_LOADER.
+    Returns:
+        The base class for the widget.
+    """
+    ui_file = get_ui_file_path(widget_file, widget_name)
+    base_class = getattr(QtWidgets, _ui_widget_class(ui_file))
+
+    class BaseUi(base_class):
+        _ui_file = ui_file
+        _ui_loader = loader
+        _ui_loaded = False
 
-def ui_class(widget_file, widget_name):
-    """Build a class from a designer .ui file."""
-    b, f = _load_ui_type(get_ui_file_path(widget_file, widget_name))
-    class BaseUi(b, f):
         def __init__(self, parent=None):
             super(BaseUi, self).__init__(parent=parent)
+            if not BaseUi._ui_loaded:
+                _load_ui_form(BaseUi)
+            # end if
             self.setupUi(self)
+        # end def __init__
+    # end class BaseUi
     return BaseUi
 # end def ui_class
 
 
-def _load_ui_type(ui_file):
-    """Load a ui file for PySide.
+def _ui_widget_class(ui_file):
+    """Read the class name of the top level widget from the ui file.
 
-    PySide lacks the "_load_ui_type" command, so we have to convert
-    the UI file to python code in-memory first and then execute it in a
-    special frame to retrieve the form_class.
+    The precompiled form is consulted first, otherwise the file is
+    parsed up to the top level widget element.
     Args:
         ui_file (str): The .ui file.
+    Returns:
+        The class name of the top level widget.
+    """
+    form = _precompiled_form(ui_file)
+    if form is not None:
+        return form[0]
+    # end if
+    with open(ui_file, 'rb') as f:
+        for _, element in xml.iterparse(f, events=('start', )):
+            if element.tag == 'widget':
+                return element.get('class')
+            # end if
+        # end for
+    # end reading the ui file
+    raise ValueError('No widget defined in %s' % ui_file)
+# end def _ui_widget_class
+
+
+def _load_ui_form(ui_base):
+    """Load the form of the ui file and add it to the given ui class.
+
+    The methods of the form class (setupUi, retranslateUi) are added
+    to the ui class, the result is the same as if the ui class had
+    been derived from the form class in the first place.
+    Args:
+        ui_base (type): The class built by ui_class.
+    """
+    form_class = _load_ui_type(ui_base._ui_file, ui_base._ui_loader)[1]
+    for name, value in vars(form_class).items():
+        if not name.startswith('__'):
+            setattr(ui_base, name, value)
+        # end if
+    # end for
+    ui_base._ui_loaded = True
+# end def _load_ui_form
+
+
+@timed('utility.load_ui_type')
+def _load_ui_type(ui_file, loader=None):
+    """Load a ui file with the given ui loader.
+
+    With the 'auto' loader, the UI_LOADERS are tried in order and the
+    first one that is available for the ui file and the Qt binding
+    is used.
+    Args:
+        ui_file (str): The .ui file.
+        loader (str): The name of the loader, defaults to UI_LOADER.
     Returns:
         The base and form class, derived from the .ui file.
     """
-    parsed = xml.parse(ui_file)
+    loader = loader or UI_LOADER
+    if loader == 'auto':
+        for load in UI_LOADERS.values():
+            loaded = load(ui_file)
+            if loaded is not None:
+                return loaded
+            # end if
+        # end for
+        raise ValueError('No ui loader available for %s' % ui_file)
+    # end if
+    if loader not in UI_LOADERS:
+        raise ValueError('Unknown ui loader "%s", choose from %s' %
+                         (loader, ', '.join(['auto'] + list(UI_LOADERS))))
+    # end if
+    loaded = UI_LOADERS[loader](ui_file)
+    if loaded is None:
+        raise ValueError('The "%s" ui loader is not available for %s' %
+                         (loader, ui_file))
+    # end if
+    return loaded
+# end def _load_ui_type
+
+
+def _load_ui_type_precompiled(ui_file):
+    """Load the form precompiled by widgets.precompile.
+
+    Args:
+        ui_file (str): The .ui file.
+    Returns:
+        The base and form class or None if there is no up to date
+        precompiled form.
+    """
+    form = _precompiled_form(ui_file)
+    if form is None:
+        return None
+    # end if
+    widget_class, module_name, form_class = form
+    module = importlib.import_module(
+        '%s.%s' % (precompiled.__name__, module_name))
+    return (getattr(QtWidgets, widget_class),
+            getattr(module, 'Ui_%s' % form_class))
+# end def _load_ui_type_precompiled
+
+
+def _load_ui_type_native(ui_file):
+    """Load the ui file with the loadUiType function of the binding.
+
+    PyQt provides loadUiType in the uic module, PySide2 (5.14+) and
+    PySide6 in the QtUiTools module. PySide runs the uic executable for
+    every form, the result is not cached.
+    Args:
+        ui_file (str): The .ui file.
+    Returns:
+        The base and form class or None if the binding does not
+        provide a working loadUiType function or it fails.
+    """
+    global _native_unavailable
+    binding = getattr(Qt, '__binding__', '')
+    if _native_unavailable or not binding:
+        return None
+    # end if
+    module = 'uic' if binding.startswith('PyQt') else 'QtUiTools'
+    try:
+        load = getattr(importlib.import_module('%s.%s' % (binding, module)),
+                       'loadUiType', None)
+    except ImportError:
+        load = None
+    # end try
+    if load is None:
+        _native_unavailable = True
+        return None
+    # end if
+    try:
+        loaded = load(ui_file)
+    except Exception:
+        return None
+    # end try
+    if loaded is None:
+        # PySide2 returns None if the uic executable is missing, after
+        # printing an error, so it is not run again
+        _native_unavailable = True
+        return None
+    # end if
+    form_class, base_class = loaded
+    return base_class, form_class
+# end def _load_ui_type_native
+
+
+def _load_ui_type_pysideuic(ui_file):
+    """Load a ui file for PySide.
+
+    PySide lacks the "loadUiType" command, so we have to convert
+    the UI file to python code first and then execute it in a special
+    frame to retrieve the form_class.
+    The compiled code is cached on disk, see _compiled_ui_form.
+    Args:
+        ui_file (str): The .ui file.
+    Returns:
+        The base and form class or None if pysideuic is not available.
+    """
+    if pysideuic is None:
+        return None
+    # end if
+    widget_class, form_class, code = _compiled_ui_form(ui_file)
+    frame = {}
+    exec(code, frame)
+
+    # Fetch the base_class and form_class based on their type
+    # in the xml from designer
+    base_class = getattr(QtWidgets, widget_class)
+    form_class = frame['Ui_%s' % form_class]
+    return base_class, form_class
+# end def _load_ui_type_pysideuic
+
+
+def _load_ui_type_quiloader(ui_file):
+    """Load the ui file with the QUiLoader of the binding.
+
+    The ui file is not converted to a form class, instead the setupUi
+    method of the returned form loads the ui file into the widget,
+    via QtCompat.loadUi.
+    Args:
+        ui_file (str): The .ui file.
+    Returns:
+        The base and form class or None if Qt.py does not provide
+        QtCompat.loadUi.
+    """
+    load_ui = getattr(getattr(Qt, 'QtCompat', None), 'loadUi', None)
+    if load_ui is None:
+        return None
+    # end if
+
+    class UiForm(object):
+        def setupUi(self, widget):
+            load_ui(ui_file, widget)
+        # end def setupUi
+
+        def retranslateUi(self, widget):
+            pass
+        # end def retranslateUi
+    # end class UiForm
+    return getattr(QtWidgets, _ui_widget_class(ui_file)), UiForm
+# end def _load_ui_type_quiloader
+
+
+# The available ui loaders, in the order they are tried by 'auto'. The
+# pysideuic loader caches the compiled forms on disk, so it is preferred
+# over the native loader.
+UI_LOADERS = OrderedDict([
+    ('precompiled', _load_ui_type_precompiled),
+    ('pysideuic', _load_ui_type_pysideuic),
+    ('native', _load_ui_type_native),
+    ('quiloader', _load_ui_type_quiloader)])
+
+
+def _compiled_ui_form(ui_file):
+    """Retrieve the compiled form code for the given ui file.
+
+    The code is taken from the ui cache if the cache holds a version
+    that was compiled from the same .ui content with the same pysideuic
+    and python versions. Otherwise the ui file is compiled and the
+    cache is updated.
+    Args:
+        ui_file (str): The .ui file.
+    Returns:
+        The widget class name, the form class name and the code object.
+    """
+    with open(ui_file, 'rb') as f:
+        content = f.read()
+    # end reading the ui file
+    key = (hashlib.sha1(content).hexdigest(),
+           getattr(pysideuic, '__version__', ''),
+           sys.version)
+    cache_file = get_ui_cache_file_path(ui_file)
+    if cache_file is not None:
+        form = _read_ui_cache(cache_file, key)
+        if form is not None:
+            return form
+        # end if
+    # end if
+    form = _compile_ui_form(ui_file, content)
+    if cache_file is not None:
+        _write_ui_cache(cache_file, key, form)
+    # end if
+    return form
+# end def _compiled_ui_form
+
+
+def _compile_ui_form(ui_file, content):
+    """Convert the ui file to python code and compile it.
+
+    Args:
+        ui_file (str): The .ui file.
+        content (str): The content of the .ui file.
+    Returns:
+        The widget class name, the form class name and the code object.
+    """
+    widget_class, form_class, source = ui_form_source(content)
+    code = compile(source, ui_file, 'exec')
+    return widget_class, form_class, code
+# end def _compile_ui_form
+
+
+def ui_form_source(content):
+    """Convert the content of a ui file to python code.
+
+    pysideuic is used if available, otherwise the uic executable shipped
+    with PySide2 (5.14+) and PySide6.
+    Args:
+        content (str): The content of the .ui file.
+    Returns:
+        The widget class name, the form class name and the python code.
+    Raises:
+        ImportError: If neither pysideuic nor the uic of the binding is
+                     available.
+        RuntimeError: If the uic of the binding fails.
+    """
+    parsed = xml.fromstring(content)
     widget_class = parsed.find('widget').get('class')
     form_class = parsed.find('class').text
-    with open(ui_file, 'r') as f:
+    if pysideuic is not None:
         o = StringIO()
-        frame = {}
+        pysideuic.compileUi(io.BytesIO(content), o, indent=0)
+        return widget_class, form_class, o.getvalue()
+    # end if
+    command = _binding_uic()
+    if command is None:
+        raise ImportError('pysideuic or the uic of the binding is required '
+                          'to compile the form %s' % form_class)
+    # end if
+    process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    source, error = process.communicate(content)
+    if process.returncode != 0:
+        raise RuntimeError('uic failed to compile the form %s: %s' % (
+            form_class, error.decode('utf-8', 'replace')))
+    # end if
+    return widget_class, form_class, source.decode('utf-8')
+# end def ui_form_source
 
-        pysideuic.compileUi(f, o, indent=0)
-        pyc = compile(o.getvalue(), '<string>', 'exec')
-        exec pyc in frame
 
-        # Fetch the base_class and form_class based on their type
-        # in the xml from designer
-        base_class = getattr(QtWidgets, widget_class)
-        form_class = frame['Ui_%s' % form_class]
-        return base_class, form_class
-    # end reading the ui file
-# end def _load_ui_type
+def _binding_uic():
+    """The uic executable shipped with the binding, generating python.
+
+    Returns:
+        The command line reading the ui content from stdin, or None if
+        the binding does not ship a uic.
+    """
+    binding = getattr(Qt, '__binding__', '')
+    if not binding.startswith('PySide'):
+        return None
+    # end if
+    try:
+        package = importlib.import_module(binding)
+    except ImportError:
+        return None
+    # end try
+    package_dir = os.path.dirname(os.path.abspath(package.__file__))
+    for path in (('uic', ), ('Qt', 'libexec', 'uic')):
+        for extension in ('', '.exe'):
+            executable = os.path.join(package_dir, *path) + extension
+            if os.path.isfile(executable):
+                return [executable, '-g', 'python']
+            # end if
+        # end for
+    # end for
+    return None
+# end def _binding_uic
+
+
+def _read_ui_cache(cache_file, key):
+    """Read a compiled form from the ui cache.
+
+    Args:
+        cache_file (str): The cache file.
+        key (tuple): The key the cached form has to match.
+    Returns:
+        The cached form or None if there is no valid cached form.
+    """
+    if not _is_private_dir(os.path.dirname(cache_file)):
+        return None
+    # end if
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = marshal.load(f)
+        # end reading the cache file
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+    # end try
+    if not isinstance(cached, tuple) or len(cached) != 4:
+        return None
+    # end if
+    if tuple(cached[0]) != key:
+        return None
+    # end if
+    return cached[1:]
+# end def _read_ui_cache
+
+
+def _write_ui_cache(cache_file, key, form):
+    """Write a compiled form to the ui cache.
+
+    The file is written to a temporary file first and then moved into
+    place, so concurrent processes never read a partial cache file.
+    Failing to write the cache is not an error, the form will simply
+    be compiled again next time.
+    Args:
+        cache_file (str): The cache file.
+        key (tuple): The key to store alongside the form.
+        form (tuple): The widget class, form class and code object.
+    """
+    if not _is_private_dir(os.path.dirname(cache_file), create=True):
+        return
+    # end if
+    temp_file = '%s.%s.tmp' % (cache_file, os.getpid())
+    try:
+        with open(temp_file, 'wb') as f:
+            marshal.dump((key,) + tuple(form), f)
+        # end writing the cache file
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+        # end if
+        os.rename(temp_file, cache_file)
+    except (IOError, OSError):
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        # end if
+    # end try
+# end def _write_ui_cache
+
+
+def _is_private_dir(directory, create=False):
+    """Whether the folder is safe to hold code that is executed.
+
+    The folder has to be owned by the current user and must not be
+    writable by anyone else, so no other user can plant cache files.
+    Args:
+        directory (str): The folder.
+        create (bool): Create a missing folder, accessible only by the
+                       current user.
+    Returns:
+        True if the folder can be used.
+    """
+    if create and not os.path.isdir(directory):
+        try:
+            os.makedirs(directory, 0o700)
+        except OSError:
+            # Created concurrently or not creatable, checked below
+            pass
+        # end try
+    # end if
+    try:
+        stat = os.stat(directory)
+    except OSError:
+        return False
+    # end try
+    if not hasattr(os, 'getuid'):
+        # Windows, the default folder is in the profile of the user
+        return True
+    # end if
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+# end def _is_private_dir
+
+
+def _precompiled_form(ui_file):
+    """Look up the precompiled form for the given ui file.
+
+    Args:
+        ui_file (str): The .ui file.
+    Returns:
+        The widget class name, form module name and form class name or
+        None if there is no up to date precompiled form.
+    """
+    if precompiled is None:
+        return None
+    # end if
+    form = precompiled.FORMS.get(get_resource_key(ui_file))
+    if form is not None and _is_changed_since_precompiled(ui_file):
+        return None
+    # end if
+    return form
+# end def _precompiled_form
+
+
+def _precompiled_stylesheet(css_file):
+    """Look up the precompiled content of the given stylesheet file.
+
+    Args:
+        css_file (str): The .css file.
+    Returns:
+        The content of the stylesheet file or None if there is no up to
+        date precompiled stylesheet.
+    """
+    if precompiled is None:
+        return None
+    # end if
+    from widgets.compiled import stylesheets
+    css = stylesheets.STYLESHEETS.get(get_resource_key(css_file))
+    if css is not None and _is_changed_since_precompiled(css_file):
+        return None
+    # end if
+    return css
+# end def _precompiled_stylesheet
+
+
+def _is_changed_since_precompiled(resource_file):
+    """Whether the resource has been changed after it was precompiled.
+
+    The content is compared, the modification times are not preserved
+    by package installs.
+    Args:
+        resource_file (str): The resource file.
+    Returns:
+        True if the resource file exists and its content differs from
+        the precompiled one.
+    """
+    hashes = getattr(precompiled, 'HASHES', {})
+    try:
+        content_hash = get_resource_hash(resource_file)
+    except (IOError, OSError):
+        return False
+    # end try
+    return content_hash != hashes.get(get_resource_key(resource_file))
+# end def _is_changed_since_precompiled
+
+
+def get_resource_key(resource_file):
+    """Retrieve the key for a resource file of the widgets package.
+
+    Args:
+        resource_file (str): The path to the resource file.
+    Returns:
+        The path relative to the widgets package, using forward
+        slashes, or None if the file is not part of the package.
+    """
+    package_dir = os.path.abspath(os.path.dirname(__file__))
+    path = os.path.relpath(os.path.abspath(resource_file), package_dir)
+    if path.startswith(os.pardir):
+        return None
+    # end if
+    return path.replace(os.sep, '/')
+# end def get_resource_key
+
+
+def get_resource_hash(resource_file):
+    """Retrieve the hash of the content of a resource file.
+
+    Args:
+        resource_file (str): The path to the resource file.
+    Returns:
+        The sha1 hex digest of the content.
+    """
+    with open(resource_file, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+    # end reading the resource file
+# end def get_resource_hash
+
+
+def get_ui_cache_file_path(ui_file):
+    """Retrieve the cache file for the compiled form of the given ui file.
+
+    The cache file is unique per ui file path.
+    Args:
+        ui_file (str): The .ui file.
+    Returns:
+        The file path for the cache file, None if the cache is disabled.
+    """
+    if not UI_CACHE_DIR:
+        return None
+    # end if
+    path_hash = hashlib.sha1(
+        os.path.abspath(ui_file).encode('utf-8')).hexdigest()
+    name = os.path.splitext(os.path.basename(ui_file))[0]
+    return os.path.join(UI_CACHE_DIR, '%s-%s.uic' % (name, path_hash[:16]))
+# end def get_ui_cache_file_path
 
 
 def get_ui_file_path(widget_file, widget_name):
@@ -81,6 +654,7 @@ def get_css_file_path(widget_file, widget_name):
 # end def get_css_file_path
 
 
+@timed('utility.set_stylesheet')
 def set_stylesheet(widget, widget_file=None):
     """Set the style sheet to the given widget.
 
@@ -88,25 +662,68 @@ def set_stylesheet(widget, widget_file=None):
     the given widget are merged.
     For this to work, the widget has to come with a resource folder on
     the same folder level and a .css file named like the class name.
+    If the general stylesheet is installed on the application, see
+    install_stylesheet, only the widget's stylesheet is set.
     Args:
         widget (QWidget): The widget.
         widget_file (str): Optional file path of the widget.
     """
-    general_css_file = os.path.join(os.path.dirname(__file__),
-                                    'resource', 'general.css')
-    with open(general_css_file, 'r') as f:
-        general_css = f.read()
-    # end reading the general css file
-
+    widget_css_file = None
     if widget_file is not None:
         widget_css_file = get_css_file_path(widget_file,
                                             widget.__class__.__name__)
-        if os.path.exists(widget_css_file):
-            with open(widget_css_file, 'r') as f:
-                widget_css = f.read()
-            # end reading the widget's css file
-            general_css += widget_css
-        # end if
     # end if
-    widget.setStyleSheet(general_css)
+    stylesheet_registry.apply(widget, widget_css_file)
 # end def set_stylesheet
+
+
+def install_stylesheet(app=None):
+    """Set the general stylesheet once on the application.
+
+    Widgets styled with set_stylesheet afterwards only get their own
+    stylesheet, instead of a copy of the general stylesheet each.
+    Args:
+        app (QApplication): The application, defaults to the current
+                            instance.
+    """
+    stylesheet_registry.install(app)
+# end def install_stylesheet
+
+
+def set_theme(theme):
+    """Switch the theme of the stylesheets.
+
+    The stylesheets of the widgets styled with set_stylesheet are
+    updated if the theme changes them.
+    Args:
+        theme (Theme or str): The theme or the name of a known theme.
+    Returns:
+        The number of widgets whose stylesheet has been set.
+    """
+    return stylesheet_registry.set_theme(theme)
+# end def set_theme
+
+
+def set_palette_fast_path(enabled=True):
+    """Translate the simple rules of the general stylesheet to palettes.
+
+    Colors and fonts set on plain widget classes are set as class
+    specific palettes and fonts on the application, only the rules that
+    need the stylesheet engine are kept in the stylesheet, see
+    widgets.palette. Widgets styled afterwards use the reduced
+    stylesheet. Enable it before styling any widgets.
+    Args:
+        enabled (bool): Whether to use the palette fast path.
+    """
+    stylesheet_registry.use_palette = enabled
+    if stylesheet_registry.is_installed():
+        stylesheet_registry.install(stylesheet_registry.application)
+    # end if
+# end def set_palette_fast_path
+
+
+# The registry caching the stylesheets used by set_stylesheet
+stylesheet_registry = StyleSheetRegistry(
+    os.path.join(os.path.dirname(__file__), 'resource', 'general.css'),
+    _precompiled_stylesheet,
+    use_palette=os.environ.get('WIDGETS_PALETTE_FAST_PATH') == '1')